@@ -0,0 +1,223 @@
+"""A module containing dependencies shared by the routers."""
+
+from typing import Any, AsyncGenerator, Callable, Dict, Tuple
+
+from fastapi import HTTPException, Query, Request
+from jose import JWTError, jwt
+
+from src.config import config
+from src.core.domain.meal import MEAL_FIELDS, SUMMARY_FIELDS
+from src.infrastructure.services.imeal import IMealService
+from src.infrastructure.services.iuser import IUserService
+from src.infrastructure.utils import consts
+from src.infrastructure.utils.limits import (
+    ConcurrencyLimiter,
+    Overloaded,
+    RateLimiter,
+)
+
+concurrency_limiters: Dict[str, ConcurrencyLimiter] = {}
+
+rate_limiter = RateLimiter(
+    rate=config.RATE_LIMIT_PER_SECOND,
+    burst=config.RATE_LIMIT_BURST,
+)
+
+
+async def get_meal_service(request: Request) -> IMealService:
+    """A dependency returning the meal service of the app.
+
+    The service is a singleton of the container kept in the app state, so
+    resolving it costs an attribute lookup. The dependency is a coroutine,
+    as FastAPI runs plain functions in the threadpool.
+
+    Args:
+        request (Request): The incoming HTTP request.
+
+    Returns:
+        IMealService: The meal service.
+    """
+
+    return request.app.state.container.meal_service()
+
+
+async def get_user_service(request: Request) -> IUserService:
+    """A dependency returning the user service of the app.
+
+    Args:
+        request (Request): The incoming HTTP request.
+
+    Returns:
+        IUserService: The user service.
+    """
+
+    return request.app.state.container.user_service()
+
+
+def token_claims(request: Request) -> Dict[str, Any]:
+    """A function getting the claims of the bearer token of a request.
+
+    The token is decoded once per request and the claims are kept in the
+    request state for later dependencies and the endpoint.
+
+    Args:
+        request (Request): The incoming HTTP request.
+
+    Returns:
+        Dict[str, Any]: The claims, empty if the token is missing or invalid.
+    """
+
+    if (payload := getattr(request.state, "token_claims", None)) is not None:
+        return payload
+
+    payload = {}
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            payload = jwt.decode(
+                token,
+                key=consts.SECRET_KEY,
+                algorithms=[consts.ALGORITHM],
+            )
+        except JWTError:
+            pass
+
+    request.state.token_claims = payload
+    return payload
+
+
+def client_key(request: Request) -> str | None:
+    """A function identifying the client of a request for rate limiting.
+
+    Authenticated clients are identified by the `sub` claim of their token.
+    Anonymous clients are only limited if enabled, by the address seen by
+    the outermost of `FORWARDED_PROXIES` trusted proxies, as behind a proxy
+    all of them share its address.
+
+    Args:
+        request (Request): The incoming HTTP request.
+
+    Returns:
+        str | None: The key of the client, None if it is not rate limited.
+    """
+
+    if user_uuid := token_claims(request).get("sub"):
+        return f"user:{user_uuid}"
+
+    if not config.RATE_LIMIT_ANONYMOUS:
+        return None
+
+    address = request.client.host if request.client else ""
+    if config.FORWARDED_PROXIES:
+        forwarded = [
+            hop.strip()
+            for header in request.headers.getlist("x-forwarded-for")
+            for hop in header.split(",")
+        ]
+        # Every trusted proxy appends the address it received from, the
+        # entries before them may be forged by the client.
+        if len(forwarded) >= config.FORWARDED_PROXIES:
+            address = forwarded[-config.FORWARDED_PROXIES]
+
+    return f"address:{address}"
+
+
+def admission(name: str) -> Callable[[Request], AsyncGenerator[None, None]]:
+    """A function creating a dependency guarding an expensive endpoint.
+
+    The dependency rejects rate limited clients exceeding their limit with
+    429 and requests exceeding the concurrency limit and wait queue of the endpoint
+    with 503, both with the `Retry-After` header.
+
+    Args:
+        name (str): The name of the endpoint used to look up its limit.
+
+    Returns:
+        Callable[[Request], AsyncGenerator[None, None]]: The dependency.
+    """
+
+    limiter = concurrency_limiters.setdefault(
+        name,
+        ConcurrencyLimiter(
+            limit=config.CONCURRENCY_LIMITS.get(name, config.CONCURRENCY_LIMIT),
+            queue_size=config.CONCURRENCY_QUEUE_SIZE,
+            timeout=config.CONCURRENCY_QUEUE_TIMEOUT,
+        ),
+    )
+
+    async def admit(request: Request) -> AsyncGenerator[None, None]:
+        """A dependency admitting the request or failing fast.
+
+        Args:
+            request (Request): The incoming HTTP request.
+
+        Raises:
+            HTTPException: 429 if the client exceeded its rate limit.
+            HTTPException: 503 if the endpoint is overloaded.
+        """
+
+        try:
+            if (key := client_key(request)) is not None:
+                rate_limiter.hit(key)
+        except Overloaded as e:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests",
+                headers={"Retry-After": str(e.retry_after)},
+            ) from e
+
+        try:
+            await limiter.acquire()
+        except Overloaded as e:
+            raise HTTPException(
+                status_code=503,
+                detail="Service overloaded",
+                headers={"Retry-After": str(e.retry_after)},
+            ) from e
+
+        try:
+            yield
+        finally:
+            limiter.release()
+
+    return admit
+
+
+async def meal_fields(
+    fields: str = Query(
+        "summary",
+        description=(
+            "Comma-separated meal fields, `summary` for the name, "
+            "category, area and thumbnail or `full` for all fields."
+        ),
+    ),
+) -> Tuple[str, ...] | None:
+    """A dependency parsing the projection of listed meals.
+
+    Args:
+        fields (str, optional): The requested fields. Defaults to "summary".
+
+    Raises:
+        HTTPException: 422 if an unknown field was requested.
+
+    Returns:
+        Tuple[str, ...] | None: The projected fields in canonical order,
+            None for all fields.
+    """
+
+    if fields == "full":
+        return None
+    if fields == "summary":
+        return SUMMARY_FIELDS
+
+    requested = {field.strip() for field in fields.split(",")} - {""}
+    if unknown := requested.difference(MEAL_FIELDS):
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+        )
+
+    return tuple(
+        field for field in MEAL_FIELDS
+        if field == "id" or field in requested
+    )
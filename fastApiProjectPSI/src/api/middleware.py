@@ -0,0 +1,121 @@
+"""A module containing ASGI middleware of the app."""
+
+import re
+import uuid
+from typing import Any, Awaitable, Callable, Dict, MutableMapping
+
+from src.logs import request_id
+from src.tracing import parse_traceparent, tracer
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+REQUEST_ID_HEADER = b"x-request-id"
+_REQUEST_ID = re.compile(rb"[A-Za-z0-9._-]{1,64}")
+
+
+class RequestIdMiddleware:
+    """A class assigning an id to every HTTP request.
+
+    The id is taken from the `X-Request-ID` header when the client sent a
+    sane one, exposed to logging through a context variable and returned
+    in the response headers.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """The initializer of the middleware.
+
+        Args:
+            app (ASGIApp): The wrapped application.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """The method handling an ASGI connection.
+
+        Args:
+            scope (Scope): The connection scope.
+            receive (Receive): The channel of incoming messages.
+            send (Send): The channel of outgoing messages.
+        """
+
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers: Dict[bytes, bytes] = dict(scope["headers"])
+        value = headers.get(REQUEST_ID_HEADER, b"")
+        if not _REQUEST_ID.fullmatch(value):
+            value = uuid.uuid4().hex.encode()
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (REQUEST_ID_HEADER, value),
+                ]
+            await send(message)
+
+        token = request_id.set(value.decode())
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id.reset(token)
+
+
+class TracingMiddleware:
+    """A class recording a root span of every sampled HTTP request.
+
+    A W3C `traceparent` header sent by the client continues its trace.
+    The span is named by the route template once the request is routed.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """The initializer of the middleware.
+
+        Args:
+            app (ASGIApp): The wrapped application.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """The method handling an ASGI connection.
+
+        Args:
+            scope (Scope): The connection scope.
+            receive (Receive): The channel of incoming messages.
+            send (Send): The channel of outgoing messages.
+        """
+
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        headers: Dict[bytes, bytes] = dict(scope["headers"])
+        parent = parse_traceparent(
+            headers.get(b"traceparent", b"").decode("latin-1"),
+        )
+        attributes = {
+            "http.method": scope["method"],
+            "http.target": scope["path"],
+            "request_id": request_id.get(),
+        }
+
+        with tracer.span(scope["method"], attributes, parent) as span:
+            if span is None:
+                await self.app(scope, receive, send)
+                return
+
+            async def send_with_status(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.attributes["http.status_code"] = message["status"]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                if route := scope.get("route"):
+                    span.name = f"{scope['method']} {route.path}"
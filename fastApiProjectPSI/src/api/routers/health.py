@@ -0,0 +1,38 @@
+"""A module containing health check endpoints."""
+
+from fastapi import APIRouter, Request, Response
+
+router = APIRouter()
+
+
+@router.get("/live", status_code=200)
+async def live() -> dict:
+    """An endpoint telling that the worker is running.
+
+    Returns:
+        dict: The status of the worker.
+    """
+
+    return {"status": "live"}
+
+
+@router.get("/ready", status_code=200)
+async def ready(request: Request, response: Response) -> dict:
+    """An endpoint telling whether the worker should receive traffic.
+
+    The worker is not ready until the warm-up completes and from the
+    start of the shutdown.
+
+    Args:
+        request (Request): The incoming HTTP request.
+        response (Response): The outgoing HTTP response.
+
+    Returns:
+        dict: The readiness of the worker, with status 503 if not ready.
+    """
+
+    if getattr(request.app.state, "ready", False):
+        return {"status": "ready"}
+
+    response.status_code = 503
+    return {"status": "warming up"}
@@ -1,19 +1,43 @@
 """A module containing meal endpoints"""
 
 
-from typing import Iterable
+from typing import Annotated, Iterable, Sequence
 
 from pydantic import UUID4
 
-from dependency_injector.wiring import inject, Provide
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import jwt
 
+from src.api.dependencies import (
+    admission,
+    get_meal_service,
+    meal_fields,
+    token_claims,
+)
 from src.infrastructure.utils import consts
-from src.container import Container
-from src.core.domain.meal import Meal, MealIn, MealBroker
-from src.infrastructure.dto.mealdto import MealDTO
+from src.core.domain.meal import (
+    Meal,
+    MealBatch,
+    MealBroker,
+    MealFilter,
+    MealIn,
+    MealPatch,
+    MealSort,
+    PantryQuery,
+    ShoppingListQuery,
+)
+from src.infrastructure.cache.snapshot import Snapshot
+from src.infrastructure.dto.mealdto import (
+    MealBatchItemDTO,
+    MealDTO,
+    MealViewDTO,
+    PantryMatchDTO,
+    PopularMealDTO,
+    ShoppingListDTO,
+    SuggestionDTO,
+)
+from src.infrastructure.dto.searchdto import FacetDTO, MealSearchDTO
 from src.infrastructure.services.imeal import IMealService
 from typing import List
 
@@ -23,10 +47,9 @@ router = APIRouter()
 
 
 @router.post("/create", response_model=Meal, status_code=201)
-@inject
 async def create_meal(
     meal: MealIn,
-    service: IMealService = Depends(Provide[Container.meal_service]),
+    service: IMealService = Depends(get_meal_service),
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
 ) -> dict:
     """An endpoint for adding new meal.
@@ -60,100 +83,397 @@ async def create_meal(
     return new_meal.model_dump() if new_meal else {}
 
 
-@router.get("/all", response_model=Iterable[MealDTO], status_code=200)
-@inject
+@router.post(
+    "/batch",
+    response_model=List[MealBatchItemDTO],
+    status_code=201,
+    dependencies=[Depends(bearer_scheme), Depends(admission("batch"))],
+)
+async def create_meals(
+    request: Request,
+    batch: MealBatch,
+    service: IMealService = Depends(get_meal_service),
+) -> List[MealBatchItemDTO]:
+    """An endpoint for adding up to 500 meals at once.
+
+    The whole batch is validated before anything is stored and the meals
+    are added in a single transaction, so either all of them are added
+    or none.
+
+    Args:
+        request (Request): The incoming HTTP request.
+        batch (MealBatch): The meals data.
+        service (IMealService, optional): The injected service dependency.
+
+    Returns:
+        List[MealBatchItemDTO]: The ids of the new meals by their position
+            in the batch.
+    """
+
+    # The token was already decoded when the client was admitted.
+    user_uuid = token_claims(request).get("sub")
+
+    if not user_uuid:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+
+    new_meals = await service.add_meals([
+        MealBroker(user_id=user_uuid, **meal.model_dump())
+        for meal in batch.meals
+    ])
+
+    return [
+        MealBatchItemDTO(index=index, id=meal.id, strMeal=meal.strMeal)
+        for index, meal in enumerate(new_meals)
+    ]
+
+
+@router.post(
+    "/shopping-list",
+    response_model=ShoppingListDTO,
+    status_code=200,
+)
+async def get_shopping_list(
+    query: ShoppingListQuery,
+    service: IMealService = Depends(get_meal_service),
+) -> ShoppingListDTO:
+    """An endpoint for consolidating ingredients of planned meals.
+
+    Args:
+        query (ShoppingListQuery): The ids of the planned meals.
+        service (IMealService, optional): The injected service dependency.
+
+    Returns:
+        ShoppingListDTO: The summed amounts of every ingredient.
+    """
+
+    return await service.get_shopping_list(query)
+
+
+@router.get(
+    "/all",
+    response_model=Iterable[MealViewDTO],
+    status_code=200,
+)
 async def get_all_meals(
-    service: IMealService = Depends(Provide[Container.meal_service]),
-) -> Iterable:
+    request: Request,
+    fields: Sequence[str] | None = Depends(meal_fields),
+    sort: MealSort = "name",
+    service: IMealService = Depends(get_meal_service),
+) -> Response:
     """An endpoint for getting all meals.
 
     Args:
+        request (Request): The incoming HTTP request.
+        fields (Sequence[str] | None, optional): The projected fields.
+        sort (MealSort, optional): The order of the meals.
         service (IMealService, optional): The injected service dependency.
 
     Returns:
-        Iterable: The meal attributes collection.
+        Response: The pre-rendered meal attributes collection.
     """
 
-    meals = await service.get_all_meals()
+    snapshot = await service.get_all_meals_snapshot(fields)
+    if sort == "popularity":
+        return _ranked_response(service, snapshot)
 
-    return meals
+    return _snapshot_response(request, snapshot)
+
+@router.get("/categories", response_model=List[FacetDTO], status_code=200)
+async def get_categories(
+    request: Request,
+    service: IMealService = Depends(get_meal_service),
+) -> Response:
+    """An endpoint for getting available categories with meal counts.
+
+    Args:
+        request (Request): The incoming HTTP request.
+        service (IMealService, optional): The injected service dependency.
+
+    Returns:
+        Response: The pre-rendered categories collection.
+    """
+
+    snapshot = await service.get_catalog_snapshot("category")
+
+    return _snapshot_response(request, snapshot)
+
+
+@router.get("/areas", response_model=List[FacetDTO], status_code=200)
+async def get_areas(
+    request: Request,
+    service: IMealService = Depends(get_meal_service),
+) -> Response:
+    """An endpoint for getting available areas with meal counts.
+
+    Args:
+        request (Request): The incoming HTTP request.
+        service (IMealService, optional): The injected service dependency.
+
+    Returns:
+        Response: The pre-rendered areas collection.
+    """
+
+    snapshot = await service.get_catalog_snapshot("area")
+
+    return _snapshot_response(request, snapshot)
+
+
+@router.get("/ingredients", response_model=List[FacetDTO], status_code=200)
+async def get_ingredients(
+    request: Request,
+    service: IMealService = Depends(get_meal_service),
+) -> Response:
+    """An endpoint for getting available ingredients with meal counts.
+
+    Args:
+        request (Request): The incoming HTTP request.
+        service (IMealService, optional): The injected service dependency.
+
+    Returns:
+        Response: The pre-rendered ingredients collection.
+    """
+
+    snapshot = await service.get_catalog_snapshot("ingredient")
 
-@router.get("/category/{category}", response_model=Iterable[MealDTO], status_code=200)
-@inject
+    return _snapshot_response(request, snapshot)
+
+
+@router.get("/category/{category}", response_model=Iterable[MealViewDTO], status_code=200)
 async def get_meals_by_category(
     category: str,
-    service: IMealService = Depends(Provide[Container.meal_service]),
-) -> Iterable:
+    request: Request,
+    fields: Sequence[str] | None = Depends(meal_fields),
+    sort: MealSort = "name",
+    service: IMealService = Depends(get_meal_service),
+) -> Response:
     """An endpoint for getting meals by category.
 
     Args:
         category (str): The name of the category.
+        request (Request): The incoming HTTP request.
+        fields (Sequence[str] | None, optional): The projected fields.
+        sort (MealSort, optional): The order of the meals.
 
     Returns:
-        Iterable: The meal attributes collection.
+        Response: The pre-rendered meal attributes collection.
     """
-    meals = await service.get_by_category(category)
-    return meals
+    snapshot = await service.get_category_snapshot(category, fields)
+    if sort == "popularity":
+        return _ranked_response(service, snapshot)
+    return _snapshot_response(request, snapshot)
 
 
-@router.get("/area/{area}", response_model=Iterable[MealDTO], status_code=200)
-@inject
+@router.get("/area/{area}", response_model=Iterable[MealViewDTO], status_code=200)
 async def get_meals_by_area(
     area: str,
-    service: IMealService = Depends(Provide[Container.meal_service]),
-) -> Iterable:
+    request: Request,
+    fields: Sequence[str] | None = Depends(meal_fields),
+    sort: MealSort = "name",
+    service: IMealService = Depends(get_meal_service),
+) -> Response:
     """An endpoint for getting meals by area.
 
     Args:
         area (str): The name of the area.
+        request (Request): The incoming HTTP request.
+        fields (Sequence[str] | None, optional): The projected fields.
+        sort (MealSort, optional): The order of the meals.
 
     Returns:
-        Iterable: The meal attributes collection.
+        Response: The pre-rendered meal attributes collection.
     """
-    meals = await service.get_by_area(area)
-    return meals
+    snapshot = await service.get_area_snapshot(area, fields)
+    if sort == "popularity":
+        return _ranked_response(service, snapshot)
+    return _snapshot_response(request, snapshot)
 
 
-@router.get("/name/{name}", response_model=Iterable[MealDTO], status_code=200)
-@inject
+@router.get(
+    "/name/{name}",
+    response_model=Iterable[MealViewDTO],
+    response_model_exclude_unset=True,
+    status_code=200,
+    dependencies=[Depends(admission("name"))],
+)
 async def get_meals_by_name(
     name: str,
-    service: IMealService = Depends(Provide[Container.meal_service]),
+    fields: Sequence[str] | None = Depends(meal_fields),
+    sort: MealSort = "name",
+    service: IMealService = Depends(get_meal_service),
 ) -> Iterable:
     """An endpoint for getting meals by name.
 
     Args:
         name (str): The name of the meal.
+        fields (Sequence[str] | None, optional): The projected fields.
+        sort (MealSort, optional): The order of the meals.
 
     Returns:
         Iterable: The meal attributes collection.
     """
-    meals = await service.get_by_name(name)
+    meals = await service.get_by_name(name, fields)
+    if sort == "popularity":
+        meals = service.rank_by_popularity(meals)
     return meals
 
 
-@router.get("/user/{user_id}", response_model=Iterable[MealDTO], status_code=200)
-@inject
+@router.get(
+    "/tag/{tag}",
+    response_model=Iterable[MealViewDTO],
+    response_model_exclude_unset=True,
+    status_code=200,
+)
+async def get_meals_by_tag(
+    tag: str,
+    fields: Sequence[str] | None = Depends(meal_fields),
+    sort: MealSort = "name",
+    service: IMealService = Depends(get_meal_service),
+) -> Iterable:
+    """An endpoint for getting meals labelled with a tag.
+
+    Args:
+        tag (str): The tag, compared case-insensitively.
+        fields (Sequence[str] | None, optional): The projected fields.
+        sort (MealSort, optional): The order of the meals.
+
+    Returns:
+        Iterable: The meal attributes collection.
+    """
+    meals = await service.get_by_tags([tag], fields=fields)
+    if sort == "popularity":
+        meals = service.rank_by_popularity(meals)
+    return meals
+
+
+@router.get(
+    "/user/{user_id}",
+    response_model=Iterable[MealViewDTO],
+    response_model_exclude_unset=True,
+    status_code=200,
+)
 async def get_meals_by_user(
     user_id: UUID4,
-    service: IMealService = Depends(Provide[Container.meal_service]),
+    fields: Sequence[str] | None = Depends(meal_fields),
+    sort: MealSort = "name",
+    service: IMealService = Depends(get_meal_service),
 ) -> Iterable:
     """An endpoint for getting meals by user.
 
     Args:
         user_id (UUID4): The UUID of the user.
+        fields (Sequence[str] | None, optional): The projected fields.
+        sort (MealSort, optional): The order of the meals.
 
     Returns:
         Iterable: The meal attributes collection.
     """
-    meals = await service.get_by_user(user_id)
+    meals = await service.get_by_user(user_id, fields)
+    if sort == "popularity":
+        meals = service.rank_by_popularity(meals)
     return meals
 
-@router.get("/meals/recommendations", status_code=200)
-@inject
+@router.get("/suggest", response_model=List[SuggestionDTO], status_code=200)
+async def suggest_meals(
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    service: IMealService = Depends(get_meal_service),
+) -> List[SuggestionDTO]:
+    """An endpoint for completing meal and ingredient names.
+
+    Args:
+        q (str): The typed prefix.
+        limit (int, optional): The maximal number of suggestions.
+            Defaults to 10.
+        service (IMealService, optional): The injected service dependency.
+
+    Returns:
+        List[SuggestionDTO]: The matching names.
+    """
+
+    return await service.suggest(q, limit)
+
+
+@router.get(
+    "/pantry",
+    response_model=List[PantryMatchDTO],
+    status_code=200,
+    dependencies=[Depends(admission("pantry"))],
+)
+async def match_pantry(
+    query: Annotated[PantryQuery, Query()],
+    service: IMealService = Depends(get_meal_service),
+) -> List[PantryMatchDTO]:
+    """An endpoint for ranking meals by the share of owned ingredients.
+
+    Args:
+        query (PantryQuery): The owned ingredients with the minimal coverage
+            and the number of meals.
+        service (IMealService, optional): The injected service dependency.
+
+    Returns:
+        List[PantryMatchDTO]: The meals ordered by coverage, then by the
+            number of missing ingredients.
+    """
+
+    return await service.match_pantry(query)
+
+
+@router.get(
+    "/search",
+    response_model=MealSearchDTO,
+    status_code=200,
+    dependencies=[Depends(admission("search"))],
+)
+async def search_meals(
+    filters: Annotated[MealFilter, Query()],
+    service: IMealService = Depends(get_meal_service),
+) -> MealSearchDTO:
+    """An endpoint for searching meals by any combination of filters.
+
+    Args:
+        filters (MealFilter): The name, category, area, ingredient and tag
+            filters with pagination.
+        service (IMealService, optional): The injected service dependency.
+
+    Returns:
+        MealSearchDTO: The page of hits with facet counts.
+    """
+
+    return await service.search(filters)
+
+
+@router.get(
+    "/popular",
+    response_model=List[PopularMealDTO],
+    response_model_exclude_unset=True,
+    status_code=200,
+)
+async def get_popular_meals(
+    limit: int = Query(10, ge=1, le=100),
+    service: IMealService = Depends(get_meal_service),
+) -> List[PopularMealDTO]:
+    """An endpoint for getting the most favourited meals.
+
+    Args:
+        limit (int, optional): The maximal number of meals.
+        service (IMealService, optional): The injected service dependency.
+
+    Returns:
+        List[PopularMealDTO]: The meals with favourite counts, most
+            favourited first.
+    """
+
+    return await service.get_popular(limit)
+
+
+@router.get(
+    "/meals/recommendations",
+    status_code=200,
+    dependencies=[Depends(admission("recommendations"))],
+)
 async def recommend_meals(
     n: int = 3,
-    service: IMealService = Depends(Provide[Container.meal_service]),
+    service: IMealService = Depends(get_meal_service),
 ) -> List[dict]:
     """Endpoint to get random meal recommendations.
 
@@ -173,10 +493,9 @@ async def recommend_meals(
         response_model=MealDTO,
         status_code=200,
 )
-@inject
 async def get_meal_by_id(
     meal_id: int,
-    service: IMealService = Depends(Provide[Container.meal_service]),
+    service: IMealService = Depends(get_meal_service),
 ) -> dict | None:
     """An endpoint for getting meal by id.
 
@@ -193,29 +512,38 @@ async def get_meal_by_id(
 
     raise HTTPException(status_code=404, detail="Meal not found")
 
-@router.get("/ingredient/{ingredient_name}", response_model=Iterable[MealDTO], status_code=200)
-@inject
+@router.get(
+    "/ingredient/{ingredient_name}",
+    response_model=Iterable[MealViewDTO],
+    response_model_exclude_unset=True,
+    status_code=200,
+)
 async def get_meals_by_ingredient(
     ingredient_name: str,
-    service: IMealService = Depends(Provide[Container.meal_service]),
+    fields: Sequence[str] | None = Depends(meal_fields),
+    sort: MealSort = "name",
+    service: IMealService = Depends(get_meal_service),
 ) -> Iterable:
     """An endpoint for getting meals by ingredient.
 
     Args:
         ingredient_name (str): The name of the ingredient.
+        fields (Sequence[str] | None, optional): The projected fields.
+        sort (MealSort, optional): The order of the meals.
 
     Returns:
         Iterable: The meal attributes collection.
     """
-    meals = await service.get_by_ingredients(ingredient_name)
+    meals = await service.get_by_ingredients(ingredient_name, fields)
+    if sort == "popularity":
+        meals = service.rank_by_popularity(meals)
     return meals
 
 @router.put("/{meal_id}", response_model=Meal, status_code=201)
-@inject
 async def update_meal(
     meal_id: int,
     updated_meal: MealIn,
-    service: IMealService = Depends(Provide[Container.meal_service]),
+    service: IMealService = Depends(get_meal_service),
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
 ) -> dict:
     """An endpoint for updating meal data.
@@ -262,11 +590,54 @@ async def update_meal(
     raise HTTPException(status_code=404, detail="Meal not found")
 
 
+@router.patch("/{meal_id}", response_model=Meal, status_code=200)
+async def patch_meal(
+    meal_id: int,
+    patch: MealPatch,
+    service: IMealService = Depends(get_meal_service),
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+) -> dict:
+    """An endpoint for updating only the provided fields of a meal.
+
+    Args:
+        meal_id (int): The id of the meal.
+        patch (MealPatch): The provided fields and ingredient edits.
+        service (IMealService, optional): The injected service dependency.
+        credentials (HTTPAuthorizationCredentials, optional): The credentials.
+
+    Raises:
+        HTTPException: 403 if the meal belongs to another user.
+        HTTPException: 404 if meal does not exist.
+
+    Returns:
+        dict: The patched meal details.
+    """
+
+    token = credentials.credentials
+    token_payload = jwt.decode(
+        token,
+        key=consts.SECRET_KEY,
+        algorithms=[consts.ALGORITHM],
+    )
+    user_uuid = token_payload.get("sub")
+
+    if not user_uuid:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+
+    if meal_data := await service.get_by_id(meal_id=meal_id):
+        if str(meal_data.user_id) != user_uuid:
+            raise HTTPException(status_code=403, detail="Unauthorized")
+
+        if patched_meal := await service.patch_meal(meal_id, patch):
+            return patched_meal.model_dump()
+
+    raise HTTPException(status_code=404, detail="Meal not found")
+
+
 @router.delete("/{meal_id}", status_code=204)
-@inject
 async def delete_meal(
     meal_id: int,
-    service: IMealService = Depends(Provide[Container.meal_service]),
+    service: IMealService = Depends(get_meal_service),
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
 ) -> None:
     """An endpoint for deleting meals.
@@ -301,3 +672,50 @@ async def delete_meal(
     raise HTTPException(status_code=404, detail="Meal not found")
 
 
+def _ranked_response(service: IMealService, snapshot: Snapshot) -> Response:
+    """A function serving a snapshot ordered by the number of favourites.
+
+    The ranking changes with every favourite, so the body is neither
+    compressed ahead nor tagged for revalidation.
+
+    Args:
+        service (IMealService): The meal service.
+        snapshot (Snapshot): The pre-rendered collection.
+
+    Returns:
+        Response: The HTTP response with the ranked collection.
+    """
+
+    return Response(
+        content=service.rank_snapshot(snapshot),
+        media_type="application/json",
+    )
+
+
+def _snapshot_response(request: Request, snapshot: Snapshot) -> Response:
+    """A function serving a snapshot with content negotiation.
+
+    Args:
+        request (Request): The incoming HTTP request.
+        snapshot (Snapshot): The pre-rendered collection.
+
+    Returns:
+        Response: The HTTP response with the best encoded body.
+    """
+
+    headers = {"ETag": snapshot.etag, "Vary": "Accept-Encoding"}
+
+    if request.headers.get("if-none-match") == snapshot.etag:
+        return Response(status_code=304, headers=headers)
+
+    body, encoding = snapshot.negotiate(
+        request.headers.get("accept-encoding", ""),
+    )
+    if encoding:
+        headers["Content-Encoding"] = encoding
+
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers=headers,
+    )
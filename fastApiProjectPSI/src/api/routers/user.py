@@ -1,10 +1,11 @@
 """A module containing user-related routers."""
 
-from typing import List
-from dependency_injector.wiring import inject, Provide
-from fastapi import APIRouter, Depends, HTTPException
+import logging
+from typing import Any, AsyncIterator, List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
-from src.container import Container
+from src.api.dependencies import get_user_service
 from src.core.domain.user import UserIn
 from src.infrastructure.dto.tokendto import TokenDTO
 from src.infrastructure.dto.userdto import UserDTO
@@ -14,12 +15,13 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
+
 
 @router.post("/register", response_model=UserDTO, status_code=201)
-@inject
 async def register_user(
     user: UserIn,
-    service: IUserService = Depends(Provide[Container.user_service]),
+    service: IUserService = Depends(get_user_service),
 ) -> dict:
     """A router coroutine for registering new user
 
@@ -41,10 +43,9 @@ async def register_user(
 
 
 @router.post("/token", response_model=TokenDTO, status_code=200)
-@inject
 async def authenticate_user(
     user: UserIn,
-    service: IUserService = Depends(Provide[Container.user_service]),
+    service: IUserService = Depends(get_user_service),
 ) -> dict:
     """A router coroutine for authenticating users.
 
@@ -57,7 +58,7 @@ async def authenticate_user(
     """
 
     if token_details := await service.authenticate_user(user):
-        print("user confirmed")
+        logger.info("User authenticated")
         return token_details.model_dump()
 
     raise HTTPException(
@@ -67,10 +68,9 @@ async def authenticate_user(
 
 
 @router.get("/user/{uuid}", response_model=UserDTO, status_code=200)
-@inject
 async def get_user_by_uuid(
     uuid: UUID4,
-    service: IUserService = Depends(Provide[Container.user_service]),
+    service: IUserService = Depends(get_user_service),
 ) -> UserDTO:
     """A router coroutine for getting user by UUID.
 
@@ -91,10 +91,9 @@ async def get_user_by_uuid(
 
 
 @router.get("/user/email/{email}", status_code=200)
-@inject
 async def get_user_by_email(
     email: str,
-    service: IUserService = Depends(Provide[Container.user_service]),
+    service: IUserService = Depends(get_user_service),
 ) -> dict:
     """Retrieve a user by email."""
     user = await service.get_by_email(email)
@@ -109,12 +108,11 @@ async def get_user_by_email(
 bearer_scheme = HTTPBearer()
 
 @router.post("/user/favourites/{uuid}/add", status_code=201)
-@inject
 async def add_to_favourites(
     uuid: UUID4,
     meal_id: int,
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    service: IUserService = Depends(Provide[Container.user_service]),
+    service: IUserService = Depends(get_user_service),
 ) -> dict:
     """Add a meal to the user's favourites."""
     added = await service.add_to_favourites(uuid, meal_id)
@@ -126,12 +124,11 @@ async def add_to_favourites(
     )
 
 @router.delete("/user/favourites/{uuid}/remove", status_code=200)
-@inject
 async def remove_from_favourites(
     uuid: UUID4,
     meal_id: int,
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    service: IUserService = Depends(Provide[Container.user_service]),
+    service: IUserService = Depends(get_user_service),
 ) -> dict:
     """Remove a meal from the user's favourites.
 
@@ -156,10 +153,9 @@ async def remove_from_favourites(
 
 
 @router.get("/user/favourites/{uuid}", response_model=List[str])
-@inject
 async def get_favourites(
     uuid: UUID4,
-    service: IUserService = Depends(Provide[Container.user_service]),
+    service: IUserService = Depends(get_user_service),
 ) -> list:
     """Get a list of the user's favourite meals."""
     favourites = await service.get_favourites(uuid)
@@ -171,10 +167,45 @@ async def get_favourites(
     )
 
 @router.get("/users", response_model=List[UserDTO], status_code=200)
-@inject
-async def get_all_users(
-    service: IUserService = Depends(Provide[Container.user_service]),
-) -> List[UserDTO]:
-    """Retrieve all users."""
-    users = await service.get_all_users()
-    return [UserDTO(**user).model_dump() for user in users]
\ No newline at end of file
+async def get_users(
+    request: Request,
+    response: Response,
+    after: UUID4 | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    stream: bool = False,
+    service: IUserService = Depends(get_user_service),
+) -> Any:
+    """Retrieve users ordered by UUID, page by page.
+
+    The next page is linked in the `Link` header. With `stream` all users
+    following the cursor are streamed as newline-delimited JSON.
+
+    Args:
+        request (Request): The incoming HTTP request.
+        response (Response): The outgoing HTTP response.
+        after (UUID4 | None, optional): The cursor, i.e. the UUID of the
+            last user of the previous page. Defaults to None.
+        limit (int, optional): The size of the page. Defaults to 100.
+        stream (bool, optional): Whether to stream all users.
+            Defaults to False.
+        service (IUserService, optional): The injected user service.
+
+    Returns:
+        Any: The page of users or the stream of all users.
+    """
+
+    if stream:
+        async def lines() -> AsyncIterator[bytes]:
+            async for users in service.iterate_users(after, limit):
+                yield b"".join(
+                    user.model_dump_json().encode() + b"\n" for user in users
+                )
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    users = await service.get_users(after, limit)
+    if len(users) == limit:
+        next_url = request.url.include_query_params(after=str(users[-1].id))
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+
+    return users
@@ -0,0 +1,122 @@
+"""A module containing commands filling derived columns of stored meals.
+
+Usage:
+    python -m src.backfill ingredients
+    python -m src.backfill dimensions
+    python -m src.backfill tags
+    python -m src.backfill favourites
+
+The app fills ingredient, category and area ids and tags itself on
+startup, the commands are kept for running the backfill ahead of a
+deploy.
+"""
+
+import argparse
+import asyncio
+from typing import Awaitable, Callable, Dict
+
+from src.container import Container
+from src.db import database, init_db
+
+container = Container()
+
+
+async def backfill_ingredients(batch_size: int) -> int:
+    """Function filling ingredient ids of meals stored before them.
+
+    Args:
+        batch_size (int): The number of meals updated at once.
+
+    Returns:
+        int: The number of updated meals.
+    """
+
+    repository = container.meal_db_repository()
+
+    return await repository.backfill_ingredient_ids(batch_size)
+
+
+async def backfill_tags(batch_size: int) -> int:
+    """Function filling parsed tags of meals stored before them.
+
+    Args:
+        batch_size (int): The number of meals updated at once.
+
+    Returns:
+        int: The number of updated meals.
+    """
+
+    repository = container.meal_db_repository()
+
+    return await repository.backfill_tags(batch_size)
+
+
+async def backfill_dimensions(batch_size: int) -> int:
+    """Function filling category and area ids of meals stored before them.
+
+    Args:
+        batch_size (int): The number of meals updated at once.
+
+    Returns:
+        int: The number of updated meals.
+    """
+
+    repository = container.meal_db_repository()
+
+    return await repository.backfill_dimension_ids(batch_size)
+
+
+async def backfill_favourites(batch_size: int) -> int:
+    """Function recounting favourites of all meals from user lists.
+
+    Args:
+        batch_size (int): Unused, the counts are corrected at once.
+
+    Returns:
+        int: The number of corrected meals.
+    """
+
+    repository = container.meal_db_repository()
+
+    return await repository.reconcile_favourite_counts() or 0
+
+
+COMMANDS: Dict[str, Callable[[int], Awaitable[int]]] = {
+    "ingredients": backfill_ingredients,
+    "dimensions": backfill_dimensions,
+    "tags": backfill_tags,
+    "favourites": backfill_favourites,
+}
+
+
+async def run(command: str, batch_size: int) -> None:
+    """Function running a backfill command against the database.
+
+    Args:
+        command (str): The name of the command.
+        batch_size (int): The number of meals updated at once.
+    """
+
+    await init_db(delay=0)
+    await database.connect()
+    try:
+        updated = await COMMANDS[command](batch_size)
+    finally:
+        await database.disconnect()
+
+    print(f"Backfilled {command} of {updated} meals.")
+
+
+def main() -> None:
+    """Function parsing arguments and running the backfill command."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.command, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""A module containing benchmarks of the request handling overhead.
+
+Usage:
+    python -m src.benchmark di [--requests 5000]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from typing import Awaitable, Callable, Dict
+
+from dependency_injector.providers import Factory
+from dependency_injector.wiring import Provide, inject
+from fastapi import Depends, FastAPI
+
+from src.api.dependencies import get_meal_service
+from src.container import Container
+from src.infrastructure.services.imeal import IMealService
+from src.infrastructure.services.meal import MealService
+from src.warmup import _get
+
+
+class LegacyContainer(Container):
+    """A container building the meal service for every request."""
+    meal_service = Factory(MealService, **Container.meal_service.kwargs)
+
+
+async def bare() -> dict:
+    """An endpoint without dependencies, the baseline of the benchmark."""
+
+    return {}
+
+
+@inject
+async def legacy(
+    service: IMealService = Depends(Provide[LegacyContainer.meal_service]),
+) -> dict:
+    """An endpoint injecting a new service with `@inject` and `Provide`."""
+
+    return {}
+
+
+async def current(
+    service: IMealService = Depends(get_meal_service),
+) -> dict:
+    """An endpoint getting the singleton service from the app state."""
+
+    return {}
+
+
+def build_app() -> FastAPI:
+    """Function creating the app serving the benchmarked endpoints.
+
+    Returns:
+        FastAPI: The application.
+    """
+
+    app = FastAPI()
+    app.state.container = Container()
+    LegacyContainer().wire(modules=[__name__])
+
+    for endpoint in (bare, legacy, current):
+        app.add_api_route(f"/{endpoint.__name__}", endpoint)
+
+    return app
+
+
+async def measure(
+    send: Callable[[], Awaitable[int]],
+    requests: int,
+) -> float:
+    """Function measuring the mean duration of a request.
+
+    Args:
+        send (Callable[[], Awaitable[int]]): The function sending a request.
+        requests (int): The number of measured requests.
+
+    Returns:
+        float: The mean duration in microseconds.
+    """
+
+    for _ in range(min(requests, 100)):
+        await send()
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await send()
+
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def benchmark_di(requests: int) -> Dict[str, float]:
+    """Function comparing the ways of resolving the meal service.
+
+    Args:
+        requests (int): The number of requests per endpoint.
+
+    Returns:
+        Dict[str, float]: The mean durations in microseconds by endpoint.
+    """
+
+    app = build_app()
+
+    return {
+        name: await measure(lambda path=f"/{name}": _get(app, path), requests)
+        for name in ("bare", "legacy", "current")
+    }
+
+
+def report_di(requests: int) -> int:
+    """Function printing the per-request overhead of resolving services.
+
+    Args:
+        requests (int): The number of requests per endpoint.
+
+    Returns:
+        int: The exit code.
+    """
+
+    timings = asyncio.run(benchmark_di(requests))
+
+    print(f"{'mean [us]':>10} {'overhead [us]':>14}  endpoint")
+    for name, duration in timings.items():
+        print(f"{duration:>10.1f} {duration - timings['bare']:>14.1f}  {name}")
+
+    return 0
+
+
+COMMANDS: Dict[str, Callable[[int], int]] = {
+    "di": report_di,
+}
+
+
+def main() -> None:
+    """Function parsing arguments and running the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    sys.exit(COMMANDS[args.command](args.requests))
+
+
+if __name__ == "__main__":
+    main()
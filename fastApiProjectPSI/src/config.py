@@ -1,6 +1,6 @@
 """A module providing configuration variables."""
 
-from typing import Optional
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -15,6 +15,35 @@ class AppConfig(BaseConfig):
     DB_NAME: Optional[str] = None
     DB_USER: Optional[str] = None
     DB_PASSWORD: Optional[str] = None
+    DB_REPLICA_URIS: List[str] = []
+    DB_REPLICA_CHECK_INTERVAL: float = 5.0
+    DB_REPLICA_STICKINESS: float = 2.0
+    CONCURRENCY_LIMIT: int = 8
+    CONCURRENCY_LIMITS: Dict[str, int] = {}
+    CONCURRENCY_QUEUE_SIZE: int = 32
+    CONCURRENCY_QUEUE_TIMEOUT: float = 2.0
+    RATE_LIMIT_PER_SECOND: float = 5.0
+    RATE_LIMIT_BURST: int = 20
+    RATE_LIMIT_ANONYMOUS: bool = False
+    FORWARDED_PROXIES: int = 0
+    MEAL_SNAPSHOT_ENABLED: bool = False
+    WARMUP_ENABLED: bool = True
+    WARMUP_CONNECTIONS: int = 4
+    WARMUP_TIMEOUT: float = 60.0
+    STARTUP_BUDGET: float = 3.0
+    POPULAR_CAPACITY: int = 100
+    POPULARITY_REFRESH_INTERVAL: float = 30.0
+    POPULARITY_RECONCILE_INTERVAL: float = 3600.0
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: Dict[str, str] = {"sqlalchemy.engine": "WARNING"}
+    LOG_SAMPLING: Dict[str, float] = {"uvicorn.access": 0.1}
+    LOG_QUEUE_SIZE: int = 10000
+    TRACE_EXPORTER: str = "none"
+    TRACE_SAMPLE_RATE: float = 0.01
+    TRACE_FILE: str = "traces.jsonl"
+    TRACE_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACE_QUEUE_SIZE: int = 4096
+    TRACE_SERVICE_NAME: str = "meal-api"
 
 
 config = AppConfig()
\ No newline at end of file
@@ -1,9 +1,34 @@
 from dependency_injector.containers import DeclarativeContainer
-from dependency_injector.providers import Factory, Singleton
+from dependency_injector.providers import (
+    Callable,
+    List,
+    Selector,
+    Singleton,
+)
+from src.config import config
+from src.core.domain.meal import SUMMARY_FIELDS
+from src.db import area_table, category_table
+from src.infrastructure.cache.events import MealEventBus
+from src.infrastructure.cache.invalidation import (
+    CATALOG_KINDS,
+    MealCacheSync,
+    catalog_key,
+    projection_key,
+)
+from src.infrastructure.cache.pantry import PantryIndex
+from src.infrastructure.cache.popularity import PopularityIndex
+from src.infrastructure.cache.snapshot import SnapshotStore
+from src.infrastructure.cache.suggest import SuggestIndex
+from src.infrastructure.repositories.dimension import DimensionRepository
+from src.infrastructure.repositories.ingredient import IngredientRepository
 from src.infrastructure.repositories.user import UserRepository
 from src.infrastructure.repositories.mealdb import MealRepository
+from src.infrastructure.repositories.mealsnapshot import (
+    ColumnarMealRepository,
+)
 from src.infrastructure.services.user import UserService
 from src.infrastructure.services.meal import MealService
+from src.infrastructure.utils.singleflight import SingleFlight
 
 """Module providing containers injecting dependencies."""
 
@@ -13,15 +38,67 @@ from src.infrastructure.services.meal import MealService
 class Container(DeclarativeContainer):
     """Container class for dependency injecting purposes."""
     user_repository = Singleton(UserRepository)
-    meal_repository = Singleton(MealRepository)
+    ingredient_repository = Singleton(IngredientRepository)
+    category_repository = Singleton(DimensionRepository, table=category_table)
+    area_repository = Singleton(DimensionRepository, table=area_table)
+    meal_db_repository = Singleton(
+        MealRepository,
+        ingredients=ingredient_repository,
+        categories=category_repository,
+        areas=area_repository,
+    )
+    meal_snapshot_repository = Singleton(
+        ColumnarMealRepository,
+        delegate=meal_db_repository,
+    )
+    meal_repository = Selector(
+        Callable(
+            lambda: "snapshot" if config.MEAL_SNAPSHOT_ENABLED else "db",
+        ),
+        db=meal_db_repository,
+        snapshot=meal_snapshot_repository,
+    )
     #recommended_meal_repository = Singleton(RecommendedMealRepository)
     #favourite_meal_repository = Singleton(FavouriteMealRepository)
+    snapshot_store = Singleton(
+        SnapshotStore,
+        pinned=[
+            projection_key("all", None),
+            projection_key("all", SUMMARY_FIELDS),
+            *map(catalog_key, CATALOG_KINDS),
+        ],
+    )
+    suggest_index = Singleton(SuggestIndex)
+    pantry_index = Singleton(PantryIndex)
+    popularity_index = Singleton(
+        PopularityIndex,
+        capacity=config.POPULAR_CAPACITY,
+    )
+    single_flight = Singleton(SingleFlight)
+    meal_cache_sync = Singleton(
+        MealCacheSync,
+        repository=meal_db_repository,
+        snapshots=snapshot_store,
+        suggestions=suggest_index,
+        pantry=pantry_index,
+    )
+    meal_events = Singleton(
+        MealEventBus,
+        subscribers=List(meal_snapshot_repository, meal_cache_sync),
+    )
 
-    user_service = Factory(
+    user_service = Singleton(
         UserService,
         repository=user_repository,
+        popularity=popularity_index,
     )
-    meal_service = Factory(
+    meal_service = Singleton(
         MealService,
         repository=meal_repository,
+        snapshots=snapshot_store,
+        suggestions=suggest_index,
+        pantry=pantry_index,
+        popularity=popularity_index,
+        events=meal_events,
+        flights=single_flight,
     )
\ No newline at end of file
@@ -1,6 +1,24 @@
-from typing import Optional, List
+from typing import Literal, Optional, List
 
-from pydantic import BaseModel, UUID4, ConfigDict
+from pydantic import BaseModel, UUID4, ConfigDict, Field, model_validator
+
+MEAL_FIELDS = (
+    "id",
+    "strMeal",
+    "strInstructions",
+    "ingredients",
+    "measures",
+    "strCategory",
+    "strArea",
+    "strMealThumb",
+    "strTags",
+    "strYoutube",
+    "user_id",
+)
+SUMMARY_FIELDS = ("id", "strMeal", "strCategory", "strArea", "strMealThumb")
+
+# Orders of meal lists, by name or by the number of users favouriting them.
+MealSort = Literal["name", "popularity"]
 
 
 class MealIn(BaseModel):
@@ -28,3 +46,84 @@ class Meal(MealBroker):
 
 
     model_config = ConfigDict(from_attributes=True, extra="ignore")
+
+
+class MealIngredient(BaseModel):
+    """Model representing an ingredient appended to a meal."""
+    ingredient: str = Field(min_length=1)
+    measure: str = ""
+
+
+class MealPatch(BaseModel):
+    """Model representing a partial update of a meal.
+
+    Only the provided fields are written. Ingredients are either replaced
+    together with measures or edited by removing and appending entries.
+    """
+    strMeal: Optional[str] = None
+    strInstructions: Optional[str] = None
+    ingredients: Optional[List[str]] = None
+    measures: Optional[List[str]] = None
+    strCategory: Optional[str] = None
+    strArea: Optional[str] = None
+    strMealThumb: Optional[str] = None
+    strTags: Optional[str] = None
+    strYoutube: Optional[str] = None
+    add_ingredients: List[MealIngredient] = []
+    remove_ingredients: List[str] = []
+
+    @model_validator(mode="after")
+    def check_consistency(self) -> "MealPatch":
+        """A method validating combinations of the provided fields.
+
+        Raises:
+            ValueError: If a required field is set to null, only one of
+                ingredients and measures is replaced or ingredients are
+                both replaced and edited.
+
+        Returns:
+            MealPatch: The validated patch.
+        """
+
+        for field in ("strMeal", "strInstructions", "ingredients", "measures"):
+            if field in self.model_fields_set and getattr(self, field) is None:
+                raise ValueError(f"{field} cannot be null")
+
+        replaced = {"ingredients", "measures"} & self.model_fields_set
+        if len(replaced) == 1:
+            raise ValueError("ingredients and measures are replaced together")
+        if replaced and (self.add_ingredients or self.remove_ingredients):
+            raise ValueError("ingredients cannot be replaced and edited at once")
+
+        return self
+
+
+class MealBatch(BaseModel):
+    """Model representing meals added at once."""
+    meals: List[MealIn] = Field(min_length=1, max_length=500)
+
+
+class MealFilter(BaseModel):
+    """Model representing combined meal search filters."""
+    name: Optional[str] = None
+    category: Optional[str] = None
+    area: Optional[str] = None
+    ingredients: List[str] = []
+    tags: List[str] = []
+    tag_match: Literal["all", "any"] = "all"
+    sort: MealSort = "name"
+    limit: int = Field(20, ge=1, le=100)
+    offset: int = Field(0, ge=0)
+    top_ingredients: int = Field(10, ge=0, le=50)
+
+
+class PantryQuery(BaseModel):
+    """Model representing owned ingredients matched against meals."""
+    ingredients: List[str] = Field(min_length=1, max_length=200)
+    min_coverage: float = Field(0.0, ge=0.0, le=1.0)
+    limit: int = Field(20, ge=1, le=100)
+
+
+class ShoppingListQuery(BaseModel):
+    """Model representing meals of a plan to shop for."""
+    meal_ids: List[int] = Field(min_length=1, max_length=50)
@@ -0,0 +1,41 @@
+"""Module containing dimension repository abstractions."""
+
+from abc import ABC, abstractmethod
+from typing import Tuple
+
+
+class IDimensionRepository(ABC):
+    """An abstract class representing a lookup table of meal attributes."""
+
+    @abstractmethod
+    async def get_id(self, name: str) -> int | None:
+        """The abstract method for getting the id of a known value.
+
+        Args:
+            name (str): The value as entered, compared case-insensitively.
+
+        Returns:
+            int | None: The id of the value, None if unknown.
+        """
+
+    @abstractmethod
+    async def get_or_create(self, name: str) -> Tuple[int, str]:
+        """The abstract method for getting the id, registering unknown values.
+
+        Args:
+            name (str): The value as entered.
+
+        Returns:
+            Tuple[int, str]: The id and the stored display name.
+        """
+
+    @abstractmethod
+    def get_name(self, dimension_id: int) -> str | None:
+        """The abstract method for getting the display name of an id.
+
+        Args:
+            dimension_id (int): The id of the value.
+
+        Returns:
+            str | None: The display name, None if not cached yet.
+        """
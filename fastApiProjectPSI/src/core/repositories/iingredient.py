@@ -0,0 +1,30 @@
+"""Module containing ingredient repository abstractions."""
+
+from abc import ABC, abstractmethod
+from typing import Iterable, List
+
+
+class IIngredientRepository(ABC):
+    """An abstract class representing the ingredient dictionary."""
+
+    @abstractmethod
+    async def get_ids(self, names: Iterable[str]) -> List[int | None]:
+        """The abstract method for getting ids of known ingredients.
+
+        Args:
+            names (Iterable[str]): The ingredient names.
+
+        Returns:
+            List[int | None]: The id of every name, None if unknown.
+        """
+
+    @abstractmethod
+    async def get_or_create_ids(self, names: Iterable[str]) -> List[int]:
+        """The abstract method for getting ids, registering unknown names.
+
+        Args:
+            names (Iterable[str]): The ingredient names.
+
+        Returns:
+            List[int]: The distinct ids in order of first appearance.
+        """
@@ -1,21 +1,26 @@
 """Module containing meal repository abstractions"""
 
 from abc import ABC, abstractmethod
-from typing import Any, Iterable, List
+from typing import Any, Iterable, List, Sequence, Tuple
 
-from src.infrastructure.dto.mealdto import MealDTO
-from src.core.domain.meal import MealBroker
+from src.infrastructure.dto.mealdto import MealDTO, MealNameDTO
+from src.infrastructure.dto.searchdto import FacetDTO, MealSearchDTO
+from src.core.domain.meal import MealBroker, MealFilter, MealPatch
 
 class IMealRepository(ABC):
     """An abstract class representing a meal repository"""
 
     @abstractmethod
-    async def get_all_meals(self) -> Iterable[Any]:
+    async def get_all_meals(
+        self,
+        fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
         """
         The abstract method for getting all meals from the database.
 
         Args:
-            None.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
 
         Returns:
             Iterable[Any]
@@ -33,49 +38,156 @@ class IMealRepository(ABC):
         """
 
     @abstractmethod
-    async def get_by_user(self, user_id: int) -> Iterable[Any]:
+    async def get_by_ids(
+        self,
+        meal_ids: Iterable[int],
+        fields: Sequence[str] | None = None,
+    ) -> List[Any]:
+        """The abstract method for getting meals by provided ids.
+
+        Args:
+            meal_ids (Iterable[int]): The ids of the meals.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
+
+        Returns:
+            List[Any]: The found meals ordered by id.
+        """
+
+    @abstractmethod
+    async def get_by_user(
+        self,
+        user_id: int,
+        fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
         """The abstract getting meals by user who added them.
 
         Args:
             user_id (int): The id of the user.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
 
         Returns:
             Iterable[Any]: The meal collection.
         """
 
     @abstractmethod
-    async def get_by_name(self, meal_name: str) -> Any | None:
+    async def get_by_name(
+        self,
+        meal_name: str,
+        fields: Sequence[str] | None = None,
+    ) -> Any | None:
         """The abstract method for getting a meal recipe by provided meal name.
 
         Args:
             meal_name (str): The name of the meal.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
 
         Returns:
             Any | None: The meal details available.
         """
 
     @abstractmethod
-    async def get_by_category(self, meal_category: str) -> Any | None:
+    async def get_by_category(
+        self,
+        meal_category: str,
+        fields: Sequence[str] | None = None,
+    ) -> Any | None:
         """The abstract method for getting a meal recipe by provided meal category.
 
         Args:
             meal_category (str): The category of the meal.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
 
         Returns:
             Any | None: The meal details available.
         """
 
     @abstractmethod
-    async def get_by_area(self, meal_area: str) -> Any | None:
+    async def get_by_area(
+        self,
+        meal_area: str,
+        fields: Sequence[str] | None = None,
+    ) -> Any | None:
         """The abstract method for getting a meal recipe by provided meal area.
 
         Args:
             meal_area (str): The area of the meal.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
 
         Returns:
             Any | None: The meal details available.
         """
 
+    @abstractmethod
+    async def get_by_tags(
+        self,
+        tags: Sequence[str],
+        match_all: bool = True,
+        fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
+        """The abstract method for getting meals labelled with tags.
+
+        Args:
+            tags (Sequence[str]): The tags, compared case-insensitively.
+            match_all (bool, optional): Whether meals need all the tags
+                rather than any of them. Defaults to True.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
+
+        Returns:
+            Iterable[Any]: Meals labelled with the tags.
+        """
+
+    @abstractmethod
+    async def search(self, filters: MealFilter) -> MealSearchDTO:
+        """The abstract method for searching meals matching all filters.
+
+        Args:
+            filters (MealFilter): The search filters.
+
+        Returns:
+            MealSearchDTO: The page of hits with facet counts.
+        """
+
+    @abstractmethod
+    async def get_names(self) -> List[MealNameDTO]:
+        """The abstract method for getting names and ingredients of meals.
+
+        Returns:
+            List[MealNameDTO]: The names of all meals.
+        """
+
+    @abstractmethod
+    async def get_catalog(self, kind: str) -> List[FacetDTO]:
+        """The abstract method for getting distinct values of a facet.
+
+        Args:
+            kind (str): The kind of the facet (category, area, ingredient).
+
+        Returns:
+            List[FacetDTO]: The values with the number of meals.
+        """
+
+    @abstractmethod
+    async def get_favourite_counts(self) -> List[Tuple[int, int]]:
+        """The abstract method for getting favourite counts of meals.
+
+        Returns:
+            List[Tuple[int, int]]: The ids and favourite counts.
+        """
+
+    @abstractmethod
+    async def reconcile_favourite_counts(self) -> int | None:
+        """The abstract method for recounting favourites of all meals.
+
+        Returns:
+            int | None: The number of corrected meals, None if skipped.
+        """
+
     @abstractmethod
     async def add_meal(self, data: MealBroker) -> Any | None:
         """The abstract method for adding a meal to the data storage.
@@ -88,18 +200,50 @@ class IMealRepository(ABC):
         """
 
     @abstractmethod
-    async def delete_meal(self, meal_id: int) -> bool:
+    async def add_meals(self, data: Sequence[MealBroker]) -> List[Any]:
+        """The abstract method for adding several meals at once.
+
+        Args:
+            data (Sequence[MealBroker]): The details of the new meals.
+
+        Returns:
+            List[Any]: The added meals in the order of `data`.
+        """
+
+    @abstractmethod
+    async def patch_meal(
+        self,
+        meal_id: int,
+        patch: MealPatch,
+    ) -> Tuple[Any, Any] | None:
+        """The abstract method for writing provided fields of a meal.
+
+        Args:
+            meal_id (int): The id of the meal.
+            patch (MealPatch): The provided fields and ingredient edits.
+
+        Returns:
+            Tuple[Any, Any] | None: The category and area of the meal before
+                the patch and the patched meal, None if it does not exist.
+        """
+
+    @abstractmethod
+    async def delete_meal(self, meal_id: int) -> Any | None:
         """The abstract method for deleting a meal from the data storage.
 
         Args:
             meal_id (int): The id of the meal.
 
         Returns:
-            bool: True if the meal was successfully deleted.
+            Any | None: The deleted meal, None if it did not exist.
         """
 
     @abstractmethod
-    async def update_meal(self, meal_id: int, data: MealBroker) -> Any | None:
+    async def update_meal(
+        self,
+        meal_id: int,
+        data: MealBroker,
+    ) -> Tuple[Any, Any] | None:
         """The abstract method for updating a meal in the data storage.
 
         Args:
@@ -107,7 +251,8 @@ class IMealRepository(ABC):
             data (MealBroker): The details of the new meal.
 
         Returns:
-            Any | None: The newly updated meal.
+            Tuple[Any, Any] | None: The meal before and after the update,
+                None if it does not exist.
         """
 
     @abstractmethod
@@ -121,11 +266,17 @@ class IMealRepository(ABC):
             List[MealDTO]: A list of recommended meals.
         """
     @abstractmethod
-    async def get_by_ingredients(self, ingredient_name: str) -> List[dict]:
+    async def get_by_ingredients(
+        self,
+        ingredient_name: str,
+        fields: Sequence[str] | None = None,
+    ) -> List[dict]:
         """The method getting meals by a specific ingredient.
 
         Args:
             ingredient_name (str): The name of the ingredient.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
 
         Returns:
             List[dict]: Meals containing the specified ingredient.
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, List
 
 from pydantic import UUID4
 
@@ -78,9 +78,18 @@ class IUserRepository(ABC):
         """
 
     @abstractmethod
-    async def get_all_users(self) -> list[Any] | None:
-        """A method to retrieve all users.
+    async def get_users(
+        self,
+        after: UUID4 | None = None,
+        limit: int = 100,
+    ) -> List[Any]:
+        """A method to retrieve a page of users ordered by UUID.
+
+        Args:
+            after (UUID4 | None, optional): The UUID of the last user of
+                the previous page. Defaults to None.
+            limit (int, optional): The size of the page. Defaults to 100.
 
         Returns:
-            list[Any] | None: A list of user objects if any exist.
-        """
\ No newline at end of file
+            List[Any]: The page of users.
+        """
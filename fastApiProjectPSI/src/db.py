@@ -1,19 +1,28 @@
 """A module providing database access."""
 
 import asyncio
+import logging
+import time
+from typing import Any, Iterable, List
 
+import asyncpg  # type: ignore
 import databases
 import sqlalchemy
+from databases.interfaces import Record
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.exc import OperationalError, DatabaseError
-from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
 from sqlalchemy.ext.mutable import MutableList
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.sql import ClauseElement
 from src.config import config
 from asyncpg.exceptions import (    # type: ignore
     CannotConnectNowError,
     ConnectionDoesNotExistError,
 )
 
+logger = logging.getLogger(__name__)
+
 metadata = sqlalchemy.MetaData()
 
 user_table = sqlalchemy.Table(
@@ -33,8 +42,38 @@ user_table = sqlalchemy.Table(
         nullable=True,
         default=[],
     ),
+    sqlalchemy.Column(
+        "favourite_ids",
+        sqlalchemy.ARRAY(sqlalchemy.Integer),
+        nullable=True,
+        default=[],
+    ),
 )
 
+
+
+def _dimension_table(name: str) -> sqlalchemy.Table:
+    """Function defining a lookup table of a meal attribute.
+
+    Args:
+        name (str): The name of the table.
+
+    Returns:
+        sqlalchemy.Table: The table of ids, case-folded keys and names.
+    """
+
+    return sqlalchemy.Table(
+        name,
+        metadata,
+        sqlalchemy.Column("id", sqlalchemy.SmallInteger, primary_key=True),
+        sqlalchemy.Column("key", sqlalchemy.String, unique=True, nullable=False),
+        sqlalchemy.Column("name", sqlalchemy.String, nullable=False),
+    )
+
+
+category_table = _dimension_table("categories")
+area_table = _dimension_table("areas")
+
 meal_table = sqlalchemy.Table(
     "meals",
     metadata,
@@ -58,6 +97,34 @@ meal_table = sqlalchemy.Table(
     sqlalchemy.Column("strMealThumb", sqlalchemy.String, nullable=True),
     sqlalchemy.Column("strTags", sqlalchemy.String, nullable=True),
     sqlalchemy.Column("strYoutube", sqlalchemy.String, nullable=True),
+    sqlalchemy.Column(
+        "tags",
+        sqlalchemy.ARRAY(sqlalchemy.Text),
+        nullable=True,
+    ),
+    sqlalchemy.Column(
+        "ingredient_ids",
+        sqlalchemy.ARRAY(sqlalchemy.Integer),
+        nullable=True,
+    ),
+    sqlalchemy.Column(
+        "favourite_count",
+        sqlalchemy.Integer,
+        nullable=False,
+        server_default=sqlalchemy.text("0"),
+    ),
+    sqlalchemy.Column(
+        "category_id",
+        sqlalchemy.SmallInteger,
+        sqlalchemy.ForeignKey("categories.id"),
+        nullable=True,
+    ),
+    sqlalchemy.Column(
+        "area_id",
+        sqlalchemy.SmallInteger,
+        sqlalchemy.ForeignKey("areas.id"),
+        nullable=True,
+    ),
     sqlalchemy.Column(
         "user_id",
         UUID(as_uuid=True),
@@ -67,14 +134,60 @@ meal_table = sqlalchemy.Table(
     sqlalchemy.ForeignKeyConstraint(['user_id'], ['users.id'])
 )
 
+ingredient_table = sqlalchemy.Table(
+    "ingredients",
+    metadata,
+    sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+    sqlalchemy.Column("name", sqlalchemy.String, unique=True, nullable=False),
+)
+
+meal_facet_table = sqlalchemy.Table(
+    "meal_facets",
+    metadata,
+    sqlalchemy.Column("kind", sqlalchemy.String, primary_key=True),
+    sqlalchemy.Column("value", sqlalchemy.String, primary_key=True),
+    sqlalchemy.Column(
+        "count",
+        sqlalchemy.Integer,
+        nullable=False,
+        server_default=sqlalchemy.text("0"),
+    ),
+)
+
+sqlalchemy.Index(
+    "ix_meals_strMeal_trgm",
+    meal_table.c.strMeal,
+    postgresql_using="gin",
+    postgresql_ops={"strMeal": "gin_trgm_ops"},
+)
+sqlalchemy.Index("ix_meals_category_id", meal_table.c.category_id)
+sqlalchemy.Index("ix_meals_area_id", meal_table.c.area_id)
+sqlalchemy.Index("ix_meals_favourite_count", meal_table.c.favourite_count)
+sqlalchemy.Index(
+    "ix_meals_ingredients",
+    meal_table.c.ingredients,
+    postgresql_using="gin",
+)
+sqlalchemy.Index(
+    "ix_meals_ingredient_ids",
+    meal_table.c.ingredient_ids,
+    postgresql_using="gin",
+)
+sqlalchemy.Index(
+    "ix_meals_tags",
+    meal_table.c.tags,
+    postgresql_using="gin",
+)
+
 db_uri = (
     f"postgresql+asyncpg://{config.DB_USER}:{config.DB_PASSWORD}"
     f"@{config.DB_HOST}/{config.DB_NAME}"
 )
+db_dsn = db_uri.replace("postgresql+asyncpg://", "postgresql://", 1)
 
 engine = create_async_engine(
     db_uri,
-    echo=True,
+    echo=False,
     future=True,
     pool_pre_ping=True,
 )
@@ -84,21 +197,178 @@ database = databases.Database(
     # force_rollback=True,
 )
 
+# Errors after which a replica is considered down until the next check.
+REPLICA_FAILURES = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.CannotConnectNowError,
+    asyncpg.TooManyConnectionsError,
+    asyncpg.InterfaceError,
+)
+
+
+class ReplicaRouter:
+    """A class routing reads to healthy replicas in turns.
+
+    Reads fall back to the primary when no replica is healthy and for a
+    short time after every meal change, so caches rebuilt after a write
+    never render data a lagging replica has not replayed yet.
+    """
+
+    def __init__(
+        self,
+        primary: databases.Database,
+        replicas: Iterable[databases.Database],
+        stickiness: float,
+    ) -> None:
+        """The initializer of the router.
+
+        Args:
+            primary (databases.Database): The primary database.
+            replicas (Iterable[databases.Database]): The read replicas.
+            stickiness (float): The number of seconds reads stay on the
+                primary after a change.
+        """
+        self._primary = primary
+        self._replicas = list(replicas)
+        self._healthy: List[databases.Database] = []
+        self._stickiness = stickiness
+        self._pinned_until = 0.0
+        self._turn = 0
+
+    async def connect(self) -> None:
+        """The method connecting replicas which are reachable."""
+
+        await self.check()
+
+    async def disconnect(self) -> None:
+        """The method disconnecting all replicas."""
+
+        self._healthy = []
+        for replica in self._replicas:
+            if replica.is_connected:
+                await replica.disconnect()
+
+    async def check(self, timeout: float = 2.0) -> None:
+        """The method checking replicas, reconnecting the ones that are down.
+
+        Args:
+            timeout (float, optional): The maximal time of a check in
+                seconds. Defaults to 2.0.
+        """
+
+        healthy = []
+        for replica in self._replicas:
+            try:
+                if not replica.is_connected:
+                    await asyncio.wait_for(replica.connect(), timeout)
+                await asyncio.wait_for(replica.fetch_val("SELECT 1"), timeout)
+            except REPLICA_FAILURES as e:
+                logger.warning(
+                    "Replica is down",
+                    extra={"replica": replica.url.hostname, "error": repr(e)},
+                )
+                continue
+            healthy.append(replica)
+
+        self._healthy = healthy
+
+    async def monitor(self, interval: float) -> None:
+        """The coroutine checking replicas periodically until cancelled.
+
+        Args:
+            interval (float): The delay between checks in seconds.
+        """
+
+        while True:
+            await asyncio.sleep(interval)
+            await self.check()
+
+    def pin(self) -> None:
+        """The method sending reads to the primary for a while."""
+
+        self._pinned_until = time.monotonic() + self._stickiness
+
+    async def fetch_all(self, query: ClauseElement) -> List[Record]:
+        """The method running a read query on a replica.
+
+        Args:
+            query (ClauseElement): The query.
+
+        Returns:
+            List[Record]: The result rows.
+        """
+
+        return await self._read("fetch_all", query)
+
+    async def fetch_one(self, query: ClauseElement) -> Record | None:
+        """The method running a single-row read query on a replica.
+
+        Args:
+            query (ClauseElement): The query.
+
+        Returns:
+            Record | None: The result row.
+        """
+
+        return await self._read("fetch_one", query)
+
+    async def _read(self, method: str, query: ClauseElement) -> Any:
+        """A private method running a read, retrying it on the primary.
+
+        Args:
+            method (str): The name of the fetching method.
+            query (ClauseElement): The query.
+
+        Returns:
+            Any: The result of the query.
+        """
+
+        if not self._healthy or time.monotonic() < self._pinned_until:
+            return await getattr(self._primary, method)(query)
+
+        self._turn = (self._turn + 1) % len(self._healthy)
+        replica = self._healthy[self._turn]
+        try:
+            return await getattr(replica, method)(query)
+        except REPLICA_FAILURES:
+            if replica in self._healthy:
+                self._healthy.remove(replica)
+            return await getattr(self._primary, method)(query)
+
+
+replicas = ReplicaRouter(
+    primary=database,
+    replicas=[databases.Database(uri) for uri in config.DB_REPLICA_URIS],
+    stickiness=config.DB_REPLICA_STICKINESS,
+)
+
 
 async def init_db(retries: int = 5, delay: int = 10) -> None:
     """Function initializing the DB.
 
+    The first attempt is made immediately, the delay only separates
+    retries.
+
     Args:
         retries (int, optional): Number of retries of connect to DB.
             Defaults to 5.
-        delay (int, optional): Delay of connect do DB. Defaults to 2.
+        delay (int, optional): Delay between retries in seconds.
+            Defaults to 10.
     """
 
-    await asyncio.sleep(delay)
     for attempt in range(retries):
         try:
             async with engine.begin() as conn:
+                await conn.execute(
+                    sqlalchemy.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+                )
                 await conn.run_sync(metadata.create_all)
+                await conn.run_sync(_add_missing_columns)
+                await conn.run_sync(_create_indexes)
+                await _backfill_facets(conn)
+                await _backfill_favourite_ids(conn)
             return
         except (
             OperationalError,
@@ -106,7 +376,137 @@ async def init_db(retries: int = 5, delay: int = 10) -> None:
             CannotConnectNowError,
             ConnectionDoesNotExistError,
         ) as e:
-            print(f"Attempt {attempt + 1} failed: {e}")
-            await asyncio.sleep(delay)
+            logger.warning(
+                "DB initialization failed",
+                extra={"attempt": attempt + 1, "error": repr(e)},
+            )
+            if attempt + 1 < retries:
+                await asyncio.sleep(delay)
 
     raise ConnectionError("Could not connect to DB after several retries.")
+
+
+def _add_missing_columns(conn: sqlalchemy.Connection) -> None:
+    """Function adding columns missing on already existing tables.
+
+    Args:
+        conn (sqlalchemy.Connection): The synchronous DB connection.
+    """
+
+    inspector = sqlalchemy.inspect(conn)
+
+    for table in metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                definition = str(
+                    CreateColumn(column).compile(dialect=conn.dialect),
+                )
+                for key in column.foreign_keys:
+                    definition += (
+                        f' REFERENCES "{key.column.table.name}"'
+                        f' ("{key.column.name}")'
+                    )
+                conn.execute(
+                    sqlalchemy.text(
+                        f'ALTER TABLE "{table.name}" ADD COLUMN {definition}',
+                    ),
+                )
+
+
+def _create_indexes(conn: sqlalchemy.Connection) -> None:
+    """Function creating indexes missing on already existing tables.
+
+    Args:
+        conn (sqlalchemy.Connection): The synchronous DB connection.
+    """
+
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+async def _backfill_facets(conn: AsyncConnection) -> None:
+    """Function filling the facet counters if they were never populated.
+
+    Ingredient counters keyed by names, as stored by earlier versions,
+    are replaced with counters keyed by ingredient ids. Meals without
+    ingredient ids yet are counted once their ids are filled.
+
+    Args:
+        conn (AsyncConnection): The DB connection.
+    """
+
+    kinds = ["category", "area", "ingredient"]
+    if await conn.scalar(sqlalchemy.select(meal_facet_table.c.kind).limit(1)):
+        legacy = sqlalchemy.select(meal_facet_table.c.kind).where(
+            meal_facet_table.c.kind == "ingredient",
+            meal_facet_table.c.value.op("!~")("^[0-9]+$"),
+        ).limit(1)
+        if not await conn.scalar(legacy):
+            return
+        await conn.execute(
+            meal_facet_table.delete()
+            .where(meal_facet_table.c.kind == "ingredient"),
+        )
+        kinds = ["ingredient"]
+
+    ingredient = sqlalchemy.select(
+        meal_table.c.id,
+        sqlalchemy.cast(
+            sqlalchemy.func.unnest(meal_table.c.ingredient_ids),
+            sqlalchemy.String,
+        ).label("value"),
+    ).subquery()
+
+    counts = sqlalchemy.union_all(
+        *(
+            sqlalchemy.select(
+                sqlalchemy.literal(kind, sqlalchemy.String).label("kind"),
+                column.label("value"),
+                sqlalchemy.func.count(sqlalchemy.distinct(id_column)),
+            )
+            .where(column.isnot(None))
+            .group_by(column)
+            for kind, column, id_column in (
+                ("category", meal_table.c.strCategory, meal_table.c.id),
+                ("area", meal_table.c.strArea, meal_table.c.id),
+                ("ingredient", ingredient.c.value, ingredient.c.id),
+            )
+            if kind in kinds
+        ),
+    )
+    await conn.execute(
+        meal_facet_table.insert().from_select(
+            ["kind", "value", "count"],
+            counts,
+        ),
+    )
+
+
+async def _backfill_favourite_ids(conn: AsyncConnection) -> None:
+    """Function filling meal ids of favourites stored only by name.
+
+    A name shared by several meals is resolved to the oldest of them,
+    names of meals which no longer exist are left out.
+
+    Args:
+        conn (AsyncConnection): The DB connection.
+    """
+
+    await conn.execute(sqlalchemy.text(
+        """
+        UPDATE users SET favourite_ids = coalesce((
+            SELECT array_agg(meal.id ORDER BY favourite.position)
+            FROM unnest(users.favourites)
+                WITH ORDINALITY AS favourite(name, position)
+            CROSS JOIN LATERAL (
+                SELECT min(meals.id) AS id
+                FROM meals
+                WHERE meals."strMeal" = favourite.name
+            ) AS meal
+            WHERE meal.id IS NOT NULL
+        ), '{}')
+        WHERE favourite_ids IS NULL
+        """,
+    ))
@@ -0,0 +1,255 @@
+"""A module containing meal change events shared across workers."""
+
+import asyncio
+import logging
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Iterable, List, Tuple
+
+import asyncpg  # type: ignore
+import sqlalchemy
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import cast, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from src.db import database
+
+CHANNEL = "meal_changes"
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+RESET = "reset"
+
+logger = logging.getLogger(__name__)
+
+
+class MealEvent(BaseModel):
+    """Model representing a change of a meal."""
+    id: int
+    kind: str
+    categories: List[str] = []
+    areas: List[str] = []
+    origin: str = ""
+
+    @classmethod
+    def of(cls, kind: str, meal_id: int, *meals: Any) -> "MealEvent":
+        """A method preparing an event based on meal states.
+
+        Args:
+            kind (str): The kind of the change.
+            meal_id (int): The id of the changed meal.
+            *meals (Any): The meal states before and after the change.
+
+        Returns:
+            MealEvent: The event instance.
+        """
+
+        meals = tuple(meal for meal in meals if meal)
+
+        return cls(
+            id=meal_id,
+            kind=kind,
+            categories=sorted({m.strCategory for m in meals if m.strCategory}),
+            areas=sorted({m.strArea for m in meals if m.strArea}),
+        )
+
+
+class MealSubscriber(ABC):
+    """An abstract class of components reacting to meal changes."""
+
+    @abstractmethod
+    async def handle(self, event: MealEvent, meal: Any | None) -> None:
+        """The abstract method applying a meal change.
+
+        Args:
+            event (MealEvent): The change event.
+            meal (Any | None): The meal after the change if known locally,
+                None for deletions and for changes made by other workers.
+        """
+
+
+class MealEventBus:
+    """A class publishing meal changes to this and all other workers.
+
+    Changes made by other workers are applied one at a time in the order
+    they were received, so a slow subscriber cannot apply an older change
+    after a newer one.
+    """
+
+    def __init__(self, subscribers: Iterable[MealSubscriber] = ()) -> None:
+        """The initializer of the event bus.
+
+        Args:
+            subscribers (Iterable[MealSubscriber], optional): The components
+                notified about every change. Defaults to ().
+        """
+        self.origin = uuid.uuid4().hex
+        self._subscribers = list(subscribers)
+        self._received: asyncio.Queue[MealEvent] = asyncio.Queue()
+
+    async def publish(self, event: MealEvent, meal: Any | None = None) -> None:
+        """The method applying a change locally and notifying other workers.
+
+        The change is already stored, so a failed notification is only
+        reported and other workers catch up on their next reset.
+
+        Args:
+            event (MealEvent): The change event.
+            meal (Any | None, optional): The meal after the change.
+                Defaults to None.
+        """
+
+        event.origin = self.origin
+        await self._dispatch(event, meal)
+
+        query = select(func.pg_notify(CHANNEL, event.model_dump_json()))
+        await self._notify(database.execute(query))
+
+    async def publish_many(
+        self,
+        changes: Iterable[Tuple[MealEvent, Any]],
+    ) -> None:
+        """The method publishing several changes with a single query.
+
+        All rows of the query are fetched, as every row sends one
+        notification. A failed notification is only reported, as in
+        publish().
+
+        Args:
+            changes (Iterable[Tuple[MealEvent, Any]]): The change events with
+                the meals after the changes.
+        """
+
+        payloads = []
+        for event, meal in changes:
+            event.origin = self.origin
+            await self._dispatch(event, meal)
+            payloads.append(event.model_dump_json())
+
+        if not payloads:
+            return
+
+        notifications = func.unnest(
+            cast(payloads, ARRAY(sqlalchemy.Text)),
+        ).table_valued("payload").render_derived()
+        query = select(func.pg_notify(CHANNEL, notifications.c.payload))
+        await self._notify(database.fetch_all(query))
+
+    async def listen(self, dsn: str, retry_delay: float = 5.0) -> None:
+        """The coroutine receiving changes made by other workers.
+
+        It runs until cancelled and reconnects on connection loss. After
+        every reconnection subscribers get a reset event, as changes made
+        in the meantime were missed.
+
+        Args:
+            dsn (str): The DSN of the database.
+            retry_delay (float, optional): The delay between reconnection
+                attempts in seconds. Defaults to 5.0.
+        """
+
+        connected_before = False
+        consumer = asyncio.create_task(self._consume())
+
+        try:
+            while True:
+                lost = asyncio.Event()
+                try:
+                    connection = await asyncpg.connect(dsn)
+                except (OSError, asyncpg.PostgresError) as e:
+                    logger.warning(
+                        "Listening for events failed",
+                        extra={"channel": CHANNEL, "error": repr(e)},
+                    )
+                    await asyncio.sleep(retry_delay)
+                    continue
+
+                try:
+                    connection.add_termination_listener(lambda _: lost.set())
+                    await connection.add_listener(
+                        CHANNEL,
+                        self._on_notification,
+                    )
+
+                    if connected_before:
+                        self._received.put_nowait(MealEvent(id=0, kind=RESET))
+                    connected_before = True
+
+                    await lost.wait()
+                finally:
+                    if not connection.is_closed():
+                        await connection.close()
+
+                await asyncio.sleep(retry_delay)
+        finally:
+            consumer.cancel()
+
+    async def _consume(self) -> None:
+        """A private coroutine applying received changes in their order.
+
+        It runs until cancelled. A change failing to apply is reported
+        and the next one is applied.
+        """
+
+        while True:
+            event = await self._received.get()
+            try:
+                await self._dispatch(event, None)
+            except Exception as e:  # pylint: disable=broad-except
+                logger.error(
+                    "Applying event failed",
+                    extra={"channel": CHANNEL},
+                    exc_info=e,
+                )
+            finally:
+                self._received.task_done()
+    def _on_notification(
+        self,
+        _connection: Any,
+        _pid: int,
+        _channel: str,
+        payload: str,
+    ) -> None:
+        """A private callback queueing a received event for dispatch.
+
+        Args:
+            _connection (Any): The listening connection.
+            _pid (int): The PID of the notifying backend.
+            _channel (str): The name of the channel.
+            payload (str): The JSON-encoded event.
+        """
+
+        try:
+            event = MealEvent.model_validate_json(payload)
+        except ValidationError:
+            return
+
+        if event.origin != self.origin:
+            self._received.put_nowait(event)
+
+    async def _notify(self, query: Awaitable[Any]) -> None:
+        """A private method running a notifying query, reporting failures.
+
+        Args:
+            query (Awaitable[Any]): The pending notifying query.
+        """
+
+        try:
+            await query
+        except Exception as e:  # pylint: disable=broad-except
+            logger.error(
+                "Publishing event failed",
+                extra={"channel": CHANNEL},
+                exc_info=e,
+            )
+
+    async def _dispatch(self, event: MealEvent, meal: Any | None) -> None:
+        """A private method passing an event to all subscribers.
+
+        Args:
+            event (MealEvent): The change event.
+            meal (Any | None): The meal after the change, if known.
+        """
+
+        for subscriber in self._subscribers:
+            await subscriber.handle(event, meal)
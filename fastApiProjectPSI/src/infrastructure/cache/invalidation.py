@@ -0,0 +1,135 @@
+"""A module keeping in-process meal caches in sync with meal changes."""
+
+from typing import Any, Sequence, Set
+
+from src.core.repositories.imeal import IMealRepository
+from src.db import replicas
+from src.infrastructure.cache.events import (
+    DELETED,
+    RESET,
+    MealEvent,
+    MealSubscriber,
+)
+from src.infrastructure.cache.pantry import PantryIndex
+from src.infrastructure.cache.snapshot import SnapshotStore
+from src.infrastructure.cache.suggest import SuggestIndex
+from src.infrastructure.utils.names import normalize_name
+
+CATALOG_KINDS = ("category", "area", "ingredient")
+
+
+def category_key(category: str) -> str:
+    """A function returning snapshot key of a category.
+
+    Args:
+        category (str): The name of the category, as entered or stored.
+
+    Returns:
+        str: The snapshot key.
+    """
+
+    return f"category:{normalize_name(category)}"
+
+
+def area_key(area: str) -> str:
+    """A function returning snapshot key of an area.
+
+    Args:
+        area (str): The name of the area, as entered or stored.
+
+    Returns:
+        str: The snapshot key.
+    """
+
+    return f"area:{normalize_name(area)}"
+
+
+def catalog_key(kind: str) -> str:
+    """A function returning snapshot key of a facet catalog.
+
+    Args:
+        kind (str): The kind of the facet.
+
+    Returns:
+        str: The snapshot key.
+    """
+
+    return f"catalog:{kind}"
+
+
+def projection_key(key: str, fields: Sequence[str] | None) -> str:
+    """A function returning snapshot key of a projected collection.
+
+    Variants are invalidated together with the key of the collection.
+
+    Args:
+        key (str): The snapshot key of the collection.
+        fields (Sequence[str] | None): The projected fields, all fields
+            if not provided.
+
+    Returns:
+        str: The snapshot key.
+    """
+
+    return key if fields is None else f"{key}?fields={','.join(fields)}"
+
+
+class MealCacheSync(MealSubscriber):
+    """A class applying meal changes to snapshots and in-process indexes."""
+
+    def __init__(
+        self,
+        repository: IMealRepository,
+        snapshots: SnapshotStore,
+        suggestions: SuggestIndex,
+        pantry: PantryIndex,
+    ) -> None:
+        """The initializer of the cache synchronizer.
+
+        Args:
+            repository (IMealRepository): The reference to the repository.
+            snapshots (SnapshotStore): The store of rendered collections.
+            suggestions (SuggestIndex): The typeahead prefix index.
+            pantry (PantryIndex): The meal-ingredient bitset matrix.
+        """
+        self._repository = repository
+        self._snapshots = snapshots
+        self._suggestions = suggestions
+        self._pantry = pantry
+
+    async def handle(self, event: MealEvent, meal: Any | None) -> None:
+        """The method applying a meal change to the caches.
+
+        Args:
+            event (MealEvent): The change event.
+            meal (Any | None): The meal after the change if known locally.
+        """
+
+        replicas.pin()
+
+        if event.kind == RESET:
+            self._snapshots.invalidate()
+            self._suggestions.reset()
+            self._pantry.reset()
+            return
+
+        keys: Set[str] = {"all", *map(catalog_key, CATALOG_KINDS)}
+        keys.update(map(category_key, event.categories))
+        keys.update(map(area_key, event.areas))
+        self._snapshots.invalidate(keys)
+
+        indexes = [
+            index for index in (self._suggestions, self._pantry)
+            if index.is_loaded or index.is_loading
+        ]
+        if not indexes:
+            return
+
+        if event.kind != DELETED and meal is None:
+            meal = await self._repository.get_by_id(event.id)
+
+        for index in indexes:
+            if meal:
+                index.upsert(meal)
+            else:
+                index.remove(event.id)
@@ -0,0 +1,291 @@
+"""A module containing the in-process meal-ingredient bitset matrix."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Tuple
+
+from src.infrastructure.utils.ingredients import normalize_ingredient
+from src.infrastructure.utils.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+Loader = Callable[[], Awaitable[Iterable[Any]]]
+
+# (meal id, meal name, owned ingredients, required ingredients,
+# names of missing ingredients)
+Match = Tuple[int, str, int, int, List[str]]
+
+
+class PantryIndex:
+    """A class keeping ingredients of every meal as a row of bits.
+
+    Every distinct normalized ingredient gets a bit, so the number of owned
+    ingredients of all meals is a single vectorized popcount of the matrix
+    masked with the pantry.
+    """
+
+    def __init__(self) -> None:
+        """The initializer of the pantry index."""
+        self._pending: List[Tuple[str, Any]] | None = None
+        self._lock = asyncio.Lock()
+        self._clear()
+
+    def _clear(self) -> None:
+        """A private method dropping all indexed meals.
+
+        The arrays are allocated by `load`, so numpy is not imported
+        until the index is used.
+        """
+
+        self._bits: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._matrix: Any = None
+        self._required: Any = None
+        self._alive: Any = None
+        self._ids: Any = None
+        self._meal_names: List[str] = []
+        self._rows: Dict[int, int] = {}
+        self._free: List[int] = []
+        self.is_loaded = False
+
+    def _allocate(self) -> None:
+        """A private method creating empty arrays of the index."""
+
+        self._matrix = np.zeros((0, 1), dtype=np.uint64)
+        self._required = np.zeros(0, dtype=np.int64)
+        self._alive = np.zeros(0, dtype=np.bool_)
+        self._ids = np.zeros(0, dtype=np.int64)
+
+    @property
+    def is_loading(self) -> bool:
+        """The property telling whether the index is being built.
+
+        Returns:
+            bool: True while the meals are being fetched.
+        """
+
+        return self._pending is not None
+
+    async def load(self, loader: Loader) -> None:
+        """The method building the index if it was not built yet.
+
+        Writes applied while the meals are being fetched are replayed
+        once the index is built.
+
+        Args:
+            loader (Loader): The coroutine function returning all meals.
+        """
+
+        async with self._lock:
+            if self.is_loaded:
+                return
+
+            self._pending = []
+            try:
+                meals = await loader()
+            except BaseException:
+                self._pending = None
+                raise
+
+            self._allocate()
+            for meal in meals:
+                self._add(meal)
+
+            pending, self._pending = self._pending, None
+            self.is_loaded = True
+
+            for operation, arguments in pending:
+                getattr(self, operation)(*arguments)
+
+    def upsert(self, meal: Any) -> None:
+        """The method adding a meal or replacing its previous version.
+
+        Args:
+            meal (Any): The meal with `id`, `strMeal` and `ingredients`.
+        """
+
+        if self._pending is not None:
+            self._pending.append(("upsert", (meal,)))
+            return
+        if not self.is_loaded:
+            return
+
+        self.remove(meal.id)
+        self._add(meal)
+
+    def remove(self, meal_id: int) -> None:
+        """The method removing a meal from the index.
+
+        Args:
+            meal_id (int): The id of the meal.
+        """
+
+        if self._pending is not None:
+            self._pending.append(("remove", (meal_id,)))
+            return
+        if not self.is_loaded:
+            return
+
+        if (row := self._rows.pop(meal_id, None)) is None:
+            return
+
+        self._matrix[row] = 0
+        self._required[row] = 0
+        self._alive[row] = False
+        self._meal_names[row] = ""
+        self._free.append(row)
+
+    def reset(self) -> None:
+        """The method dropping the index, so it is built again on next use."""
+
+        if self._pending is not None:
+            self._pending.append(("reset", ()))
+            return
+
+        self._clear()
+
+    def match(
+        self,
+        ingredients: Iterable[str],
+        limit: int = 20,
+        min_coverage: float = 0.0,
+    ) -> List[Match]:
+        """The method ranking meals by the share of owned ingredients.
+
+        Meals are ordered by coverage, then by the number of missing
+        ingredients and by id. Meals without any owned ingredient are
+        never returned.
+
+        Args:
+            ingredients (Iterable[str]): The names of owned ingredients.
+            limit (int, optional): The maximal number of meals.
+                Defaults to 20.
+            min_coverage (float, optional): The minimal share of owned
+                ingredients. Defaults to 0.0.
+
+        Returns:
+            List[Match]: The best matching meals.
+        """
+
+        mask = np.zeros(self._matrix.shape[1], dtype=np.uint64)
+        for ingredient in ingredients:
+            bit = self._bits.get(normalize_ingredient(ingredient))
+            if bit is not None:
+                mask[bit >> 6] |= np.uint64(1 << (bit & 63))
+
+        owned = np.bitwise_count(self._matrix & mask).sum(
+            axis=1,
+            dtype=np.int64,
+        )
+        required = np.maximum(self._required, 1)
+        coverage = owned / required
+
+        candidates = np.flatnonzero(
+            self._alive & (owned > 0) & (coverage >= min_coverage),
+        )
+        order = np.lexsort((
+            self._ids[candidates],
+            self._required[candidates] - owned[candidates],
+            -coverage[candidates],
+        ))
+
+        return [
+            (
+                int(self._ids[row]),
+                self._meal_names[row],
+                int(owned[row]),
+                int(self._required[row]),
+                self._decode(self._matrix[row] & ~mask),
+            )
+            for row in candidates[order[:limit]]
+        ]
+
+    def _add(self, meal: Any) -> None:
+        """A private method indexing a meal which is not indexed yet.
+
+        Args:
+            meal (Any): The meal with `id`, `strMeal` and `ingredients`.
+        """
+
+        bits = {
+            self._bit(ingredient)
+            for ingredient in meal.ingredients or []
+            if normalize_ingredient(ingredient)
+        }
+        row = self._free.pop() if self._free else self._append()
+
+        for bit in bits:
+            self._matrix[row, bit >> 6] |= np.uint64(1 << (bit & 63))
+        self._required[row] = len(bits)
+        self._alive[row] = True
+        self._ids[row] = meal.id
+        self._meal_names[row] = meal.strMeal
+        self._rows[meal.id] = row
+
+    def _append(self) -> int:
+        """A private method adding an empty row, growing arrays if needed.
+
+        Returns:
+            int: The new row.
+        """
+
+        row = len(self._meal_names)
+        if row == len(self._ids):
+            capacity = max(64, 2 * row)
+            self._matrix = np.resize(
+                self._matrix,
+                (capacity, self._matrix.shape[1]),
+            )
+            self._matrix[row:] = 0
+            self._required = np.resize(self._required, capacity)
+            self._alive = np.resize(self._alive, capacity)
+            self._alive[row:] = False
+            self._ids = np.resize(self._ids, capacity)
+
+        self._meal_names.append("")
+
+        return row
+
+    def _bit(self, ingredient: str) -> int:
+        """A private method returning the bit of an ingredient.
+
+        New ingredients get the next free bit and the matrix gets another
+        column of words when all bits are taken.
+
+        Args:
+            ingredient (str): The name of the ingredient.
+
+        Returns:
+            int: The bit of the ingredient.
+        """
+
+        key = normalize_ingredient(ingredient)
+        if (bit := self._bits.get(key)) is not None:
+            return bit
+
+        bit = self._bits[key] = len(self._names)
+        self._names.append(ingredient.strip())
+
+        if bit >> 6 == self._matrix.shape[1]:
+            self._matrix = np.hstack((
+                self._matrix,
+                np.zeros((len(self._matrix), 1), dtype=np.uint64),
+            ))
+
+        return bit
+
+    def _decode(self, words: "np.ndarray") -> List[str]:
+        """A private method returning names of ingredients set in a row.
+
+        Args:
+            words (np.ndarray): The words of the row.
+
+        Returns:
+            List[str]: The names of the ingredients.
+        """
+
+        bits = np.flatnonzero(np.unpackbits(
+            words.view(np.uint8),
+            bitorder="little",
+        ))
+
+        return [self._names[bit] for bit in bits]
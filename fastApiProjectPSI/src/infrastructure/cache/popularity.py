@@ -0,0 +1,149 @@
+"""A module containing the in-process ranking of meals by favourites."""
+
+import asyncio
+import heapq
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Tuple
+
+# (meal id, number of users who favourited the meal)
+Count = Tuple[int, int]
+Loader = Callable[[], Awaitable[Iterable[Count]]]
+Reconciler = Callable[[], Awaitable[int | None]]
+
+logger = logging.getLogger(__name__)
+
+
+class PopularityIndex:
+    """A class keeping favourite counts of meals with the most popular on top.
+
+    Counts are reloaded from the database periodically, so changes made
+    by other workers show up within the refresh interval, while changes
+    made by this worker are applied at once. The version grows with every
+    change of the counts, so rankings derived from them can be reused
+    until it changes.
+    """
+
+    def __init__(self, capacity: int = 100) -> None:
+        """The initializer of the popularity index.
+
+        Args:
+            capacity (int, optional): The number of top meals kept ranked.
+                Defaults to 100.
+        """
+        self._capacity = capacity
+        self._counts: Dict[int, int] = {}
+        self._top: List[Count] | None = None
+        self._lock = asyncio.Lock()
+        self.is_loaded = False
+        self.version = 0
+
+    async def refresh(self, loader: Loader) -> None:
+        """The method replacing all counts with the stored ones.
+
+        Changes are applied only after they are stored, so the fetched
+        counts already include them, or the next refresh does.
+
+        Args:
+            loader (Loader): The coroutine function returning the counts
+                of favourited meals.
+        """
+
+        async with self._lock:
+            counts = dict(await loader())
+
+            self.is_loaded = True
+            if counts != self._counts:
+                self._counts = counts
+                self._top = None
+                self.version += 1
+
+    async def monitor(
+        self,
+        loader: Loader,
+        reconcile: Reconciler,
+        refresh_interval: float,
+        reconcile_interval: float,
+    ) -> None:
+        """The coroutine keeping the counts fresh until cancelled.
+
+        Counts are reloaded every refresh interval and recounted from the
+        source of truth every reconcile interval. A failed round is
+        reported and retried in the next one.
+
+        Args:
+            loader (Loader): The coroutine function returning the counts.
+            reconcile (Reconciler): The coroutine function correcting the
+                stored counts, returning the number of corrected meals.
+            refresh_interval (float): The delay between reloads in seconds.
+            reconcile_interval (float): The delay between recounts in
+                seconds.
+        """
+
+        reconciled_at = time.monotonic()
+
+        while True:
+            try:
+                if time.monotonic() - reconciled_at >= reconcile_interval:
+                    reconciled_at = time.monotonic()
+                    if corrected := await reconcile():
+                        logger.info(
+                            "Favourite counts reconciled",
+                            extra={"corrected": corrected},
+                        )
+                await self.refresh(loader)
+            except Exception as e:  # pylint: disable=broad-except
+                logger.warning("Popularity refresh failed", exc_info=e)
+
+            await asyncio.sleep(refresh_interval)
+
+    def adjust(self, meal_id: int, delta: int) -> None:
+        """The method applying a change of the favourite count of a meal.
+
+        Args:
+            meal_id (int): The id of the meal.
+            delta (int): The change of the count.
+        """
+
+        count = max(self._counts.get(meal_id, 0) + delta, 0)
+        if count:
+            self._counts[meal_id] = count
+        else:
+            self._counts.pop(meal_id, None)
+        self._top = None
+        self.version += 1
+
+    def count(self, meal_id: int) -> int:
+        """The method getting the favourite count of a meal.
+
+        Args:
+            meal_id (int): The id of the meal.
+
+        Returns:
+            int: The number of users who favourited the meal.
+        """
+
+        return self._counts.get(meal_id, 0)
+
+    def top(self, limit: int) -> List[Count]:
+        """The method getting the most favourited meals.
+
+        The ranking is selected with a bounded heap once after every
+        change and reused until the next one.
+
+        Args:
+            limit (int): The maximal number of meals.
+
+        Returns:
+            List[Count]: The ids and counts, most favourited first and
+                ties broken by the lower id.
+        """
+
+        if self._top is None:
+            self._top = heapq.nsmallest(
+                self._capacity,
+                self._counts.items(),
+                key=lambda item: (-item[1], item[0]),
+            )
+
+        return self._top[:limit]
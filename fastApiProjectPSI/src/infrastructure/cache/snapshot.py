@@ -0,0 +1,248 @@
+"""A module containing pre-rendered, pre-compressed response snapshots."""
+
+import asyncio
+import gzip
+import hashlib
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Set, Tuple
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover
+    brotli = None
+
+# A builder returns None for an empty collection, which is not stored.
+Builder = Callable[[], Awaitable[bytes | None]]
+
+
+class Snapshot:
+    """A class holding a rendered body in all supported encodings.
+
+    Values computed from the body, e.g. reordered renders, may be kept in
+    `derived`, so they are dropped together with the snapshot.
+    """
+
+    __slots__ = ("identity", "gzip", "br", "etag", "derived")
+
+    def __init__(self, body: bytes) -> None:
+        """The initializer of the snapshot.
+
+        Args:
+            body (bytes): The rendered, uncompressed response body.
+        """
+        self.identity = body
+        self.gzip = gzip.compress(body, compresslevel=9, mtime=0)
+        self.br = brotli.compress(body, quality=9) if brotli else None
+        self.etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        self.derived: Dict[str, Any] = {}
+
+    def negotiate(self, accept_encoding: str) -> Tuple[bytes, str | None]:
+        """The method choosing the best body for the client.
+
+        Args:
+            accept_encoding (str): The raw `Accept-Encoding` header.
+
+        Returns:
+            Tuple[bytes, str | None]: The body and its content encoding.
+        """
+        accepted = _parse_accept_encoding(accept_encoding)
+
+        if self.br is not None and accepted.get("br", 0) > 0:
+            return self.br, "br"
+        if accepted.get("gzip", 0) > 0:
+            return self.gzip, "gzip"
+
+        return self.identity, None
+
+
+class SnapshotStore:
+    """A class keeping pre-rendered snapshots keyed by collection name.
+
+    Keys are partly derived from user input, so the store is bounded: the
+    least recently used snapshot is evicted together with its builder and
+    lock, except for pinned keys, and empty collections are never stored.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        pinned: Iterable[str] = (),
+    ) -> None:
+        """The initializer of the snapshot store.
+
+        Args:
+            max_entries (int, optional): The maximal number of snapshots kept.
+                Defaults to 256.
+            pinned (Iterable[str], optional): The keys which are never
+                evicted. Defaults to ().
+        """
+        self._max_entries = max_entries
+        self._pinned = frozenset(pinned)
+        self._snapshots: OrderedDict[str, Snapshot] = OrderedDict()
+        self._builders: Dict[str, Builder] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._generation = 0
+
+    async def get(self, key: str, builder: Builder) -> Snapshot:
+        """The method returning a snapshot, rendering it if needed.
+
+        Args:
+            key (str): The key of the collection.
+            builder (Builder): The coroutine function rendering the body.
+
+        Returns:
+            Snapshot: The snapshot of the collection.
+        """
+
+        if snapshot := self._snapshots.get(key):
+            self._snapshots.move_to_end(key)
+            return snapshot
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+
+        async with lock:
+            if snapshot := self._snapshots.get(key):
+                return snapshot
+
+            snapshot = await self._build(key, builder)
+
+        if key not in self._snapshots and not lock.locked():
+            self._locks.pop(key, None)
+
+        return snapshot
+
+    def invalidate(self, keys: Iterable[str] | None = None) -> None:
+        """The method dropping snapshots and regenerating them in background.
+
+        A key also drops every variant of the collection, i.e. snapshots
+        keyed `<key>?<variant>`.
+
+        Args:
+            keys (Iterable[str] | None, optional): The keys to drop. All
+                snapshots are dropped if not provided. Defaults to None.
+        """
+
+        self._generation += 1
+        if keys is None:
+            keys = list(self._snapshots)
+        else:
+            collections = set(keys)
+            keys = [
+                key for key in self._snapshots
+                if key.partition("?")[0] in collections
+            ]
+
+        for key in keys:
+            if self._snapshots.pop(key, None) and key in self._builders:
+                self._schedule(key, self._builders.pop(key))
+
+    async def _build(self, key: str, builder: Builder) -> Snapshot:
+        """A private method rendering and storing a snapshot.
+
+        Snapshots rendered while an invalidation happened and empty
+        collections are returned to the caller, but never stored.
+
+        Args:
+            key (str): The key of the collection.
+            builder (Builder): The coroutine function rendering the body.
+
+        Returns:
+            Snapshot: The rendered snapshot.
+        """
+
+        generation = self._generation
+        body = await builder()
+        if body is None:
+            return EMPTY
+
+        snapshot = await asyncio.to_thread(Snapshot, body)
+
+        if generation == self._generation:
+            self._evict(len(self._snapshots) + 1 - self._max_entries)
+            self._snapshots[key] = snapshot
+            self._builders[key] = builder
+
+        return snapshot
+
+    def _evict(self, count: int) -> None:
+        """A private method dropping the least recently used snapshots.
+
+        Args:
+            count (int): The number of snapshots to drop.
+        """
+
+        evicted = [
+            key for key in self._snapshots if key not in self._pinned
+        ][:max(count, 0)]
+
+        for key in evicted:
+            del self._snapshots[key]
+            self._builders.pop(key, None)
+            lock = self._locks.get(key)
+            if lock is not None and not lock.locked():
+                del self._locks[key]
+
+    def _schedule(self, key: str, builder: Builder) -> None:
+        """A private method scheduling background regeneration of a snapshot.
+
+        Args:
+            key (str): The key of the collection.
+            builder (Builder): The coroutine function rendering the body.
+        """
+
+        task = asyncio.create_task(self.get(key, builder))
+        self._tasks.add(task)
+        task.add_done_callback(self._on_done)
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        """A private callback releasing a finished regeneration task.
+
+        A failed regeneration is dropped silently, as the snapshot is
+        rendered again by the next reader.
+
+        Args:
+            task (asyncio.Task): The finished task.
+        """
+
+        self._tasks.discard(task)
+        if not task.cancelled():
+            task.exception()
+
+
+# The snapshot served for empty collections, e.g. unknown categories.
+EMPTY = Snapshot(b"[]")
+
+
+def _parse_accept_encoding(header: str) -> Dict[str, float]:
+    """A function parsing `Accept-Encoding` header into quality values.
+
+    Args:
+        header (str): The raw header value.
+
+    Returns:
+        Dict[str, float]: The quality value of every listed coding.
+    """
+
+    accepted: Dict[str, float] = {}
+
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        if not coding:
+            continue
+
+        quality = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+
+        accepted[coding.strip().lower()] = quality
+
+    if "*" in accepted:
+        accepted.setdefault("br", accepted["*"])
+        accepted.setdefault("gzip", accepted["*"])
+
+    return accepted
@@ -0,0 +1,313 @@
+"""A module containing the in-process prefix index for typeahead."""
+
+import asyncio
+import heapq
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Tuple
+
+MEAL = "meal"
+INGREDIENT = "ingredient"
+# Prefixes up to this length match too many entries to rank on every
+# keystroke, so their suggestions are kept ranked.
+SHORT_PREFIX = 2
+
+# (folded key, rank, kind, name, meal id) - rank 0 marks a match at the
+# start of the name, rank 1 a match at the start of one of its words.
+Entry = Tuple[str, int, str, str, int]
+# ((rank, name length, name), (kind, meal id, name)) - the order of a
+# suggestion followed by its identity.
+Ranked = Tuple[Tuple[int, int, str], Tuple[str, int, str]]
+Loader = Callable[[], Awaitable[Iterable[Any]]]
+
+
+def fold(text: str) -> str:
+    """A function folding case, diacritics and whitespace of a text.
+
+    Args:
+        text (str): The raw text.
+
+    Returns:
+        str: The folded text.
+    """
+
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(
+        char for char in decomposed if not unicodedata.combining(char)
+    )
+
+    return " ".join(stripped.casefold().split())
+
+
+class SuggestIndex:
+    """A class keeping a sorted array of folded meal and ingredient names.
+
+    Suggestions of the shortest prefixes, typed first, are additionally
+    kept in rank order, so they are answered without ranking.
+    """
+
+    def __init__(self) -> None:
+        """The initializer of the suggestion index."""
+        self._entries: List[Entry] = []
+        self._short: Dict[str, List[Ranked]] = {}
+        self._meal_entries: Dict[int, List[Entry]] = {}
+        self._meal_ingredients: Dict[int, List[str]] = {}
+        self._ingredients: Dict[str, List[Any]] = {}
+        self._pending: List[Tuple[str, Any]] | None = None
+        self._lock = asyncio.Lock()
+        self.is_loaded = False
+
+    @property
+    def is_loading(self) -> bool:
+        """The property telling whether the index is being built.
+
+        Returns:
+            bool: True while the meals are being fetched.
+        """
+
+        return self._pending is not None
+
+    async def load(self, loader: Loader) -> None:
+        """The method building the index if it was not built yet.
+
+        Writes applied while the meals are being fetched are replayed
+        once the index is built.
+
+        Args:
+            loader (Loader): The coroutine function returning all meals.
+        """
+
+        async with self._lock:
+            if self.is_loaded:
+                return
+
+            self._pending = []
+            try:
+                meals = await loader()
+            except BaseException:
+                self._pending = None
+                raise
+
+            # Sorting once is linear-logarithmic, sorted inserts of every
+            # entry would move the array on each of them.
+            self._entries = [
+                entry for meal in meals for entry in self._add(meal)
+            ]
+            self._entries.sort()
+
+            self._short = {}
+            for prefix, ranked in _short_ranks(self._entries):
+                self._short.setdefault(prefix, []).append(ranked)
+            for suggestions in self._short.values():
+                suggestions.sort()
+
+            pending, self._pending = self._pending, None
+            self.is_loaded = True
+
+            for operation, arguments in pending:
+                getattr(self, operation)(*arguments)
+
+    def upsert(self, meal: Any) -> None:
+        """The method adding a meal or replacing its previous version.
+
+        Args:
+            meal (Any): The meal with `id`, `strMeal` and `ingredients`.
+        """
+
+        if self._pending is not None:
+            self._pending.append(("upsert", (meal,)))
+            return
+        if not self.is_loaded:
+            return
+
+        self.remove(meal.id)
+        entries = self._add(meal)
+        for entry in entries:
+            insort(self._entries, entry)
+        for prefix, ranked in _short_ranks(entries):
+            insort(self._short.setdefault(prefix, []), ranked)
+
+    def remove(self, meal_id: int) -> None:
+        """The method removing a meal from the index.
+
+        Args:
+            meal_id (int): The id of the meal.
+        """
+
+        if self._pending is not None:
+            self._pending.append(("remove", (meal_id,)))
+            return
+        if not self.is_loaded:
+            return
+
+        entries = self._meal_entries.pop(meal_id, [])
+
+        for key in self._meal_ingredients.pop(meal_id, []):
+            ingredient = self._ingredients[key]
+            ingredient[1] -= 1
+            if not ingredient[1]:
+                del self._ingredients[key]
+                entries.append((key, 0, INGREDIENT, ingredient[0], 0))
+
+        for entry in entries:
+            self._discard(entry)
+        for prefix, ranked in _short_ranks(entries):
+            suggestions = self._short[prefix]
+            del suggestions[bisect_left(suggestions, ranked)]
+            if not suggestions:
+                del self._short[prefix]
+
+    def reset(self) -> None:
+        """The method dropping the index, so it is built again on next use."""
+
+        if self._pending is not None:
+            self._pending.append(("reset", ()))
+            return
+
+        self._entries = []
+        self._short = {}
+        self._meal_entries = {}
+        self._meal_ingredients = {}
+        self._ingredients = {}
+        self.is_loaded = False
+
+    def suggest(
+        self,
+        query: str,
+        limit: int = 10,
+    ) -> List[Tuple[str, int | None, str]]:
+        """The method returning names starting with the query.
+
+        The result is the exact top of all matches: names starting with
+        the query first, then shorter names. Suggestions of short prefixes
+        are kept ranked, for longer ones every entry in the range of the
+        prefix is ranked.
+
+        Args:
+            query (str): The typed prefix.
+            limit (int, optional): The maximal number of suggestions.
+                Defaults to 10.
+
+        Returns:
+            List[Tuple[str, int | None, str]]: The kind, meal id and name
+                of every suggestion.
+        """
+
+        prefix = fold(query)
+        if not prefix:
+            return []
+
+        if len(prefix) <= SHORT_PREFIX:
+            return [
+                (kind, meal_id if kind == MEAL else None, name)
+                for _, (kind, meal_id, name) in self._short.get(prefix, [])[
+                    :limit
+                ]
+            ]
+
+        candidates: Dict[Tuple[str, int, str], Tuple[int, int, str]] = {}
+        start = bisect_left(self._entries, (prefix,))
+        # No folded key continues a prefix with the last code point.
+        end = bisect_left(self._entries, (prefix + chr(0x10FFFF),), start)
+
+        for key, rank, kind, name, meal_id in self._entries[start:end]:
+            identity = (kind, meal_id, name)
+            order = (rank, len(name), name)
+            if order < candidates.get(identity, (2, 0, "")):
+                candidates[identity] = order
+
+        best = heapq.nsmallest(
+            limit,
+            candidates.items(),
+            key=lambda item: (item[1], item[0]),
+        )
+
+        return [
+            (kind, meal_id if kind == MEAL else None, name)
+            for (kind, meal_id, name), _ in best
+        ]
+
+    def _add(self, meal: Any) -> List[Entry]:
+        """A private method registering a meal which is not indexed yet.
+
+        The returned entries are left to the caller to place in the sorted
+        array.
+
+        Args:
+            meal (Any): The meal with `id`, `strMeal` and `ingredients`.
+
+        Returns:
+            List[Entry]: The entries of the meal name and of ingredients
+                which were not indexed before.
+        """
+
+        words = fold(meal.strMeal).split(" ")
+        entries = [
+            (
+                " ".join(words[start:]),
+                min(start, 1),
+                MEAL,
+                meal.strMeal,
+                meal.id,
+            )
+            for start in range(len(words))
+            if words[start]
+        ]
+        self._meal_entries[meal.id] = entries
+        new_entries = list(entries)
+
+        keys = []
+        for ingredient in meal.ingredients or []:
+            key = fold(ingredient)
+            if not key or key in keys:
+                continue
+
+            keys.append(key)
+            if key in self._ingredients:
+                self._ingredients[key][1] += 1
+            else:
+                name = ingredient.strip()
+                self._ingredients[key] = [name, 1]
+                new_entries.append((key, 0, INGREDIENT, name, 0))
+        self._meal_ingredients[meal.id] = keys
+
+        return new_entries
+
+    def _discard(self, entry: Entry) -> None:
+        """A private method removing a single entry from the sorted array.
+
+        Args:
+            entry (Entry): The entry to remove.
+        """
+
+        position = bisect_left(self._entries, entry)
+        if position < len(self._entries) and self._entries[position] == entry:
+            del self._entries[position]
+
+
+def _short_ranks(entries: Iterable[Entry]) -> List[Tuple[str, Ranked]]:
+    """A function ranking entries under the short prefixes of their keys.
+
+    An entity matching a prefix with several entries is ranked by the
+    best of them.
+
+    Args:
+        entries (Iterable[Entry]): The entries.
+
+    Returns:
+        List[Tuple[str, Ranked]]: The short prefixes with the rankings.
+    """
+
+    best: Dict[Tuple[str, Tuple[str, int, str]], Tuple[int, int, str]] = {}
+    for key, rank, kind, name, meal_id in entries:
+        identity = (kind, meal_id, name)
+        order = (rank, len(name), name)
+        for length in range(1, min(len(key), SHORT_PREFIX) + 1):
+            prefix = key[:length]
+            if order < best.get((prefix, identity), (2, 0, "")):
+                best[(prefix, identity)] = order
+
+    return [
+        (prefix, (order, identity))
+        for (prefix, identity), order in best.items()
+    ]
@@ -47,4 +47,79 @@ class MealDTO(BaseModel):
             strTags=record_dict.get("strTags"),  # type: ignore
             strYoutube=record_dict.get("strYoutube"),  # type: ignore
             user_id=record_dict.get("user_id"),  # type: ignore
-        )
\ No newline at end of file
+        )
+
+
+class MealViewDTO(BaseModel):
+    """A model representing DTO for a projection of meal data."""
+    id: int
+    strMeal: Optional[str] = None
+    strInstructions: Optional[str] = None
+    ingredients: Optional[List[str]] = None
+    measures: Optional[List[str]] = None
+    strCategory: Optional[str] = None
+    strArea: Optional[str] = None
+    strMealThumb: Optional[str] = None
+    strTags: Optional[str] = None
+    strYoutube: Optional[str] = None
+    user_id: Optional[UUID4] = None
+
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
+
+
+class PopularMealDTO(MealViewDTO):
+    """A DTO model for a meal ranked by the number of favourites."""
+    favourite_count: int
+
+
+class MealNameDTO(BaseModel):
+    """A model representing DTO for names indexed by typeahead."""
+    id: int
+    strMeal: str
+    ingredients: List[str] = []
+
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
+
+
+class MealBatchItemDTO(BaseModel):
+    """A model representing DTO for a meal added within a batch."""
+    index: int
+    id: int
+    strMeal: str
+
+
+class SuggestionDTO(BaseModel):
+    """A model representing DTO for a typeahead suggestion."""
+    kind: str
+    id: Optional[int] = None
+    name: str
+
+
+class PantryMatchDTO(BaseModel):
+    """A model representing DTO for a meal matched against a pantry."""
+    id: int
+    strMeal: str
+    coverage: float
+    owned: int
+    required: int
+    missing: List[str] = []
+
+
+class QuantityDTO(BaseModel):
+    """A model representing DTO for a summed amount of an ingredient."""
+    amount: float
+    unit: str = ""
+
+
+class ShoppingItemDTO(BaseModel):
+    """A model representing DTO for an ingredient of a shopping list."""
+    ingredient: str
+    quantities: List[QuantityDTO] = []
+    notes: List[str] = []
+    meal_ids: List[int] = []
+
+
+class ShoppingListDTO(BaseModel):
+    """A model representing DTO for a consolidated shopping list."""
+    items: List[ShoppingItemDTO] = []
+    missing_ids: List[int] = []
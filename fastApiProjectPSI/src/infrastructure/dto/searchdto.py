@@ -0,0 +1,34 @@
+"""A module containing meal search DTO models."""
+
+from typing import List
+
+from pydantic import BaseModel, ConfigDict
+
+from src.infrastructure.dto.mealdto import MealDTO
+
+
+class FacetDTO(BaseModel):
+    """A DTO model for a single facet value."""
+    value: str
+    count: int
+
+
+class MealFacetsDTO(BaseModel):
+    """A DTO model for facet counts of a meal search."""
+    categories: List[FacetDTO] = []
+    areas: List[FacetDTO] = []
+    ingredients: List[FacetDTO] = []
+
+
+class MealSearchDTO(BaseModel):
+    """A DTO model for a page of meal search results."""
+    total: int
+    limit: int
+    offset: int
+    hits: List[MealDTO] = []
+    facets: MealFacetsDTO
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        extra="ignore",
+    )
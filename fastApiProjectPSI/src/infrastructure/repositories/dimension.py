@@ -0,0 +1,103 @@
+"""A module containing the category and area lookup repository."""
+
+from typing import Any, Dict, Tuple
+
+import sqlalchemy
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from src.core.repositories.idimension import IDimensionRepository
+from src.db import database, replicas
+from src.infrastructure.utils.names import normalize_name
+from src.tracing import traced_methods
+
+
+@traced_methods
+class DimensionRepository(IDimensionRepository):
+    """A class representing a lookup table of a meal attribute.
+
+    Values are matched by their case-folded key, while the display name
+    stored first is kept. Ids and names never change once assigned, so
+    they are cached for the lifetime of the process.
+    """
+
+    def __init__(self, table: sqlalchemy.Table) -> None:
+        """The initializer of the dimension repository.
+
+        Args:
+            table (sqlalchemy.Table): The lookup table.
+        """
+        self._table = table
+        self._ids: Dict[str, int] = {}
+        self._names: Dict[int, str] = {}
+
+    async def get_id(self, name: str) -> int | None:
+        """The method getting the id of a known value.
+
+        Args:
+            name (str): The value as entered, compared case-insensitively.
+
+        Returns:
+            int | None: The id of the value, None if unknown.
+        """
+
+        key = normalize_name(name)
+
+        if key not in self._ids:
+            query = select(self._table) \
+                .where(self._table.c.key == key)
+            if row := await replicas.fetch_one(query):
+                self._remember(row)
+
+        return self._ids.get(key)
+
+    async def get_or_create(self, name: str) -> Tuple[int, str]:
+        """The method getting the id, registering unknown values.
+
+        It must not run inside a transaction which may be rolled back,
+        as the assigned id is cached.
+
+        Args:
+            name (str): The value as entered.
+
+        Returns:
+            Tuple[int, str]: The id and the stored display name.
+        """
+
+        key = normalize_name(name)
+
+        if key not in self._ids:
+            upsert = insert(self._table) \
+                .values(key=key, name=" ".join(name.split()))
+            query = upsert.on_conflict_do_update(
+                index_elements=[self._table.c.key],
+                set_={"key": upsert.excluded.key},
+            ).returning(self._table)
+            self._remember(await database.fetch_one(query))
+
+        dimension_id = self._ids[key]
+
+        return dimension_id, self._names[dimension_id]
+
+    def get_name(self, dimension_id: int) -> str | None:
+        """The method getting the display name of an id.
+
+        Args:
+            dimension_id (int): The id of the value.
+
+        Returns:
+            str | None: The display name, None if not cached yet.
+        """
+
+        return self._names.get(dimension_id)
+
+    def _remember(self, row: Any) -> None:
+        """A private method caching a row of the lookup table.
+
+        Args:
+            row (Any): The row with the id, key and name.
+        """
+
+        self._ids[row["key"]] = row["id"]
+        self._names[row["id"]] = row["name"]
+
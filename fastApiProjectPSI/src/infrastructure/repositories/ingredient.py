@@ -0,0 +1,73 @@
+"""A module containing the ingredient dictionary repository."""
+
+from typing import Dict, Iterable, List
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from src.core.repositories.iingredient import IIngredientRepository
+from src.db import database, ingredient_table, replicas
+from src.infrastructure.utils.ingredients import normalize_ingredient
+from src.tracing import traced_methods
+
+
+@traced_methods
+class IngredientRepository(IIngredientRepository):
+    """A class representing the ingredient dictionary DB repository.
+
+    Ids never change once assigned, so they are cached for the lifetime
+    of the process.
+    """
+
+    def __init__(self) -> None:
+        """The initializer of the ingredient repository."""
+        self._ids: Dict[str, int] = {}
+
+    async def get_ids(self, names: Iterable[str]) -> List[int | None]:
+        """The method getting ids of known ingredients.
+
+        Args:
+            names (Iterable[str]): The ingredient names.
+
+        Returns:
+            List[int | None]: The id of every name, None if unknown.
+        """
+
+        keys = [normalize_ingredient(name) for name in names]
+
+        if missing := sorted(set(keys) - self._ids.keys()):
+            query = select(ingredient_table.c.id, ingredient_table.c.name) \
+                .where(ingredient_table.c.name.in_(missing))
+            rows = await replicas.fetch_all(query)
+            self._ids.update({row["name"]: row["id"] for row in rows})
+
+        return [self._ids.get(key) for key in keys]
+
+    async def get_or_create_ids(self, names: Iterable[str]) -> List[int]:
+        """The method getting ids, registering unknown names.
+
+        It must not run inside a transaction which may be rolled back,
+        as the assigned ids are cached.
+
+        Args:
+            names (Iterable[str]): The ingredient names.
+
+        Returns:
+            List[int]: The distinct ids in order of first appearance.
+        """
+
+        keys = list(dict.fromkeys(
+            key for key in map(normalize_ingredient, names) if key
+        ))
+
+        if missing := sorted(set(keys) - self._ids.keys()):
+            upsert = insert(ingredient_table) \
+                .values([{"name": key} for key in missing])
+            query = upsert.on_conflict_do_update(
+                index_elements=[ingredient_table.c.name],
+                set_={"name": upsert.excluded.name},
+            ).returning(ingredient_table.c.id, ingredient_table.c.name)
+            rows = await database.fetch_all(query)
+            self._ids.update({row["name"]: row["id"] for row in rows})
+
+        return [self._ids[key] for key in keys]
@@ -1,88 +1,297 @@
-from typing import Any, Iterable, List
+import json
+from collections import Counter
+from itertools import zip_longest
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
 
 from pydantic import UUID4
 import sqlalchemy
 from asyncpg import Record  # type: ignore
 from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by, insert
 
+from src.core.repositories.idimension import IDimensionRepository
+from src.core.repositories.iingredient import IIngredientRepository
 from src.core.repositories.imeal import IMealRepository
-from src.core.domain.meal import Meal, MealBroker
+from src.core.domain.meal import Meal, MealBroker, MealFilter, MealPatch
 from src.db import (
+    ingredient_table,
+    meal_facet_table,
     meal_table,
+    user_table,
     database,
+    replicas,
 )
-from src.infrastructure.dto.mealdto import MealDTO
+from src.infrastructure.dto.mealdto import MealDTO, MealNameDTO, MealViewDTO
+from src.infrastructure.dto.searchdto import FacetDTO, MealSearchDTO
+from src.infrastructure.utils.ingredients import normalize_ingredient
+from src.infrastructure.utils.tags import normalize_tags, parse_tags
+from src.tracing import traced_methods
 
+# The key of the advisory lock held while favourite counts are recounted.
+RECONCILE_LOCK = 4_920_001
 
+
+@traced_methods
 class MealRepository(IMealRepository):
     """A class representing meal DB repository."""
-    
-    async def get_all_meals(self) -> Iterable[Any]:
+
+    def __init__(
+        self,
+        ingredients: IIngredientRepository,
+        categories: IDimensionRepository,
+        areas: IDimensionRepository,
+    ) -> None:
+        """The initializer of the meal repository.
+
+        Args:
+            ingredients (IIngredientRepository): The ingredient dictionary.
+            categories (IDimensionRepository): The category lookup.
+            areas (IDimensionRepository): The area lookup.
+        """
+        self._ingredients = ingredients
+        self._categories = categories
+        self._areas = areas
+
+    async def get_all_meals(
+        self,
+        fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
         """The method getting all meals from the data storage.
 
+        Args:
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
+
         Returns:
             Iterable[Any]: Meals in the data storage.
         """
 
         query = (
-            select(meal_table)
+            select(*_columns(fields))
             .order_by(meal_table.c.id.asc()) #strMeal jeśi chcemy sortować po nazwie
         )
-        meals = await database.fetch_all(query)
+        meals = await replicas.fetch_all(query)
 
+        if fields is not None:
+            return [MealViewDTO(**dict(meal)) for meal in meals]
         return [MealDTO.from_record(meal) for meal in meals]
 
-    async def get_by_category(self, category: str) -> Iterable[Any]:
+    async def get_by_category(
+        self,
+        category: str,
+        fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
         """The method getting meals assigned to particular category.
 
         Args:
             category (str): The name of the category.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
 
         Returns:
             Iterable[Any]: Meals assigned to a category.
         """
 
-        query = meal_table \
-        .select() \
-        .where(func.lower(meal_table.c.strCategory) == category.lower()) \
+        if (category_id := await self._categories.get_id(category)) is None:
+            return []
+
+        query = select(*_columns(fields)) \
+        .where(meal_table.c.category_id == category_id) \
         .order_by(meal_table.c.strMeal.asc())
 
-        meals = await database.fetch_all(query)
+        meals = await replicas.fetch_all(query)
+        if fields is not None:
+            return [MealViewDTO(**dict(meal)) for meal in meals]
         return [Meal(**dict(meal)) for meal in meals]
 
-    async def get_by_ingredients(self, ingredient_name: str) -> List[MealDTO]:
+    async def get_by_ingredients(
+        self,
+        ingredient_name: str,
+        fields: Sequence[str] | None = None,
+    ) -> List[Any]:
         """The method getting meals containing a particular ingredient.
 
         Args:
             ingredient_name (str): The name of the ingredient.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
 
         Returns:
-            List[MealDTO]: Meals containing the specified ingredient.
+            List[Any]: Meals containing the specified ingredient.
         """
 
-        query = select(meal_table).where(
-            meal_table.c.ingredients.op('@>')([ingredient_name])
+        [ingredient_id] = await self._ingredients.get_ids([ingredient_name])
+        if ingredient_id is None:
+            return []
+
+        query = select(*_columns(fields)).where(
+            meal_table.c.ingredient_ids.op('@>')([ingredient_id])
         ).order_by(meal_table.c.strMeal.asc())
 
-        meals = await database.fetch_all(query)
+        meals = await replicas.fetch_all(query)
+        if fields is not None:
+            return [MealViewDTO(**dict(meal)) for meal in meals]
         return [MealDTO.from_record(meal) for meal in meals]
 
-    async def get_by_area(self, area: str) -> Iterable[Any]:
+    async def search(self, filters: MealFilter) -> MealSearchDTO:
+        """The method searching meals matching all provided filters.
+
+        Hits, the total count and facet counts are computed by a single
+        statement over a common table expression of matching meals.
+
+        Args:
+            filters (MealFilter): The search filters.
+
+        Returns:
+            MealSearchDTO: The page of hits with facet counts.
+        """
+
+        conditions = []
+        if filters.name:
+            conditions.append(
+                meal_table.c.strMeal.icontains(filters.name, autoescape=True),
+            )
+        if filters.category:
+            category_id = await self._categories.get_id(filters.category)
+            conditions.append(
+                meal_table.c.category_id == category_id
+                if category_id is not None
+                else sqlalchemy.false(),
+            )
+        if filters.area:
+            area_id = await self._areas.get_id(filters.area)
+            conditions.append(
+                meal_table.c.area_id == area_id
+                if area_id is not None
+                else sqlalchemy.false(),
+            )
+        if filters.ingredients:
+            ingredient_ids = await self._ingredients.get_ids(
+                filters.ingredients,
+            )
+            conditions.append(
+                meal_table.c.ingredient_ids.op('@>')(ingredient_ids)
+                if None not in ingredient_ids
+                else sqlalchemy.false(),
+            )
+        if tags := normalize_tags(filters.tags):
+            conditions.append(_has_tags(tags, filters.tag_match == "all"))
+
+        matching = select(meal_table).where(*conditions).cte("matching")
+
+        page = (
+            select(matching)
+            .order_by(*_search_order(matching, filters.sort))
+            .limit(filters.limit)
+            .offset(filters.offset)
+            .subquery("page")
+        )
+        hits = select(
+            func.json_agg(
+                aggregate_order_by(
+                    page.table_valued(),
+                    *_search_order(page, filters.sort),
+                ),
+            ),
+        ).scalar_subquery()
+
+        total = select(func.count()).select_from(matching).scalar_subquery()
+
+        ingredient_id = (
+            select(func.unnest(matching.c.ingredient_ids).label("id"))
+            .subquery("ingredient_id")
+        )
+        ingredient = (
+            select(ingredient_table.c.name.label("value"))
+            .join_from(
+                ingredient_id,
+                ingredient_table,
+                ingredient_table.c.id == ingredient_id.c.id,
+            )
+            .subquery("ingredient")
+        )
+
+        query = select(
+            total.label("total"),
+            hits.label("hits"),
+            _facet(matching.c.strCategory).label("categories"),
+            _facet(matching.c.strArea).label("areas"),
+            _facet(
+                ingredient.c.value,
+                limit=filters.top_ingredients,
+            ).label("ingredients"),
+        )
+        result = await replicas.fetch_one(query)
+
+        return MealSearchDTO(
+            total=result["total"],
+            limit=filters.limit,
+            offset=filters.offset,
+            hits=json.loads(result["hits"] or "[]"),
+            facets={
+                "categories": json.loads(result["categories"] or "[]"),
+                "areas": json.loads(result["areas"] or "[]"),
+                "ingredients": json.loads(result["ingredients"] or "[]"),
+            },
+        )
+
+    async def get_by_area(
+        self,
+        area: str,
+        fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
         """The method getting meals assigned to particular area.
 
         Args:
             area (str): The name of the area.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
 
         Returns:
             Iterable[Any]: Meals assigned to an area.
         """
 
-        query = meal_table \
-        .select() \
-        .where(func.lower(meal_table.c.strArea) == area.lower()) \
+        if (area_id := await self._areas.get_id(area)) is None:
+            return []
+
+        query = select(*_columns(fields)) \
+        .where(meal_table.c.area_id == area_id) \
+        .order_by(meal_table.c.strMeal.asc())
+
+        meals = await replicas.fetch_all(query)
+        if fields is not None:
+            return [MealViewDTO(**dict(meal)) for meal in meals]
+        return [Meal(**dict(meal)) for meal in meals]
+
+    async def get_by_tags(
+        self,
+        tags: Sequence[str],
+        match_all: bool = True,
+        fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
+        """The method getting meals labelled with tags.
+
+        Args:
+            tags (Sequence[str]): The tags, compared case-insensitively.
+            match_all (bool, optional): Whether meals need all the tags
+                rather than any of them. Defaults to True.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
+
+        Returns:
+            Iterable[Any]: Meals labelled with the tags.
+        """
+
+        if not (tags := normalize_tags(tags)):
+            return []
+
+        query = select(*_columns(fields)) \
+        .where(_has_tags(tags, match_all)) \
         .order_by(meal_table.c.strMeal.asc())
 
-        meals = await database.fetch_all(query)
+        meals = await replicas.fetch_all(query)
+        if fields is not None:
+            return [MealViewDTO(**dict(meal)) for meal in meals]
         return [Meal(**dict(meal)) for meal in meals]
 
     async def get_by_id(self, meal_id: int) -> Any | None:
@@ -99,39 +308,78 @@ class MealRepository(IMealRepository):
 
         return MealDTO.from_record(meal) if meal else None
 
-    async def get_by_name(self, name: str) -> Iterable[Any]:
+    async def get_by_ids(
+        self,
+        meal_ids: Iterable[int],
+        fields: Sequence[str] | None = None,
+    ) -> List[Any]:
+        """The method getting meals by provided ids.
+
+        Args:
+            meal_ids (Iterable[int]): The ids of the meals.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
+
+        Returns:
+            List[Any]: The found meals ordered by id.
+        """
+
+        query = select(*_columns(fields)) \
+            .where(meal_table.c.id.in_(set(meal_ids))) \
+            .order_by(meal_table.c.id.asc())
+
+        meals = await replicas.fetch_all(query)
+        if fields is not None:
+            return [MealViewDTO(**dict(meal)) for meal in meals]
+        return [MealDTO.from_record(meal) for meal in meals]
+
+    async def get_by_name(
+        self,
+        name: str,
+        fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
         """The method getting meals by their name.
 
         Args:
             name (str): The name of the meal.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
 
         Returns:
             Iterable[Any]: Meals with the specified name.
         """
 
-        query = meal_table \
-        .select() \
+        query = select(*_columns(fields)) \
         .where(meal_table.c.strMeal.ilike(f"%{name}%")) \
         .order_by(meal_table.c.strMeal.asc())
 
-        meals = await database.fetch_all(query)
+        meals = await replicas.fetch_all(query)
+        if fields is not None:
+            return [MealViewDTO(**dict(meal)) for meal in meals]
         return [Meal(**dict(meal)) for meal in meals]
 
-    async def get_by_user(self, user_id: UUID4) -> Iterable[Any]:
+    async def get_by_user(
+        self,
+        user_id: UUID4,
+        fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
         """The method getting meals by user who added them.
 
         Args:
             user_id (UUID4): The UUID of the user.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
 
         Returns:
             Iterable[Any]: The meal collection.
         """
-        query = meal_table \
-            .select() \
+        query = select(*_columns(fields)) \
             .where(meal_table.c.user_id == user_id) \
             .order_by(meal_table.c.strMeal.asc())
 
-        meals = await database.fetch_all(query)
+        meals = await replicas.fetch_all(query)
+        if fields is not None:
+            return [MealViewDTO(**dict(meal)) for meal in meals]
         return [MealDTO.from_record(meal) for meal in meals]
 
     async def add_meal(self, data: MealBroker) -> Any | None:
@@ -144,66 +392,589 @@ class MealRepository(IMealRepository):
             Any | None: The newly added meal.
         """
 
-        query = meal_table.insert().values(**data.model_dump())
-        new_meal_id = await database.execute(query)
-        new_meal = await self._get_by_id(new_meal_id)
+        ingredient_ids = await self._ingredients.get_or_create_ids(
+            data.ingredients,
+        )
+        dimensions = await self._dimension_values(
+            data.strCategory,
+            data.strArea,
+        )
+
+        async with database.transaction():
+            query = meal_table.insert().values(
+                **data.model_dump(),
+                ingredient_ids=ingredient_ids,
+                tags=parse_tags(data.strTags),
+                **dimensions,
+            )
+            new_meal_id = await database.execute(query)
+            new_meal = await self._get_by_id(new_meal_id)
+            await self._update_facets(None, new_meal)
 
         return Meal(**dict(new_meal)) if new_meal else None
 
+    async def add_meals(self, data: Sequence[MealBroker]) -> List[Meal]:
+        """The method adding several meals in a single transaction.
+
+        The meals are stored with one multi-row INSERT, so either all of
+        them are added or none. Their ids are taken from the sequence
+        beforehand, as neither the order of ids assigned to VALUES rows
+        nor the order of RETURNING rows is guaranteed.
+
+        Args:
+            data (Sequence[MealBroker]): The details of the new meals.
+
+        Returns:
+            List[Meal]: The added meals in the order of `data`.
+        """
+
+        await self._ingredients.get_or_create_ids(
+            ingredient for meal in data for ingredient in meal.ingredients
+        )
+        rows = [
+            {
+                **meal.model_dump(),
+                "ingredient_ids": await self._ingredients.get_or_create_ids(
+                    meal.ingredients,
+                ),
+                "tags": parse_tags(meal.strTags),
+                **await self._dimension_values(meal.strCategory, meal.strArea),
+            }
+            for meal in data
+        ]
+
+        async with database.transaction():
+            query = select(
+                func.nextval(func.pg_get_serial_sequence(meal_table.name, "id")),
+            ).select_from(func.generate_series(1, len(rows)))
+            ids = [row[0] for row in await database.fetch_all(query)]
+            for row, meal_id in zip(rows, ids):
+                row["id"] = meal_id
+
+            query = insert(meal_table).values(rows).returning(meal_table)
+            stored = {
+                meal["id"]: meal for meal in await database.fetch_all(query)
+            }
+            new_meals = [stored[meal_id] for meal_id in ids]
+
+            deltas: Counter = Counter()
+            for meal in new_meals:
+                deltas.update(_facets_of(meal))
+            await self._apply_facet_deltas(deltas)
+
+        return [Meal(**dict(meal)) for meal in new_meals]
+
     async def update_meal(
         self,
         meal_id: int,
         data: MealBroker,
-    ) -> Any | None:
+    ) -> Tuple[Any, Any] | None:
         """The method updating meal data in the data storage.
 
+        The meal before the update is taken from the locked read, so it is
+        exactly the state the update replaced.
+
         Args:
             meal_id (int): The id of the meal.
             data (MealBroker): The details of the updated meal.
 
         Returns:
-            Any | None: The updated meal details.
+            Tuple[Any, Any] | None: The meal before and after the update,
+                None if it does not exist.
         """
 
-        if await self._get_by_id(meal_id):
-            query = (
-                meal_table.update()
-                .where(meal_table.c.id == meal_id)
-                .values(**data.model_dump())
-            )
-            await database.execute(query)
+        ingredient_ids = await self._ingredients.get_or_create_ids(
+            data.ingredients,
+        )
+        dimensions = await self._dimension_values(
+            data.strCategory,
+            data.strArea,
+        )
 
-            meal = await self._get_by_id(meal_id)
+        async with database.transaction():
+            if previous_meal := await self._get_by_id(meal_id, lock=True):
+                query = (
+                    meal_table.update()
+                    .where(meal_table.c.id == meal_id)
+                    .values(
+                        **data.model_dump(),
+                        ingredient_ids=ingredient_ids,
+                        tags=parse_tags(data.strTags),
+                        **dimensions,
+                    )
+                    .returning(meal_table)
+                )
+                meal = await database.fetch_one(query)
+                await self._update_facets(previous_meal, meal)
 
-            return Meal(**dict(meal)) if meal else None
+                return Meal(**dict(previous_meal)), Meal(**dict(meal))
 
         return None
 
-    async def delete_meal(self, meal_id: int) -> bool:
+    async def patch_meal(
+        self,
+        meal_id: int,
+        patch: MealPatch,
+    ) -> Tuple[Any, Any] | None:
+        """The method writing only the changed columns of a meal.
+
+        The locked read only fetches the small columns needed to apply
+        ingredient edits and keep facets consistent. The UPDATE only sets
+        changed columns, so unchanged large values such as the
+        instructions are not rewritten. The whole patched row is returned,
+        as the endpoint responds with the full meal.
+
+        Args:
+            meal_id (int): The id of the meal.
+            patch (MealPatch): The provided fields and ingredient edits.
+
+        Returns:
+            Tuple[Any, Any] | None: The category and area of the meal before
+                the patch and the patched meal, None if it does not exist.
+        """
+
+        # New names are registered outside the transaction, the ids of
+        # the remaining ones were committed with the meal before.
+        await self._ingredients.get_or_create_ids(
+            patch.ingredients or [
+                item.ingredient for item in patch.add_ingredients
+            ],
+        )
+        dimensions = await self._dimension_values(
+            patch.strCategory,
+            patch.strArea,
+        )
+        patch = patch.model_copy(update={
+            column: dimensions[column]
+            for column in ("strCategory", "strArea")
+            if column in patch.model_fields_set
+        })
+
+        async with database.transaction():
+            query = select(
+                meal_table.c.id,
+                meal_table.c.ingredients,
+                meal_table.c.measures,
+                meal_table.c.ingredient_ids,
+                meal_table.c.strCategory,
+                meal_table.c.strArea,
+            ).where(meal_table.c.id == meal_id).with_for_update()
+            if not (previous_meal := await database.fetch_one(query)):
+                return None
+
+            values = _changed_values(previous_meal, patch)
+            if "strCategory" in values:
+                values["category_id"] = dimensions["category_id"]
+            if "strArea" in values:
+                values["area_id"] = dimensions["area_id"]
+            if "strTags" in values:
+                values["tags"] = parse_tags(values["strTags"])
+            if "ingredients" in values:
+                values["ingredient_ids"] = \
+                    await self._ingredients.get_or_create_ids(
+                        values["ingredients"],
+                    )
+
+            if not values:
+                meal = await self._get_by_id(meal_id)
+            else:
+                query = meal_table.update() \
+                    .where(meal_table.c.id == meal_id) \
+                    .values(**values) \
+                    .returning(meal_table)
+                meal = await database.fetch_one(query)
+                await self._update_facets(previous_meal, meal)
+
+        return previous_meal, Meal(**dict(meal))
+
+    async def delete_meal(self, meal_id: int) -> Any | None:
         """The method removing meal from the data storage.
 
         Args:
             meal_id (int): The id of the meal.
 
         Returns:
-            bool: Success of the operation.
+            Any | None: The deleted meal, None if it did not exist.
         """
 
-        if await self._get_by_id(meal_id):
-            query = meal_table \
-                .delete() \
-                .where(meal_table.c.id == meal_id)
-            await database.execute(query)
+        async with database.transaction():
+            if previous_meal := await self._get_by_id(meal_id, lock=True):
+                query = meal_table \
+                    .delete() \
+                    .where(meal_table.c.id == meal_id)
+                await database.execute(query)
+                await self._update_facets(previous_meal, None)
+
+                return Meal(**dict(previous_meal))
+
+        return None
+
+    async def get_names(self) -> List[MealNameDTO]:
+        """The method getting names and ingredients of all meals.
 
-            return True
+        Returns:
+            List[MealNameDTO]: The names of all meals.
+        """
 
-        return False
+        query = select(
+            meal_table.c.id,
+            meal_table.c.strMeal,
+            meal_table.c.ingredients,
+        )
+        meals = await replicas.fetch_all(query)
+
+        return [
+            MealNameDTO(
+                id=meal["id"],
+                strMeal=meal["strMeal"],
+                ingredients=meal["ingredients"] or [],
+            )
+            for meal in meals
+        ]
+
+    async def get_catalog(self, kind: str) -> List[FacetDTO]:
+        """The method getting distinct values of a facet with meal counts.
+
+        Ingredients are counted by their dictionary ids and listed under
+        their canonical names.
+
+        Args:
+            kind (str): The kind of the facet (category, area, ingredient).
 
-    async def _get_by_id(self, meal_id: int) -> Record | None:
+        Returns:
+            List[FacetDTO]: The values with the number of meals.
+        """
+
+        value = meal_facet_table.c.value
+        query = select(meal_facet_table.c.count) \
+            .where(meal_facet_table.c.kind == kind) \
+            .where(meal_facet_table.c.count > 0)
+        if kind == "ingredient":
+            value = ingredient_table.c.name
+            query = query.join(
+                ingredient_table,
+                ingredient_table.c.id
+                == sqlalchemy.cast(meal_facet_table.c.value, sqlalchemy.Integer),
+            )
+        query = query.add_columns(value.label("value")).order_by(value.asc())
+
+        facets = await replicas.fetch_all(query)
+        return [FacetDTO(**dict(facet)) for facet in facets]
+
+    async def get_favourite_counts(self) -> List[Tuple[int, int]]:
+        """The method getting favourite counts of favourited meals.
+
+        Returns:
+            List[Tuple[int, int]]: The ids and favourite counts.
+        """
+
+        query = select(meal_table.c.id, meal_table.c.favourite_count) \
+            .where(meal_table.c.favourite_count > 0)
+
+        counts = await replicas.fetch_all(query)
+        return [(count["id"], count["favourite_count"]) for count in counts]
+
+    async def reconcile_favourite_counts(self) -> int | None:
+        """The method recounting favourites of all meals from user lists.
+
+        Counters drift when favourites change outside of the favourite
+        endpoints, e.g. when users are edited or removed directly. The
+        favourites are counted by meal id. Only one process runs the
+        recount at a time, the others skip it.
+
+        Returns:
+            int | None: The number of corrected meals, None if skipped.
+        """
+
+        async with database.transaction():
+            query = select(func.pg_try_advisory_xact_lock(RECONCILE_LOCK))
+            if not await database.fetch_val(query):
+                return None
+
+            favourite = select(
+                user_table.c.id.label("user_id"),
+                func.unnest(user_table.c.favourite_ids).label("meal_id"),
+            ).subquery("favourite")
+            counts = select(
+                favourite.c.meal_id,
+                func.count(favourite.c.user_id.distinct()).label("count"),
+            ).group_by(favourite.c.meal_id).subquery("counts")
+            expected = select(
+                meal_table.c.id,
+                func.coalesce(counts.c.count, 0).label("count"),
+            ).select_from(
+                meal_table.outerjoin(
+                    counts,
+                    counts.c.meal_id == meal_table.c.id,
+                ),
+            ).subquery("expected")
+
+            query = meal_table.update() \
+                .where(
+                    meal_table.c.id == expected.c.id,
+                    meal_table.c.favourite_count != expected.c.count,
+                ) \
+                .values(favourite_count=expected.c.count) \
+                .returning(meal_table.c.id)
+            corrected = await database.fetch_all(query)
+
+        return len(corrected)
+
+    async def _update_facets(
+        self,
+        previous_meal: Record | None,
+        meal: Record | None,
+    ) -> None:
+        """A private method applying a meal change to the facet counters.
+
+        Args:
+            previous_meal (Record | None): The meal before the change.
+            meal (Record | None): The meal after the change.
+        """
+
+        deltas = _facets_of(meal)
+        deltas.subtract(_facets_of(previous_meal))
+        await self._apply_facet_deltas(deltas)
+
+    async def _apply_facet_deltas(self, deltas: Counter) -> None:
+        """A private method adding changes of meal counts to the facets.
+
+        Args:
+            deltas (Counter): The changes of counts by (kind, value).
+        """
+
+        rows = [
+            {"kind": kind, "value": value, "count": count}
+            for (kind, value), count in sorted(deltas.items())
+            if count
+        ]
+        if not rows:
+            return
+
+        upsert = insert(meal_facet_table).values(rows)
+        await database.execute(
+            upsert.on_conflict_do_update(
+                index_elements=[
+                    meal_facet_table.c.kind,
+                    meal_facet_table.c.value,
+                ],
+                set_={"count": meal_facet_table.c.count + upsert.excluded.count},
+            ),
+        )
+
+        decreased = [
+            (row["kind"], row["value"]) for row in rows if row["count"] < 0
+        ]
+        if decreased:
+            # Only the decreased counters may have dropped to zero.
+            await database.execute(
+                meal_facet_table.delete().where(
+                    sqlalchemy.tuple_(
+                        meal_facet_table.c.kind,
+                        meal_facet_table.c.value,
+                    ).in_(decreased),
+                    meal_facet_table.c.count <= 0,
+                ),
+            )
+
+    async def backfill_ingredient_ids(self, batch_size: int = 500) -> int:
+        """The method filling ingredient ids of meals stored before them.
+
+        Args:
+            batch_size (int, optional): The number of meals updated at once.
+                Defaults to 500.
+
+        Returns:
+            int: The number of updated meals.
+        """
+
+        updated = 0
+
+        while True:
+            query = select(meal_table.c.id, meal_table.c.ingredients) \
+                .where(meal_table.c.ingredient_ids.is_(None)) \
+                .order_by(meal_table.c.id.asc()) \
+                .limit(batch_size)
+            meals = await database.fetch_all(query)
+            if not meals:
+                return updated
+
+            ingredient_ids = [
+                await self._ingredients.get_or_create_ids(
+                    meal["ingredients"] or [],
+                )
+                for meal in meals
+            ]
+
+            async with database.transaction():
+                deltas: Counter = Counter()
+                for meal, ids in zip(meals, ingredient_ids):
+                    query = meal_table.update() \
+                        .where(
+                            meal_table.c.id == meal["id"],
+                            meal_table.c.ingredient_ids.is_(None),
+                        ) \
+                        .values(ingredient_ids=ids) \
+                        .returning(meal_table.c.id)
+                    # Meals filled concurrently are already counted.
+                    if await database.fetch_one(query):
+                        deltas.update(
+                            ("ingredient", str(ingredient_id))
+                            for ingredient_id in ids
+                        )
+                        updated += 1
+                await self._apply_facet_deltas(deltas)
+
+    async def backfill_tags(self, batch_size: int = 500) -> int:
+        """The method filling parsed tags of meals stored before them.
+
+        Args:
+            batch_size (int, optional): The number of meals updated at once.
+                Defaults to 500.
+
+        Returns:
+            int: The number of updated meals.
+        """
+
+        updated = 0
+
+        while True:
+            query = select(meal_table.c.id, meal_table.c.strTags) \
+                .where(meal_table.c.tags.is_(None)) \
+                .order_by(meal_table.c.id.asc()) \
+                .limit(batch_size)
+            meals = await database.fetch_all(query)
+            if not meals:
+                return updated
+
+            async with database.transaction():
+                for meal in meals:
+                    query = meal_table.update() \
+                        .where(
+                            meal_table.c.id == meal["id"],
+                            meal_table.c.tags.is_(None),
+                        ) \
+                        .values(tags=parse_tags(meal["strTags"])) \
+                        .returning(meal_table.c.id)
+                    if await database.fetch_one(query):
+                        updated += 1
+
+    async def backfill_dimension_ids(self, batch_size: int = 500) -> int:
+        """The method filling category and area ids of meals stored before them.
+
+        It is safe to run in several processes at once, a meal changed
+        since it was read is left to the process which changed it.
+
+        Args:
+            batch_size (int, optional): The number of meals updated at once.
+                Defaults to 500.
+
+        Returns:
+            int: The number of updated meals.
+        """
+
+        columns = (
+            meal_table.c.strCategory,
+            meal_table.c.category_id,
+            meal_table.c.strArea,
+            meal_table.c.area_id,
+        )
+        updated = 0
+        last_id = 0
+
+        while True:
+            query = select(
+                meal_table.c.id,
+                meal_table.c.ingredient_ids,
+                *columns,
+            ).where(
+                meal_table.c.id > last_id,
+                sqlalchemy.or_(
+                    meal_table.c.strCategory.is_not(None)
+                    & meal_table.c.category_id.is_(None),
+                    meal_table.c.strArea.is_not(None)
+                    & meal_table.c.area_id.is_(None),
+                ),
+            ).order_by(meal_table.c.id.asc()).limit(batch_size)
+            meals = await database.fetch_all(query)
+            if not meals:
+                return updated
+
+            dimensions = [
+                await self._dimension_values(
+                    meal["strCategory"],
+                    meal["strArea"],
+                )
+                for meal in meals
+            ]
+
+            async with database.transaction():
+                for meal, values in zip(meals, dimensions):
+                    query = meal_table.update() \
+                        .where(
+                            meal_table.c.id == meal["id"],
+                            *(
+                                column.is_not_distinct_from(meal[column.name])
+                                for column in columns
+                            ),
+                        ) \
+                        .values(**values) \
+                        .returning(meal_table.c.id)
+                    if await database.fetch_one(query):
+                        # Facets follow the names normalized to display
+                        # names.
+                        await self._update_facets(
+                            meal,
+                            {**dict(meal), **values},
+                        )
+                        updated += 1
+            last_id = meals[-1]["id"]
+
+    async def _dimension_values(
+        self,
+        category: str | None,
+        area: str | None,
+    ) -> Dict[str, Any]:
+        """A private method resolving the category and area of a meal.
+
+        Names are replaced with the display names stored first, so the
+        same value is spelled the same in every meal. It must not run
+        inside a transaction which may be rolled back.
+
+        Args:
+            category (str | None): The category as entered.
+            area (str | None): The area as entered.
+
+        Returns:
+            Dict[str, Any]: The names and ids of the category and area.
+        """
+
+        values: Dict[str, Any] = {
+            "strCategory": None,
+            "category_id": None,
+            "strArea": None,
+            "area_id": None,
+        }
+        if category and category.strip():
+            values["category_id"], values["strCategory"] = \
+                await self._categories.get_or_create(category)
+        if area and area.strip():
+            values["area_id"], values["strArea"] = \
+                await self._areas.get_or_create(area)
+
+        return values
+
+    async def _get_by_id(
+        self,
+        meal_id: int,
+        lock: bool = False,
+    ) -> Record | None:
         """A private method getting meal from the DB based on its ID.
 
         Args:
             meal_id (int): The ID of the meal.
+            lock (bool, optional): Whether to lock the row until the end of
+                the transaction. Defaults to False.
 
         Returns:
             Any | None: Meal record if exists.
@@ -213,6 +984,8 @@ class MealRepository(IMealRepository):
             .select() \
             .where(meal_table.c.id == meal_id) \
             .order_by(meal_table.c.strMeal.asc())
+        if lock:
+            query = query.with_for_update()
 
         return await database.fetch_one(query)
 
@@ -226,5 +999,171 @@ class MealRepository(IMealRepository):
             List[dict]: A list of recommended meals as dictionaries.
         """
         query = select(meal_table).order_by(func.random()).limit(n)
-        meals = await database.fetch_all(query)
-        return [MealDTO.from_record(meal).model_dump() for meal in meals]
\ No newline at end of file
+        meals = await replicas.fetch_all(query)
+        return [MealDTO.from_record(meal).model_dump() for meal in meals]
+
+
+def _columns(fields: Sequence[str] | None) -> List[Any]:
+    """A function returning selected columns of a meal projection.
+
+    Args:
+        fields (Sequence[str] | None): The projected fields, all columns
+            if not provided.
+
+    Returns:
+        List[Any]: The selectable columns.
+    """
+
+    if fields is None:
+        return [meal_table]
+
+    return [meal_table.c[field] for field in fields]
+
+
+def _search_order(
+    meals: sqlalchemy.FromClause,
+    sort: str,
+) -> List[sqlalchemy.ColumnElement]:
+    """Function listing the ordering of searched meals.
+
+    Args:
+        meals (sqlalchemy.FromClause): The selectable of matching meals.
+        sort (str): The requested order, `name` or `popularity`.
+
+    Returns:
+        List[sqlalchemy.ColumnElement]: The ordering clauses.
+    """
+
+    order = [meals.c.strMeal.asc(), meals.c.id.asc()]
+    if sort == "popularity":
+        order.insert(0, meals.c.favourite_count.desc())
+
+    return order
+
+
+def _has_tags(
+    tags: List[str],
+    match_all: bool,
+) -> sqlalchemy.ColumnElement:
+    """Function building a condition on meal tags served by the GIN index.
+
+    Args:
+        tags (List[str]): The canonical tags.
+        match_all (bool): Whether meals need all the tags rather than any.
+
+    Returns:
+        sqlalchemy.ColumnElement: The containment or overlap condition.
+    """
+
+    value = sqlalchemy.literal(tags, ARRAY(sqlalchemy.Text))
+
+    return meal_table.c.tags.op('@>' if match_all else '&&')(value)
+
+
+def _facet(
+    column: sqlalchemy.ColumnElement,
+    limit: int | None = None,
+) -> sqlalchemy.ScalarSelect:
+    """Function building a scalar subquery aggregating facet counts.
+
+    Args:
+        column (sqlalchemy.ColumnElement): The faceted column.
+        limit (int | None, optional): The number of most frequent values
+            to return. All values are returned if not provided.
+
+    Returns:
+        sqlalchemy.ScalarSelect: The JSON array of value/count objects.
+    """
+
+    count = func.count().label("count")
+    counts = (
+        select(column.label("value"), count)
+        .where(column.isnot(None))
+        .group_by(column)
+        .order_by(count.desc(), column.asc())
+        .limit(limit)
+        .subquery()
+    )
+
+    return select(
+        func.json_agg(
+            aggregate_order_by(
+                func.json_build_object(
+                    "value", counts.c.value,
+                    "count", counts.c.count,
+                ),
+                counts.c.count.desc(),
+                counts.c.value.asc(),
+            ),
+        ),
+    ).scalar_subquery()
+
+
+def _changed_values(meal: Record, patch: MealPatch) -> Dict[str, Any]:
+    """Function computing the columns a patch changes.
+
+    Removed ingredients are dropped with their measures before new ones
+    are appended. Values equal to the stored ones are left out.
+
+    Args:
+        meal (Record): The stored arrays, category and area of the meal.
+        patch (MealPatch): The patch.
+
+    Returns:
+        Dict[str, Any]: The new values by column.
+    """
+
+    values = patch.model_dump(
+        exclude_unset=True,
+        exclude={"add_ingredients", "remove_ingredients"},
+    )
+
+    if patch.add_ingredients or patch.remove_ingredients:
+        removed = set(map(normalize_ingredient, patch.remove_ingredients))
+        entries: List[Tuple[str, str]] = [
+            (ingredient, measure)
+            for ingredient, measure in zip_longest(
+                meal["ingredients"] or [],
+                meal["measures"] or [],
+                fillvalue="",
+            )
+            if normalize_ingredient(ingredient) not in removed
+        ]
+        entries += [
+            (item.ingredient, item.measure) for item in patch.add_ingredients
+        ]
+        values["ingredients"] = [ingredient for ingredient, _ in entries]
+        values["measures"] = [measure for _, measure in entries]
+
+    stored = dict(meal)
+
+    return {
+        column: value
+        for column, value in values.items()
+        if column not in stored or stored[column] != value
+    }
+
+
+def _facets_of(meal: Record | None) -> Counter:
+    """Function listing facet values a meal contributes to.
+
+    Args:
+        meal (Record | None): The meal record.
+
+    Returns:
+        Counter: The number of meals per facet kind and value.
+    """
+
+    if not meal:
+        return Counter()
+
+    facets = Counter(
+        ("ingredient", str(ingredient_id))
+        for ingredient_id in set(meal["ingredient_ids"] or [])
+    )
+    if meal["strCategory"]:
+        facets["category", meal["strCategory"]] += 1
+    if meal["strArea"]:
+        facets["area", meal["strArea"]] += 1
+
+    return facets
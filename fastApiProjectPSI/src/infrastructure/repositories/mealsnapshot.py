@@ -0,0 +1,916 @@
+"""A module containing the in-memory columnar meal repository."""
+
+import asyncio
+import zlib
+from types import SimpleNamespace
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Sequence,
+    Tuple,
+    Type,
+)
+
+from pydantic import UUID4, BaseModel
+
+from src.core.domain.meal import (
+    MEAL_FIELDS,
+    Meal,
+    MealBroker,
+    MealFilter,
+    MealPatch,
+)
+from src.core.repositories.imeal import IMealRepository
+from src.infrastructure.cache.events import (
+    DELETED,
+    RESET,
+    MealEvent,
+    MealSubscriber,
+)
+from src.infrastructure.dto.mealdto import MealDTO, MealNameDTO, MealViewDTO
+from src.infrastructure.dto.searchdto import FacetDTO, MealSearchDTO
+from src.infrastructure.utils.ingredients import normalize_ingredient
+from src.infrastructure.utils.lazy import lazy_import
+from src.infrastructure.utils.names import normalize_name
+from src.tracing import traced_methods
+
+np = lazy_import("numpy")
+
+NONE = -1
+
+
+class _Interner:
+    """A class assigning small integer codes to repeated strings."""
+
+    def __init__(self, key: Callable[[str], str] | None = None) -> None:
+        """The initializer of the interner.
+
+        Args:
+            key (Callable[[str], str] | None, optional): The function
+                normalizing strings for lookups. Defaults to None.
+        """
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self._key = key
+        self._by_key: Dict[str, List[int]] = {}
+
+    def code(self, value: str | None) -> int:
+        """The method returning the code of a string, assigning it if new.
+
+        Args:
+            value (str | None): The string.
+
+        Returns:
+            int: The code of the string, NONE for missing values.
+        """
+
+        if value is None:
+            return NONE
+
+        if (code := self._codes.get(value)) is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+            if self._key:
+                self._by_key.setdefault(self._key(value), []).append(code)
+
+        return code
+
+    def lookup(self, value: str) -> List[int]:
+        """The method returning codes of all strings matching a value.
+
+        Args:
+            value (str): The looked up value.
+
+        Returns:
+            List[int]: The codes of strings with the same normalized form.
+        """
+
+        return self._by_key.get(self._key(value) if self._key else value, [])
+
+    def decode(self, code: int) -> str | None:
+        """The method returning the string of a code.
+
+        Args:
+            code (int): The code of the string.
+
+        Returns:
+            str | None: The string, None for missing values.
+        """
+
+        return None if code == NONE else self.values[code]
+
+
+class _Segments:
+    """A class storing variable-length lists as one offset-encoded array."""
+
+    def __init__(self) -> None:
+        """The initializer of the segment storage."""
+        self.codes = np.empty(0, dtype=np.int32)
+        self.owners = np.empty(0, dtype=np.int32)
+        self.size = 0
+        self.garbage = 0
+
+    def append(self, row: int, codes: List[int]) -> Tuple[int, int]:
+        """The method storing a list at the end of the array.
+
+        Args:
+            row (int): The row owning the list.
+            codes (List[int]): The codes of the list items.
+
+        Returns:
+            Tuple[int, int]: The start and length of the stored segment.
+        """
+
+        start, length = self.size, len(codes)
+        if start + length > len(self.codes):
+            capacity = max(64, 2 * (start + length))
+            self.codes = np.resize(self.codes, capacity)
+            self.owners = np.resize(self.owners, capacity)
+
+        self.codes[start:start + length] = codes
+        self.owners[start:start + length] = row
+        self.size += length
+
+        return start, length
+
+    def release(self, start: int, length: int) -> None:
+        """The method marking a segment as garbage.
+
+        Args:
+            start (int): The start of the segment.
+            length (int): The length of the segment.
+        """
+
+        self.owners[start:start + length] = NONE
+        self.garbage += length
+
+    def rows_containing(self, codes: List[int]) -> "np.ndarray":
+        """The method returning rows whose lists contain any of the codes.
+
+        Args:
+            codes (List[int]): The looked up codes.
+
+        Returns:
+            np.ndarray: The sorted, distinct rows.
+        """
+
+        owners = self.owners[:self.size][np.isin(self.codes[:self.size], codes)]
+
+        return np.unique(owners[owners != NONE])
+
+
+@traced_methods
+class ColumnarMealRepository(IMealRepository, MealSubscriber):
+    """A class answering meal lookups from a columnar in-memory snapshot.
+
+    Short, repeated strings (categories, areas, users, ingredients and
+    measures) are interned and referenced by integer codes, ingredient and
+    measure lists are offset-encoded in flat arrays and instructions are
+    kept compressed. Writes and the remaining queries are delegated to
+    the DB repository and the snapshot is updated with the change events.
+    """
+
+    def __init__(self, delegate: IMealRepository) -> None:
+        """The initializer of the columnar repository.
+
+        Args:
+            delegate (IMealRepository): The DB repository.
+        """
+        self._delegate = delegate
+        self._lock = asyncio.Lock()
+        self._pending: List[Tuple[str, Any]] | None = None
+        self.is_loaded = False
+
+    async def load(self) -> None:
+        """The method building the snapshot if it was not built yet."""
+
+        async with self._lock:
+            if self.is_loaded:
+                return
+
+            self._pending = []
+            try:
+                meals = await self._delegate.get_all_meals()
+            except BaseException:
+                self._pending = None
+                raise
+
+            self._clear()
+            for meal in sorted(meals, key=lambda meal: meal.id):
+                self._upsert(meal)
+
+            pending, self._pending = self._pending, None
+            self.is_loaded = True
+
+            for operation, argument in pending:
+                getattr(self, operation)(argument)
+
+    def memory_usage(self) -> int:
+        """The method estimating memory taken by the snapshot.
+
+        Returns:
+            int: The approximate number of bytes.
+        """
+
+        if not self.is_loaded:
+            return 0
+
+        arrays = (
+            self._ids, self._alive, self._categories, self._areas,
+            self._users, self._ingredient_starts, self._ingredient_lengths,
+            self._measure_starts, self._measure_lengths,
+            self._ingredient_segments.codes, self._ingredient_segments.owners,
+            self._measure_segments.codes, self._measure_segments.owners,
+        )
+        strings = (
+            self._names, self._instructions, self._thumbs, self._tags,
+            self._videos,
+        )
+
+        return sum(array.nbytes for array in arrays) + sum(
+            8 * len(column) + sum(
+                len(value) + 49 for value in column if value is not None
+            )
+            for column in strings
+        )
+
+    async def handle(self, event: MealEvent, meal: Any | None) -> None:
+        """The method applying a meal change to the snapshot.
+
+        Args:
+            event (MealEvent): The change event.
+            meal (Any | None): The meal after the change if known locally.
+        """
+
+        if event.kind == RESET:
+            if self._pending is not None:
+                self._pending.append(("_reset", None))
+            else:
+                self._reset()
+            return
+
+        if not (self.is_loaded or self._pending is not None):
+            return
+
+        if event.kind != DELETED and meal is None:
+            meal = await self._delegate.get_by_id(event.id)
+
+        if meal:
+            self._apply("_upsert", meal)
+        else:
+            self._apply("_remove", event.id)
+
+    async def get_by_id(self, meal_id: int) -> Any | None:
+        """The method getting meal by provided id.
+
+        Args:
+            meal_id (int): The id of the meal.
+
+        Returns:
+            Any | None: The meal details.
+        """
+
+        await self.load()
+        row = self._find(meal_id)
+
+        return MealDTO(**self._materialize(row)) if row is not None else None
+
+    async def get_by_ids(
+        self,
+        meal_ids: Iterable[int],
+        fields: Sequence[str] | None = None,
+    ) -> List[Any]:
+        """The method getting meals by provided ids.
+
+        Args:
+            meal_ids (Iterable[int]): The ids of the meals.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
+
+        Returns:
+            List[Any]: The found meals ordered by id.
+        """
+
+        await self.load()
+        rows = [
+            row for row in map(self._find, sorted(set(meal_ids)))
+            if row is not None
+        ]
+
+        return self._views(rows, fields, MealDTO)
+
+    async def get_by_category(
+        self,
+        category: str,
+        fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
+        """The method getting meals assigned to particular category.
+
+        Args:
+            category (str): The name of the category.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
+
+        Returns:
+            Iterable[Any]: Meals assigned to a category.
+        """
+
+        await self.load()
+        rows = self._select(self._categories, self._category_values, category)
+
+        return self._views(rows, fields, Meal)
+
+    async def get_by_area(
+        self,
+        area: str,
+        fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
+        """The method getting meals assigned to particular area.
+
+        Args:
+            area (str): The name of the area.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
+
+        Returns:
+            Iterable[Any]: Meals assigned to an area.
+        """
+
+        await self.load()
+        rows = self._select(self._areas, self._area_values, area)
+
+        return self._views(rows, fields, Meal)
+
+    async def get_by_user(
+        self,
+        user_id: UUID4,
+        fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
+        """The method getting meals by user who added them.
+
+        Args:
+            user_id (UUID4): The UUID of the user.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
+
+        Returns:
+            Iterable[Any]: The meal collection.
+        """
+
+        await self.load()
+        rows = self._select(self._users, self._user_values, str(user_id))
+
+        return self._views(rows, fields, MealDTO)
+
+    async def get_by_ingredients(
+        self,
+        ingredient_name: str,
+        fields: Sequence[str] | None = None,
+    ) -> List[Any]:
+        """The method getting meals containing a particular ingredient.
+
+        Args:
+            ingredient_name (str): The name of the ingredient.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
+
+        Returns:
+            List[Any]: Meals containing the specified ingredient.
+        """
+
+        await self.load()
+        codes = self._ingredient_values.lookup(ingredient_name)
+        rows = self._ingredient_segments.rows_containing(codes)
+
+        return self._views(
+            self._by_name(rows[self._alive[rows]]),
+            fields,
+            MealDTO,
+        )
+
+    async def get_all_meals(
+        self,
+        fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
+        """The method getting all meals from the data storage.
+
+        Args:
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
+
+        Returns:
+            Iterable[Any]: Meals in the data storage.
+        """
+
+        return await self._delegate.get_all_meals(fields)
+
+    async def get_by_name(
+        self,
+        meal_name: str,
+        fields: Sequence[str] | None = None,
+    ) -> Any | None:
+        """The method getting meals by their name.
+
+        Args:
+            meal_name (str): The name of the meal.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
+
+        Returns:
+            Any | None: Meals with the specified name.
+        """
+
+        return await self._delegate.get_by_name(meal_name, fields)
+
+    async def get_by_tags(
+        self,
+        tags: Sequence[str],
+        match_all: bool = True,
+        fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
+        """The method getting meals labelled with tags.
+
+        Args:
+            tags (Sequence[str]): The tags, compared case-insensitively.
+            match_all (bool, optional): Whether meals need all the tags
+                rather than any of them. Defaults to True.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
+
+        Returns:
+            Iterable[Any]: Meals labelled with the tags.
+        """
+
+        return await self._delegate.get_by_tags(tags, match_all, fields)
+
+    async def search(self, filters: MealFilter) -> MealSearchDTO:
+        """The method searching meals matching all provided filters.
+
+        Args:
+            filters (MealFilter): The search filters.
+
+        Returns:
+            MealSearchDTO: The page of hits with facet counts.
+        """
+
+        return await self._delegate.search(filters)
+
+    async def get_names(self) -> List[MealNameDTO]:
+        """The method getting names and ingredients of all meals.
+
+        Returns:
+            List[MealNameDTO]: The names of all meals.
+        """
+
+        return await self._delegate.get_names()
+
+    async def get_catalog(self, kind: str) -> List[FacetDTO]:
+        """The method getting distinct values of a facet with meal counts.
+
+        Args:
+            kind (str): The kind of the facet (category, area, ingredient).
+
+        Returns:
+            List[FacetDTO]: The values with the number of meals.
+        """
+
+        return await self._delegate.get_catalog(kind)
+
+    async def get_favourite_counts(self) -> List[Tuple[int, int]]:
+        """The method getting favourite counts of favourited meals.
+
+        Returns:
+            List[Tuple[int, int]]: The ids and favourite counts.
+        """
+
+        return await self._delegate.get_favourite_counts()
+
+    async def reconcile_favourite_counts(self) -> int | None:
+        """The method recounting favourites of all meals from user lists.
+
+        Returns:
+            int | None: The number of corrected meals, None if skipped.
+        """
+
+        return await self._delegate.reconcile_favourite_counts()
+
+    async def add_meal(self, data: MealBroker) -> Any | None:
+        """The method adding new meal to the data storage.
+
+        Args:
+            data (MealBroker): The details of the new meal.
+
+        Returns:
+            Any | None: The newly added meal.
+        """
+
+        return await self._delegate.add_meal(data)
+
+    async def add_meals(self, data: Sequence[MealBroker]) -> List[Any]:
+        """The method adding several meals at once.
+
+        Args:
+            data (Sequence[MealBroker]): The details of the new meals.
+
+        Returns:
+            List[Any]: The added meals in the order of `data`.
+        """
+
+        return await self._delegate.add_meals(data)
+
+    async def update_meal(
+        self,
+        meal_id: int,
+        data: MealBroker,
+    ) -> Tuple[Any, Any] | None:
+        """The method updating meal data in the data storage.
+
+        Args:
+            meal_id (int): The id of the meal.
+            data (MealBroker): The details of the updated meal.
+
+        Returns:
+            Tuple[Any, Any] | None: The meal before and after the update.
+        """
+
+        return await self._delegate.update_meal(meal_id, data)
+
+    async def patch_meal(
+        self,
+        meal_id: int,
+        patch: MealPatch,
+    ) -> Tuple[Any, Any] | None:
+        """The method writing provided fields of a meal.
+
+        Args:
+            meal_id (int): The id of the meal.
+            patch (MealPatch): The provided fields and ingredient edits.
+
+        Returns:
+            Tuple[Any, Any] | None: The category and area of the meal before
+                the patch and the patched meal.
+        """
+
+        return await self._delegate.patch_meal(meal_id, patch)
+
+    async def delete_meal(self, meal_id: int) -> Any | None:
+        """The method removing meal from the data storage.
+
+        Args:
+            meal_id (int): The id of the meal.
+
+        Returns:
+            Any | None: The deleted meal.
+        """
+
+        return await self._delegate.delete_meal(meal_id)
+
+    async def recommend_meals(self, n: int = 3) -> List[dict]:
+        """The method recommending random meals.
+
+        Args:
+            n (int, optional): The number of meals to recommend. Defaults to 3.
+
+        Returns:
+            List[dict]: A list of recommended meals as dictionaries.
+        """
+
+        return await self._delegate.recommend_meals(n)
+
+    def _clear(self) -> None:
+        """A private method dropping all columns."""
+
+        self._size = 0
+        self._dead = 0
+        self._ids = np.empty(0, dtype=np.int64)
+        self._alive = np.empty(0, dtype=np.bool_)
+        self._categories = np.empty(0, dtype=np.int32)
+        self._areas = np.empty(0, dtype=np.int32)
+        self._users = np.empty(0, dtype=np.int32)
+        self._ingredient_starts = np.empty(0, dtype=np.int32)
+        self._ingredient_lengths = np.empty(0, dtype=np.int32)
+        self._measure_starts = np.empty(0, dtype=np.int32)
+        self._measure_lengths = np.empty(0, dtype=np.int32)
+        self._names: List[str | None] = []
+        self._instructions: List[bytes | None] = []
+        self._thumbs: List[str | None] = []
+        self._tags: List[str | None] = []
+        self._videos: List[str | None] = []
+        self._category_values = _Interner(key=normalize_name)
+        self._area_values = _Interner(key=normalize_name)
+        self._user_values = _Interner(key=str)
+        self._ingredient_values = _Interner(key=normalize_ingredient)
+        self._measure_values = _Interner()
+        self._ingredient_segments = _Segments()
+        self._measure_segments = _Segments()
+
+    def _reset(self, _: Any = None) -> None:
+        """A private method dropping the snapshot until the next read."""
+
+        if self.is_loaded:
+            self._clear()
+        self.is_loaded = False
+
+    def _apply(self, operation: str, argument: Any) -> None:
+        """A private method applying or queueing a change of the snapshot.
+
+        Args:
+            operation (str): The name of the method applying the change.
+            argument (Any): The argument of the method.
+        """
+
+        if self._pending is not None:
+            self._pending.append((operation, argument))
+        else:
+            getattr(self, operation)(argument)
+
+    def _find(self, meal_id: int) -> int | None:
+        """A private method finding the row of a meal.
+
+        Args:
+            meal_id (int): The id of the meal.
+
+        Returns:
+            int | None: The row of the meal if it exists.
+        """
+
+        row = int(np.searchsorted(self._ids[:self._size], meal_id))
+        if row < self._size and self._ids[row] == meal_id and self._alive[row]:
+            return row
+
+        return None
+
+    def _select(
+        self,
+        column: "np.ndarray",
+        values: _Interner,
+        value: str,
+    ) -> List[int]:
+        """A private method finding rows matching a coded column value.
+
+        Args:
+            column (np.ndarray): The column of codes.
+            values (_Interner): The interner of the column.
+            value (str): The looked up value.
+
+        Returns:
+            List[int]: The matching rows ordered by the meal name.
+        """
+
+        codes = values.lookup(value)
+        if not codes:
+            return []
+
+        mask = np.isin(column[:self._size], codes) & self._alive[:self._size]
+
+        return self._by_name(np.flatnonzero(mask))
+
+    def _by_name(self, rows: "np.ndarray") -> List[int]:
+        """A private method ordering rows by the meal name.
+
+        Args:
+            rows (np.ndarray): The rows.
+
+        Returns:
+            List[int]: The rows ordered by name.
+        """
+
+        return sorted(rows.tolist(), key=self._names.__getitem__)
+
+    def _views(
+        self,
+        rows: List[int],
+        fields: Sequence[str] | None,
+        model: Type[BaseModel],
+    ) -> List[Any]:
+        """A private method rebuilding meals of rows.
+
+        Args:
+            rows (List[int]): The rows of the meals.
+            fields (Sequence[str] | None): The projected fields, all fields
+                if not provided.
+            model (Type[BaseModel]): The model of complete meals.
+
+        Returns:
+            List[Any]: The meals.
+        """
+
+        if fields is None:
+            return [model(**self._materialize(row)) for row in rows]
+
+        return [MealViewDTO(**self._materialize(row, fields)) for row in rows]
+
+    def _materialize(
+        self,
+        row: int,
+        fields: Sequence[str] = MEAL_FIELDS,
+    ) -> Dict[str, Any]:
+        """A private method rebuilding meal attributes of a row.
+
+        Only the requested fields are decoded, so summaries never
+        decompress instructions.
+
+        Args:
+            row (int): The row of the meal.
+            fields (Sequence[str], optional): The rebuilt fields.
+                Defaults to MEAL_FIELDS.
+
+        Returns:
+            Dict[str, Any]: The meal attributes.
+        """
+
+        return {field: self._value(row, field) for field in fields}
+
+    def _value(self, row: int, field: str) -> Any:
+        """A private method decoding a single field of a row.
+
+        Args:
+            row (int): The row of the meal.
+            field (str): The name of the field.
+
+        Returns:
+            Any: The value of the field.
+        """
+
+        if field == "id":
+            return int(self._ids[row])
+        if field == "strInstructions":
+            return zlib.decompress(self._instructions[row]).decode()
+        if field == "ingredients":
+            codes = self._ingredient_segments.codes[
+                self._ingredient_starts[row]:
+                self._ingredient_starts[row] + self._ingredient_lengths[row]
+            ]
+            return [self._ingredient_values.values[code] for code in codes]
+        if field == "measures":
+            codes = self._measure_segments.codes[
+                self._measure_starts[row]:
+                self._measure_starts[row] + self._measure_lengths[row]
+            ]
+            return [self._measure_values.values[code] for code in codes]
+        if field == "strCategory":
+            return self._category_values.decode(self._categories[row])
+        if field == "strArea":
+            return self._area_values.decode(self._areas[row])
+        if field == "user_id":
+            return self._user_values.decode(self._users[row])
+
+        return {
+            "strMeal": self._names,
+            "strMealThumb": self._thumbs,
+            "strTags": self._tags,
+            "strYoutube": self._videos,
+        }[field][row]
+
+    def _upsert(self, meal: Any) -> None:
+        """A private method storing a meal in its row.
+
+        Args:
+            meal (Any): The meal details.
+        """
+
+        row = int(np.searchsorted(self._ids[:self._size], meal.id))
+        if row < self._size and self._ids[row] == meal.id:
+            if self._alive[row]:
+                self._release(row)
+            else:
+                self._dead -= 1
+        else:
+            self._insert_row(row, meal.id)
+
+        self._alive[row] = True
+        self._categories[row] = self._category_values.code(meal.strCategory)
+        self._areas[row] = self._area_values.code(meal.strArea)
+        self._users[row] = self._user_values.code(str(meal.user_id))
+        self._ingredient_starts[row], self._ingredient_lengths[row] = \
+            self._ingredient_segments.append(
+                row,
+                [self._ingredient_values.code(i) for i in meal.ingredients],
+            )
+        self._measure_starts[row], self._measure_lengths[row] = \
+            self._measure_segments.append(
+                row,
+                [self._measure_values.code(m) for m in meal.measures],
+            )
+        self._names[row] = meal.strMeal
+        self._instructions[row] = zlib.compress(
+            meal.strInstructions.encode(),
+            level=9,
+        )
+        self._thumbs[row] = meal.strMealThumb
+        self._tags[row] = meal.strTags
+        self._videos[row] = meal.strYoutube
+        self._compact_if_sparse()
+
+    def _remove(self, meal_id: int) -> None:
+        """A private method removing a meal, leaving a tombstone row.
+
+        Args:
+            meal_id (int): The id of the meal.
+        """
+
+        if (row := self._find(meal_id)) is None:
+            return
+
+        self._release(row)
+        self._alive[row] = False
+        self._names[row] = None
+        self._instructions[row] = None
+        self._thumbs[row] = None
+        self._tags[row] = None
+        self._videos[row] = None
+        self._dead += 1
+        self._compact_if_sparse()
+
+    def _release(self, row: int) -> None:
+        """A private method releasing list segments of a row.
+
+        Args:
+            row (int): The row of the meal.
+        """
+
+        self._ingredient_segments.release(
+            self._ingredient_starts[row],
+            self._ingredient_lengths[row],
+        )
+        self._measure_segments.release(
+            self._measure_starts[row],
+            self._measure_lengths[row],
+        )
+
+    def _insert_row(self, row: int, meal_id: int) -> None:
+        """A private method making room for a new row at a position.
+
+        Args:
+            row (int): The position keeping the ids sorted.
+            meal_id (int): The id of the new meal.
+        """
+
+        if self._size == len(self._ids):
+            capacity = max(64, 2 * self._size)
+            for name in _ROW_ARRAYS:
+                setattr(self, name, np.resize(getattr(self, name), capacity))
+
+        if row < self._size:
+            for name in _ROW_ARRAYS:
+                array = getattr(self, name)
+                array[row + 1:self._size + 1] = array[row:self._size]
+            for segments in (self._ingredient_segments, self._measure_segments):
+                owners = segments.owners[:segments.size]
+                owners[owners >= row] += 1
+
+        for column in self._string_columns():
+            column.insert(row, None)
+
+        self._ids[row] = meal_id
+        self._size += 1
+
+    def _compact_if_sparse(self) -> None:
+        """A private method compacting columns when half of them is garbage."""
+
+        if self._dead > max(64, self._size // 2) or (
+            self._ingredient_segments.garbage
+            > max(1024, self._ingredient_segments.size // 2)
+        ):
+            self._compact()
+
+    def _compact(self) -> None:
+        """A private method rebuilding columns without garbage."""
+
+        meals = [
+            SimpleNamespace(**self._materialize(row))
+            for row in range(self._size)
+            if self._alive[row]
+        ]
+
+        self._clear()
+        for meal in meals:
+            self._upsert(meal)
+
+    def _string_columns(self) -> Tuple[List[Any], ...]:
+        """A private method returning the columns kept as Python lists.
+
+        Returns:
+            Tuple[List[Any], ...]: The columns.
+        """
+
+        return (
+            self._names, self._instructions, self._thumbs, self._tags,
+            self._videos,
+        )
+
+
+_ROW_ARRAYS = (
+    "_ids",
+    "_alive",
+    "_categories",
+    "_areas",
+    "_users",
+    "_ingredient_starts",
+    "_ingredient_lengths",
+    "_measure_starts",
+    "_measure_lengths",
+)
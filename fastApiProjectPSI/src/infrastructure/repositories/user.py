@@ -1,37 +1,47 @@
-from typing import Any
+import asyncio
+from typing import Any, List
 from pydantic import UUID4
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
 from src.infrastructure.utils.password import hash_password
 from src.core.domain.user import UserIn
 from src.core.repositories.iuser import IUserRepository
-from src.db import database, user_table, meal_table
+from src.infrastructure.dto.userdto import UserDTO
+from src.db import database, meal_table, replicas, user_table
+from src.tracing import traced_methods
 
 
 
 """A repository for user entity."""
 
 
+@traced_methods
 class UserRepository(IUserRepository):
     """An implementation of repository class for user."""
 
     async def register_user(self, user: UserIn) -> Any | None:
         """A method registering new user.
 
+        The password is hashed in a worker thread and the user is inserted
+        in a single statement, which returns nothing if the e-mail is
+        already taken, also by a concurrent registration.
+
         Args:
             user (UserIn): The user input data.
 
         Returns:
-            Any | None: The new user object.
+            Any | None: The UUID and e-mail of the new user, None if the
+                e-mail is already taken.
         """
 
-        if await self.get_by_email(user.email):
-            return None
-
-        user.password = hash_password(user.password)
+        password = await asyncio.to_thread(hash_password, user.password)
 
-        query = user_table.insert().values(**user.model_dump())
-        new_user_uuid = await database.execute(query)
+        query = insert(user_table) \
+            .values(email=user.email, password=password) \
+            .on_conflict_do_nothing(index_elements=[user_table.c.email]) \
+            .returning(user_table.c.id, user_table.c.email)
 
-        return await self.get_by_uuid(new_user_uuid)
+        return await database.fetch_one(query)
 
     async def get_by_uuid(self, uuid: UUID4) -> Any | None:
         """A method getting user by UUID.
@@ -70,6 +80,11 @@ class UserRepository(IUserRepository):
     async def add_to_favourites(self, user_uuid: UUID4, meal_id: int) -> bool:
         """Add a meal to the user's favourites list based on the meal ID.
 
+        The id and the name are appended by a single conditional UPDATE
+        and the favourite count of the meal is incremented in the same
+        transaction, so concurrent requests neither lose favourites nor
+        count them twice.
+
         Args:
             user_uuid (UUID4): The UUID of the user.
             meal_id (int): The ID of the meal to be added.
@@ -77,34 +92,46 @@ class UserRepository(IUserRepository):
         Returns:
             bool: True if the meal was successfully added, False otherwise.
         """
-  
-        query = meal_table.select(). \
-                where(meal_table.c.id == meal_id)
-        meal = await database.fetch_one(query)
-
-        if meal:
-            meal_name = meal["strMeal"]
-
-            query = user_table.select().where(user_table.c.id == user_uuid)
-            user = await database.fetch_one(query)
-
-            if user:
-                current_favourites = user["favourites"] if "favourites" in user else []
-                if meal_name not in current_favourites:
-                    current_favourites.append(meal_name)
-
-                    update_query = (
-                        user_table.update()
-                        .where(user_table.c.id == user_uuid)
-                        .values(favourites=current_favourites)
-                    )
-                    await database.execute(update_query)
-                    return True
-        return False
-    
+
+        query = select(meal_table.c.strMeal).where(meal_table.c.id == meal_id)
+        meal_name = await database.fetch_val(query)
+        if meal_name is None:
+            return False
+
+        async with database.transaction():
+            query = user_table.update() \
+                .where(
+                    user_table.c.id == user_uuid,
+                    func.array_position(
+                        user_table.c.favourite_ids,
+                        meal_id,
+                    ).is_(None),
+                ) \
+                .values(
+                    favourite_ids=func.array_append(
+                        user_table.c.favourite_ids,
+                        meal_id,
+                    ),
+                    favourites=func.array_append(
+                        user_table.c.favourites,
+                        meal_name,
+                    ),
+                ) \
+                .returning(user_table.c.id)
+            if not await database.fetch_one(query):
+                return False
+
+            await _change_favourite_count(meal_id, 1)
+
+        return True
+
     async def remove_from_favourites(self, user_uuid: UUID4, meal_id: int) -> bool:
         """Remove a meal from the user's favourites list based on the meal ID.
 
+        The favourite count of the meal is decremented in the same
+        transaction as the id and one occurrence of the name are removed,
+        as several favourite meals may share a name.
+
         Args:
             user_uuid (UUID4): The UUID of the user.
             meal_id (int): The ID of the meal to be removed.
@@ -112,29 +139,39 @@ class UserRepository(IUserRepository):
         Returns:
             bool: True if the meal was successfully removed, False otherwise.
         """
-        query = meal_table.select().where(meal_table.c.id == meal_id)
-        meal = await database.fetch_one(query)
-
-        if meal:
-            meal_name = meal["strMeal"]
-
-            query = user_table.select().where(user_table.c.id == user_uuid)
-            user = await database.fetch_one(query)
-
-            if user:
-                current_favourites = user["favourites"] if "favourites" in user else []
-                if meal_name in current_favourites:
-                    current_favourites.remove(meal_name)
-
-                    update_query = (
-                        user_table.update()
-                        .where(user_table.c.id == user_uuid)
-                        .values(favourites=current_favourites)
-                    )
-                    await database.execute(update_query)
-                    return True
-        return False
-    
+
+        query = select(meal_table.c.strMeal).where(meal_table.c.id == meal_id)
+        meal_name = await database.fetch_val(query)
+        if meal_name is None:
+            return False
+
+        async with database.transaction():
+            query = user_table.update() \
+                .where(
+                    user_table.c.id == user_uuid,
+                    func.array_position(
+                        user_table.c.favourite_ids,
+                        meal_id,
+                    ).is_not(None),
+                ) \
+                .values(
+                    favourite_ids=func.array_remove(
+                        user_table.c.favourite_ids,
+                        meal_id,
+                    ),
+                    favourites=_without_first(
+                        user_table.c.favourites,
+                        meal_name,
+                    ),
+                ) \
+                .returning(user_table.c.id)
+            if not await database.fetch_one(query):
+                return False
+
+            await _change_favourite_count(meal_id, -1)
+
+        return True
+
     async def get_favourites(self, user_uuid: UUID4) -> list:
         """Get a user's favourite meals by their UUID.
 
@@ -151,12 +188,69 @@ class UserRepository(IUserRepository):
             return user["favourites"] if "favourites" in user else []
         return []
     
-    async def get_all_users(self) -> list:
-        """Retrieve all users.
+    async def get_users(
+        self,
+        after: UUID4 | None = None,
+        limit: int = 100,
+    ) -> List[UserDTO]:
+        """A method getting a page of users ordered by UUID.
+
+        Only public columns are selected, so password hashes and
+        favourites never leave the database.
+
+        Args:
+            after (UUID4 | None, optional): The UUID of the last user of
+                the previous page. Defaults to None.
+            limit (int, optional): The size of the page. Defaults to 100.
 
         Returns:
-            list: A list of all user objects.
+            List[UserDTO]: The page of users.
         """
-        query = user_table.select()
-        users = await database.fetch_all(query)
-        return users
\ No newline at end of file
+
+        query = select(user_table.c.id, user_table.c.email) \
+            .order_by(user_table.c.id.asc()) \
+            .limit(limit)
+        if after:
+            query = query.where(user_table.c.id > after)
+
+        users = await replicas.fetch_all(query)
+
+        return [UserDTO(**dict(user)) for user in users]
+
+
+async def _change_favourite_count(meal_id: int, delta: int) -> None:
+    """Function changing the favourite count of a meal in place.
+
+    Args:
+        meal_id (int): The id of the meal.
+        delta (int): The change of the count.
+    """
+
+    query = meal_table.update() \
+        .where(meal_table.c.id == meal_id) \
+        .values(
+            favourite_count=func.greatest(
+                meal_table.c.favourite_count + delta,
+                0,
+            ),
+        )
+    await database.execute(query)
+
+
+def _without_first(column: Any, value: str) -> Any:
+    """Function building an array without the first occurrence of a value.
+
+    Args:
+        column (Any): The array column.
+        value (str): The removed value.
+
+    Returns:
+        Any: The SQL expression of the remaining elements.
+    """
+
+    position = func.coalesce(func.array_position(column, value), 0)
+
+    return func.array_cat(
+        column[1:position - 1],
+        column[position + 1:func.cardinality(column)],
+    )
@@ -1,10 +1,25 @@
 """Module containing meal service abstractions."""
 
 from abc import ABC, abstractmethod
-from typing import Any, Iterable, Optional, List
-
-from src.core.domain.meal import Meal, MealBroker
-from src.infrastructure.dto.mealdto import MealDTO
+from typing import Any, Iterable, Optional, List, Sequence
+
+from src.core.domain.meal import (
+    Meal,
+    MealBroker,
+    MealFilter,
+    MealPatch,
+    PantryQuery,
+    ShoppingListQuery,
+)
+from src.infrastructure.cache.snapshot import Snapshot
+from src.infrastructure.dto.mealdto import (
+    MealDTO,
+    PantryMatchDTO,
+    PopularMealDTO,
+    ShoppingListDTO,
+    SuggestionDTO,
+)
+from src.infrastructure.dto.searchdto import MealSearchDTO
 
 
 class IMealService(ABC):
@@ -22,6 +37,66 @@ class IMealService(ABC):
             Iterable[Any]
         """
 
+    @abstractmethod
+    async def get_all_meals_snapshot(
+        self,
+        fields: Sequence[str] | None = None,
+    ) -> Snapshot:
+        """The abstract method for getting the rendered list of all meals.
+
+        Args:
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
+
+        Returns:
+            Snapshot: The pre-rendered, pre-compressed meal collection.
+        """
+
+    @abstractmethod
+    async def get_category_snapshot(
+        self,
+        meal_category: str,
+        fields: Sequence[str] | None = None,
+    ) -> Snapshot:
+        """The abstract method for getting the rendered meals of a category.
+
+        Args:
+            meal_category (str): The category of the meal.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
+
+        Returns:
+            Snapshot: The pre-rendered, pre-compressed meal collection.
+        """
+
+    @abstractmethod
+    async def get_area_snapshot(
+        self,
+        meal_area: str,
+        fields: Sequence[str] | None = None,
+    ) -> Snapshot:
+        """The abstract method for getting the rendered meals of an area.
+
+        Args:
+            meal_area (str): The area of the meal.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
+
+        Returns:
+            Snapshot: The pre-rendered, pre-compressed meal collection.
+        """
+
+    @abstractmethod
+    async def get_catalog_snapshot(self, kind: str) -> Snapshot:
+        """The abstract method for getting rendered values of a facet.
+
+        Args:
+            kind (str): The kind of the facet (category, area, ingredient).
+
+        Returns:
+            Snapshot: The pre-rendered values with meal counts.
+        """
+
     @abstractmethod
     async def get_by_id(self, meal_id: int) -> Optional[Any]:
         """The abstract method for getting a meal recipe by provided id.
@@ -34,16 +109,42 @@ class IMealService(ABC):
         """
 
     @abstractmethod
-    async def get_by_name(self, meal_name: str) -> Iterable[Any]:
+    async def get_by_name(
+        self,
+        meal_name: str,
+        fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
         """The abstract method for getting a meal recipe by provided meal name.
 
         Args:
             meal_name (str): The name of the meal.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
 
         Returns:
             Iterable[Any]: The meal details available.
         """
 
+    @abstractmethod
+    async def get_by_tags(
+        self,
+        tags: Sequence[str],
+        match_all: bool = True,
+        fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
+        """The abstract method for getting meals labelled with tags.
+
+        Args:
+            tags (Sequence[str]): The tags, compared case-insensitively.
+            match_all (bool, optional): Whether meals need all the tags
+                rather than any of them. Defaults to True.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
+
+        Returns:
+            Iterable[Any]: Meals labelled with the tags.
+        """
+
     @abstractmethod
     async def get_by_category(self, meal_category: str) -> Iterable[Any]:
         """The abstract method for getting a meal recipe by provided meal category.
@@ -56,11 +157,17 @@ class IMealService(ABC):
         """
 
     @abstractmethod
-    async def get_by_user(self, user_id: int) -> Iterable[Any]:
+    async def get_by_user(
+        self,
+        user_id: int,
+        fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
         """The abstract method for getting meals by a specific user.
 
         Args:
             user_id (int): The ID of the user.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
 
         Returns:
             Iterable[Any]: The meal details associated with the user.
@@ -90,6 +197,93 @@ class IMealService(ABC):
             Iterable[Any]: The meal details available.
         """
 
+    @abstractmethod
+    async def suggest(self, query: str, limit: int = 10) -> List[SuggestionDTO]:
+        """The abstract method for completing meal and ingredient names.
+
+        Args:
+            query (str): The typed prefix.
+            limit (int, optional): The maximal number of suggestions.
+                Defaults to 10.
+
+        Returns:
+            List[SuggestionDTO]: The matching names.
+        """
+
+    @abstractmethod
+    async def match_pantry(self, query: PantryQuery) -> List[PantryMatchDTO]:
+        """The abstract method for ranking meals by owned ingredients.
+
+        Args:
+            query (PantryQuery): The owned ingredients.
+
+        Returns:
+            List[PantryMatchDTO]: The meals with the highest coverage.
+        """
+
+    @abstractmethod
+    async def get_shopping_list(
+        self,
+        query: ShoppingListQuery,
+    ) -> ShoppingListDTO:
+        """The abstract method for consolidating ingredients of meals.
+
+        Args:
+            query (ShoppingListQuery): The ids of the planned meals.
+
+        Returns:
+            ShoppingListDTO: The summed amounts of every ingredient.
+        """
+
+    @abstractmethod
+    async def get_popular(self, limit: int = 10) -> List[PopularMealDTO]:
+        """The abstract method for getting the most favourited meals.
+
+        Args:
+            limit (int, optional): The maximal number of meals.
+                Defaults to 10.
+
+        Returns:
+            List[PopularMealDTO]: The meals, most favourited first.
+        """
+
+    @abstractmethod
+    def rank_by_popularity(self, meals: Iterable[Any]) -> List[Any]:
+        """The abstract method for ordering meals by the number of favourites.
+
+        Args:
+            meals (Iterable[Any]): The meals with an `id`.
+
+        Returns:
+            List[Any]: The meals, most favourited first.
+        """
+
+    @abstractmethod
+    def rank_snapshot(self, snapshot: Snapshot) -> bytes:
+        """The abstract method for ordering a rendered collection by favourites.
+
+        Args:
+            snapshot (Snapshot): The pre-rendered meal collection.
+
+        Returns:
+            bytes: The serialized meals, most favourited first.
+        """
+
+    @abstractmethod
+    async def refresh_popularity(self) -> None:
+        """The abstract method for reloading favourite counts of meals."""
+
+    @abstractmethod
+    async def search(self, filters: MealFilter) -> MealSearchDTO:
+        """The abstract method for searching meals matching all filters.
+
+        Args:
+            filters (MealFilter): The search filters.
+
+        Returns:
+            MealSearchDTO: The page of hits with facet counts.
+        """
+
     @abstractmethod
     async def add_meal(self, data: MealBroker) -> Optional[Any]:
         """The abstract method for adding a meal to the data storage.
@@ -101,6 +295,29 @@ class IMealService(ABC):
             Any | None: The newly added meal.
         """
 
+    @abstractmethod
+    async def add_meals(self, data: Sequence[MealBroker]) -> List[Meal]:
+        """The abstract method for adding several meals at once.
+
+        Args:
+            data (Sequence[MealBroker]): The details of the new meals.
+
+        Returns:
+            List[Meal]: The added meals in the order of `data`.
+        """
+
+    @abstractmethod
+    async def patch_meal(self, meal_id: int, patch: MealPatch) -> Meal | None:
+        """The abstract method for writing provided fields of a meal.
+
+        Args:
+            meal_id (int): The id of the meal.
+            patch (MealPatch): The provided fields and ingredient edits.
+
+        Returns:
+            Meal | None: The patched meal details.
+        """
+
     @abstractmethod
     async def delete_meal(self, meal_id: int) -> bool:
         """The abstract method for deleting a meal from the data storage.
@@ -125,11 +342,17 @@ class IMealService(ABC):
         """
 
     @abstractmethod
-    async def get_by_ingredients(self, ingredient_name: str) -> List[dict]:
+    async def get_by_ingredients(
+        self,
+        ingredient_name: str,
+        fields: Sequence[str] | None = None,
+    ) -> List[dict]:
         """The method getting meals by a specific ingredient.
 
         Args:
             ingredient_name (str): The name of the ingredient.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
 
         Returns:
             List[dict]: Meals containing the specified ingredient.
@@ -2,6 +2,7 @@
 
 
 from abc import ABC, abstractmethod
+from typing import AsyncIterator, List
 
 from pydantic import UUID4
 
@@ -93,9 +94,36 @@ class IUserService(ABC):
         """
 
     @abstractmethod
-    async def get_all_users(self) -> list[UserDTO]:
-        """A method to get all users.
+    async def get_users(
+        self,
+        after: UUID4 | None = None,
+        limit: int = 100,
+    ) -> List[UserDTO]:
+        """A method to get a page of users ordered by UUID.
+
+        Args:
+            after (UUID4 | None, optional): The UUID of the last user of
+                the previous page. Defaults to None.
+            limit (int, optional): The size of the page. Defaults to 100.
+
+        Returns:
+            List[UserDTO]: The page of users.
+        """
+
+    @abstractmethod
+    def iterate_users(
+        self,
+        after: UUID4 | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[List[UserDTO]]:
+        """A method to iterate over all users page by page.
+
+        Args:
+            after (UUID4 | None, optional): The UUID of the last user
+                already read. Defaults to None.
+            batch_size (int, optional): The size of the page.
+                Defaults to 1000.
 
         Returns:
-            list[UserDTO]: A list of all user DTOs.
-        """
\ No newline at end of file
+            AsyncIterator[List[UserDTO]]: The pages of users.
+        """
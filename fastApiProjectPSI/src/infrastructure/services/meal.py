@@ -1,23 +1,94 @@
 """Module containing service implementation"""
 
-from typing import Iterable, List
-
-from src.core.domain.meal import Meal, MealBroker
+import json
+from itertools import zip_longest
+from typing import Any, Dict, Iterable, List, Sequence
+
+from pydantic import TypeAdapter
+
+from src.core.domain.meal import (
+    SUMMARY_FIELDS,
+    Meal,
+    MealBroker,
+    MealFilter,
+    MealPatch,
+    PantryQuery,
+    ShoppingListQuery,
+)
 from src.core.repositories.imeal import IMealRepository
-from src.infrastructure.dto.mealdto import MealDTO
+from src.infrastructure.cache.events import (
+    CREATED,
+    DELETED,
+    UPDATED,
+    MealEvent,
+    MealEventBus,
+)
+from src.infrastructure.cache.invalidation import (
+    area_key,
+    catalog_key,
+    category_key,
+    projection_key,
+)
+from src.infrastructure.cache.pantry import PantryIndex
+from src.infrastructure.cache.popularity import PopularityIndex
+from src.infrastructure.cache.snapshot import Snapshot, SnapshotStore
+from src.infrastructure.cache.suggest import SuggestIndex
+from src.infrastructure.dto.mealdto import (
+    MealDTO,
+    MealViewDTO,
+    PantryMatchDTO,
+    PopularMealDTO,
+    QuantityDTO,
+    ShoppingItemDTO,
+    ShoppingListDTO,
+    SuggestionDTO,
+)
+from src.infrastructure.dto.searchdto import FacetDTO, MealSearchDTO
 from src.infrastructure.services.imeal import IMealService
+from src.infrastructure.utils.ingredients import normalize_ingredient
+from src.infrastructure.utils.measures import parse_measure
+from src.infrastructure.utils.names import normalize_name
+from src.infrastructure.utils.singleflight import SingleFlight
+from src.infrastructure.utils.tags import normalize_tags
+from src.tracing import traced_methods
+
+meal_list_adapter = TypeAdapter(List[MealDTO])
+facet_list_adapter = TypeAdapter(List[FacetDTO])
+view_list_adapter = TypeAdapter(List[MealViewDTO])
 
 
+@traced_methods
 class MealService(IMealService):
     """A class implementing the meal service."""
 
-    def __init__(self, repository: IMealRepository) -> None:
+    def __init__(
+        self,
+        repository: IMealRepository,
+        snapshots: SnapshotStore,
+        suggestions: SuggestIndex,
+        pantry: PantryIndex,
+        popularity: PopularityIndex,
+        events: MealEventBus,
+        flights: SingleFlight,
+    ) -> None:
         """The initializer of the `meal service`.
 
         Args:
             repository (IMealRepository): The reference to the repository.
+            snapshots (SnapshotStore): The store of rendered collections.
+            suggestions (SuggestIndex): The typeahead prefix index.
+            pantry (PantryIndex): The meal-ingredient bitset matrix.
+            popularity (PopularityIndex): The ranking of meals by favourites.
+            events (MealEventBus): The bus publishing meal changes.
+            flights (SingleFlight): The group coalescing identical reads.
         """
         self._repository = repository
+        self._snapshots = snapshots
+        self._suggestions = suggestions
+        self._pantry = pantry
+        self._popularity = popularity
+        self._events = events
+        self._flights = flights
 
     async def get_all_meals(self) -> Iterable[MealDTO]:
         """The method getting all meals from the repository.
@@ -26,7 +97,101 @@ class MealService(IMealService):
             Iterable[MealDTO]: All meals.
         """
 
-        return await self._repository.get_all_meals()
+        return await self._flights.do(
+            ("get_all_meals",),
+            self._repository.get_all_meals,
+        )
+
+    async def get_all_meals_snapshot(
+        self,
+        fields: Sequence[str] | None = None,
+    ) -> Snapshot:
+        """The method getting the rendered list of all meals.
+
+        Args:
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
+
+        Returns:
+            Snapshot: The pre-rendered, pre-compressed meal collection.
+        """
+
+        async def build() -> bytes:
+            return _render(
+                await self._repository.get_all_meals(fields),
+                fields,
+            )
+
+        return await self._snapshots.get(projection_key("all", fields), build)
+
+    async def get_category_snapshot(
+        self,
+        category: str,
+        fields: Sequence[str] | None = None,
+    ) -> Snapshot:
+        """The method getting the rendered meals of a category.
+
+        Args:
+            category (str): The name of the category.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
+
+        Returns:
+            Snapshot: The pre-rendered, pre-compressed meal collection,
+                not stored if the category has no meals.
+        """
+
+        async def build() -> bytes | None:
+            meals = await self._repository.get_by_category(category, fields)
+            return _render(meals, fields) if meals else None
+
+        return await self._snapshots.get(
+            projection_key(category_key(category), fields),
+            build,
+        )
+
+    async def get_area_snapshot(
+        self,
+        area: str,
+        fields: Sequence[str] | None = None,
+    ) -> Snapshot:
+        """The method getting the rendered meals of an area.
+
+        Args:
+            area (str): The name of the area.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
+
+        Returns:
+            Snapshot: The pre-rendered, pre-compressed meal collection,
+                not stored if the area has no meals.
+        """
+
+        async def build() -> bytes | None:
+            meals = await self._repository.get_by_area(area, fields)
+            return _render(meals, fields) if meals else None
+
+        return await self._snapshots.get(
+            projection_key(area_key(area), fields),
+            build,
+        )
+
+    async def get_catalog_snapshot(self, kind: str) -> Snapshot:
+        """The method getting rendered values of a facet with meal counts.
+
+        Args:
+            kind (str): The kind of the facet (category, area, ingredient).
+
+        Returns:
+            Snapshot: The pre-rendered values with meal counts.
+        """
+
+        async def build() -> bytes:
+            return facet_list_adapter.dump_json(
+                await self._repository.get_catalog(kind),
+            )
+
+        return await self._snapshots.get(catalog_key(kind), build)
 
     async def get_by_id(self, meal_id: int) -> MealDTO | None:
         """The method getting meal by provided id.
@@ -38,7 +203,10 @@ class MealService(IMealService):
             MealDTO | None: The meal details.
         """
 
-        return await self._repository.get_by_id(meal_id)
+        return await self._flights.do(
+            ("get_by_id", meal_id),
+            lambda: self._repository.get_by_id(meal_id),
+        )
     
     async def recommend_meals(self, n: int = 3) -> List[dict]:
         """The method recommending random meals.
@@ -52,17 +220,20 @@ class MealService(IMealService):
         recommendations = await self._repository.recommend_meals(n)
         return recommendations
 
-    async def get_by_category(self, category_id: int) -> Iterable[Meal]:
+    async def get_by_category(self, category: str) -> Iterable[Meal]:
         """The method getting meals assigned to a particular category.
 
         Args:
-            category_id (int): The id of the category.
+            category (str): The name of the category.
 
         Returns:
             Iterable[Meal]: Meals assigned to a category.
         """
 
-        return await self._repository.get_by_category(category_id)
+        return await self._flights.do(
+            ("get_by_category", normalize_name(category)),
+            lambda: self._repository.get_by_category(category),
+        )
 
     async def get_by_area(self, area: str) -> Iterable[Meal]:
         """The method getting meals by area.
@@ -74,32 +245,261 @@ class MealService(IMealService):
             Iterable[Meal]: Meals from the specified area.
         """
 
-        return await self._repository.get_by_area(area)
+        return await self._flights.do(
+            ("get_by_area", normalize_name(area)),
+            lambda: self._repository.get_by_area(area),
+        )
 
-    async def get_by_name(self, name: str) -> MealDTO | None:
+    async def get_by_name(
+        self,
+        name: str,
+        fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
         """The method getting meal by name.
 
         Args:
             name (str): The name of the meal.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
 
         Returns:
-            MealDTO | None: The meal details.
+            Iterable[Any]: The meal details.
         """
 
-        return await self._repository.get_by_name(name)
+        return await self._flights.do(
+            ("get_by_name", name.lower(), _fields_key(fields)),
+            lambda: self._repository.get_by_name(name, fields),
+        )
     
-    async def get_by_user(self, user_id: int) -> Iterable[MealDTO]:
+    async def get_by_tags(
+        self,
+        tags: Sequence[str],
+        match_all: bool = True,
+        fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
+        """The method getting meals labelled with tags.
+
+        Args:
+            tags (Sequence[str]): The tags, compared case-insensitively.
+            match_all (bool, optional): Whether meals need all the tags
+                rather than any of them. Defaults to True.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
+
+        Returns:
+            Iterable[Any]: Meals labelled with the tags.
+        """
+
+        return await self._flights.do(
+            (
+                "get_by_tags",
+                tuple(normalize_tags(tags)),
+                match_all,
+                _fields_key(fields),
+            ),
+            lambda: self._repository.get_by_tags(tags, match_all, fields),
+        )
+
+    async def get_by_user(
+        self,
+        user_id: int,
+        fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
         """The method getting meals assigned to a particular user.
 
         Args:
             user_id (int): The id of the user.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
+
+        Returns:
+            Iterable[Any]: Meals assigned to the user.
+        """
+
+        return await self._flights.do(
+            ("get_by_user", str(user_id), _fields_key(fields)),
+            lambda: self._repository.get_by_user(user_id, fields),
+        )
+
+
+    async def suggest(self, query: str, limit: int = 10) -> List[SuggestionDTO]:
+        """The method completing meal and ingredient names.
+
+        Args:
+            query (str): The typed prefix.
+            limit (int, optional): The maximal number of suggestions.
+                Defaults to 10.
+
+        Returns:
+            List[SuggestionDTO]: The matching names.
+        """
+
+        if not self._suggestions.is_loaded:
+            await self._suggestions.load(self._repository.get_names)
+
+        return [
+            SuggestionDTO(kind=kind, id=meal_id, name=name)
+            for kind, meal_id, name in self._suggestions.suggest(query, limit)
+        ]
+
+    async def match_pantry(self, query: PantryQuery) -> List[PantryMatchDTO]:
+        """The method ranking meals by owned ingredients.
+
+        Args:
+            query (PantryQuery): The owned ingredients.
+
+        Returns:
+            List[PantryMatchDTO]: The meals with the highest coverage.
+        """
+
+        if not self._pantry.is_loaded:
+            await self._pantry.load(self._repository.get_names)
+
+        matches = self._pantry.match(
+            query.ingredients,
+            query.limit,
+            query.min_coverage,
+        )
+
+        return [
+            PantryMatchDTO(
+                id=meal_id,
+                strMeal=name,
+                coverage=owned / required,
+                owned=owned,
+                required=required,
+                missing=missing,
+            )
+            for meal_id, name, owned, required, missing in matches
+        ]
+
+    async def get_shopping_list(
+        self,
+        query: ShoppingListQuery,
+    ) -> ShoppingListDTO:
+        """The method consolidating ingredients of meals.
+
+        A meal listed more than once counts every time.
+
+        Args:
+            query (ShoppingListQuery): The ids of the planned meals.
+
+        Returns:
+            ShoppingListDTO: The summed amounts of every ingredient.
+        """
+
+        meals = await self._repository.get_by_ids(
+            query.meal_ids,
+            ("id", "ingredients", "measures"),
+        )
+        by_id = {meal.id: meal for meal in meals}
+
+        return ShoppingListDTO(
+            items=_consolidate(
+                by_id[meal_id] for meal_id in query.meal_ids
+                if meal_id in by_id
+            ),
+            missing_ids=sorted(set(query.meal_ids).difference(by_id)),
+        )
+
+    async def get_popular(self, limit: int = 10) -> List[PopularMealDTO]:
+        """The method getting the most favourited meals.
+
+        The ranking comes from the in-process popularity index, only the
+        summaries of the ranked meals are read from the repository.
+
+        Args:
+            limit (int, optional): The maximal number of meals.
+                Defaults to 10.
+
+        Returns:
+            List[PopularMealDTO]: The meals, most favourited first.
+        """
+
+        if not self._popularity.is_loaded:
+            await self._flights.do(("popularity",), self.refresh_popularity)
+
+        ranking = self._popularity.top(limit)
+        meals = {
+            meal.id: meal
+            for meal in await self._repository.get_by_ids(
+                [meal_id for meal_id, _ in ranking],
+                SUMMARY_FIELDS,
+            )
+        }
+
+        return [
+            PopularMealDTO(
+                **meals[meal_id].model_dump(exclude_unset=True),
+                favourite_count=count,
+            )
+            for meal_id, count in ranking
+            if meal_id in meals
+        ]
+
+    def rank_by_popularity(self, meals: Iterable[Any]) -> List[Any]:
+        """The method ordering meals by the number of favourites.
+
+        The sort is stable, so equally popular meals keep their order.
+
+        Args:
+            meals (Iterable[Any]): The meals with an `id`.
 
         Returns:
-            Iterable[MealDTO]: Meals assigned to the user.
+            List[Any]: The meals, most favourited first.
         """
 
-        return await self._repository.get_by_user(user_id)
+        return sorted(meals, key=lambda meal: -self._popularity.count(meal.id))
+
+    def rank_snapshot(self, snapshot: Snapshot) -> bytes:
+        """The method ordering a rendered meal collection by favourites.
+
+        The body is parsed once per snapshot and the ranked render is
+        reused until the favourite counts change.
+
+        Args:
+            snapshot (Snapshot): The pre-rendered meal collection.
+
+        Returns:
+            bytes: The serialized meals, most favourited first.
+        """
+
+        version = self._popularity.version
+        ranked = snapshot.derived.get("popularity")
+        if ranked and ranked[0] == version:
+            return ranked[1]
+
+        if (meals := snapshot.derived.get("meals")) is None:
+            meals = snapshot.derived["meals"] = json.loads(snapshot.identity)
+
+        body = json.dumps(
+            sorted(meals, key=lambda meal: -self._popularity.count(meal["id"])),
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode()
+        snapshot.derived["popularity"] = (version, body)
+
+        return body
 
+    async def refresh_popularity(self) -> None:
+        """The method reloading favourite counts into the popularity index."""
+
+        await self._popularity.refresh(self._repository.get_favourite_counts)
+
+    async def search(self, filters: MealFilter) -> MealSearchDTO:
+        """The method searching meals matching all provided filters.
+
+        Args:
+            filters (MealFilter): The search filters.
+
+        Returns:
+            MealSearchDTO: The page of hits with facet counts.
+        """
+
+        return await self._flights.do(
+            ("search", filters.model_dump_json()),
+            lambda: self._repository.search(filters),
+        )
 
     async def add_meal(self, data: MealBroker) -> Meal | None:
         """The method adding new meal to the data storage.
@@ -111,7 +511,29 @@ class MealService(IMealService):
             Meal | None: Full details of the newly added meal.
         """
 
-        return await self._repository.add_meal(data)
+        new_meal = await self._repository.add_meal(data)
+        if new_meal:
+            event = MealEvent.of(CREATED, new_meal.id, new_meal)
+            await self._events.publish(event, new_meal)
+
+        return new_meal
+
+    async def add_meals(self, data: Sequence[MealBroker]) -> List[Meal]:
+        """The method adding several meals in a single transaction.
+
+        Args:
+            data (Sequence[MealBroker]): The details of the new meals.
+
+        Returns:
+            List[Meal]: The added meals in the order of `data`.
+        """
+
+        new_meals = await self._repository.add_meals(data)
+        await self._events.publish_many(
+            (MealEvent.of(CREATED, meal.id, meal), meal) for meal in new_meals
+        )
+
+        return new_meals
 
     async def update_meal(self, meal_id: int, data: MealBroker) -> Meal | None:
         """The method updating meal data in the data storage.
@@ -124,7 +546,34 @@ class MealService(IMealService):
             Meal | None: The updated meal details.
         """
 
-        return await self._repository.update_meal(meal_id, data)
+        if not (change := await self._repository.update_meal(meal_id, data)):
+            return None
+
+        previous_meal, updated_meal = change
+        event = MealEvent.of(UPDATED, meal_id, previous_meal, updated_meal)
+        await self._events.publish(event, updated_meal)
+
+        return updated_meal
+
+    async def patch_meal(self, meal_id: int, patch: MealPatch) -> Meal | None:
+        """The method writing provided fields of a meal.
+
+        Args:
+            meal_id (int): The id of the meal.
+            patch (MealPatch): The provided fields and ingredient edits.
+
+        Returns:
+            Meal | None: The patched meal details.
+        """
+
+        if not (change := await self._repository.patch_meal(meal_id, patch)):
+            return None
+
+        previous_meal, patched_meal = change
+        event = MealEvent.of(UPDATED, meal_id, previous_meal, patched_meal)
+        await self._events.publish(event, patched_meal)
+
+        return patched_meal
 
     async def delete_meal(self, meal_id: int) -> bool:
         """The method removing meal from the data storage.
@@ -136,18 +585,118 @@ class MealService(IMealService):
             bool: Success of the operation.
         """
 
-        return await self._repository.delete_meal(meal_id)
-    
-    
+        if not (previous_meal := await self._repository.delete_meal(meal_id)):
+            return False
 
+        await self._events.publish(MealEvent.of(DELETED, meal_id, previous_meal))
 
-    async def get_by_ingredients(self, ingredient_name: str) -> List[dict]:
+        return True
+
+    async def get_by_ingredients(
+        self,
+        ingredient_name: str,
+        fields: Sequence[str] | None = None,
+    ) -> List[dict]:
         """The method getting meals by a specific ingredient.
 
         Args:
             ingredient_name (str): The name of the ingredient.
+            fields (Sequence[str] | None, optional): The projected fields,
+                all fields if not provided. Defaults to None.
 
         Returns:
             List[dict]: Meals containing the specified ingredient.
         """
-        return await self._repository.get_by_ingredients(ingredient_name)
\ No newline at end of file
+        return await self._flights.do(
+            (
+                "get_by_ingredients",
+                normalize_ingredient(ingredient_name),
+                _fields_key(fields),
+            ),
+            lambda: self._repository.get_by_ingredients(
+                ingredient_name,
+                fields,
+            ),
+        )
+
+
+def _render(meals: Iterable[Any], fields: Sequence[str] | None) -> bytes:
+    """A function rendering meals into the JSON response body.
+
+    Args:
+        meals (Iterable[Any]): The meals to render.
+        fields (Sequence[str] | None): The projected fields, all fields
+            if not provided.
+
+    Returns:
+        bytes: The serialized meal collection.
+    """
+
+    if fields is not None:
+        return view_list_adapter.dump_json(list(meals), exclude_unset=True)
+
+    return meal_list_adapter.dump_json(
+        [MealDTO.model_validate(meal) for meal in meals],
+    )
+
+
+def _consolidate(meals: Iterable[Any]) -> List[ShoppingItemDTO]:
+    """A function summing measures of ingredients across meals.
+
+    Amounts are summed per normalized ingredient and unit, measures
+    without an amount are kept as distinct notes.
+
+    Args:
+        meals (Iterable[Any]): The meals with `ingredients` and `measures`.
+
+    Returns:
+        List[ShoppingItemDTO]: The ingredients ordered by name.
+    """
+
+    items: Dict[str, ShoppingItemDTO] = {}
+    amounts: Dict[str, Dict[str, float]] = {}
+
+    for meal in meals:
+        for ingredient, measure in zip_longest(
+            meal.ingredients or [],
+            meal.measures or [],
+            fillvalue="",
+        ):
+            if not (key := normalize_ingredient(ingredient)):
+                continue
+
+            item = items.setdefault(
+                key,
+                ShoppingItemDTO(ingredient=ingredient.strip()),
+            )
+            if meal.id not in item.meal_ids:
+                item.meal_ids.append(meal.id)
+
+            amount, unit = parse_measure(measure)
+            if amount is not None:
+                units = amounts.setdefault(key, {})
+                units[unit] = units.get(unit, 0.0) + amount
+            elif unit and unit not in item.notes:
+                item.notes.append(unit)
+
+    for key, units in amounts.items():
+        items[key].quantities = [
+            QuantityDTO(amount=round(amount, 3), unit=unit)
+            for unit, amount in sorted(units.items())
+        ]
+
+    return [items[key] for key in sorted(items)]
+
+
+def _fields_key(fields: Sequence[str] | None) -> str:
+    """A function returning the part of a read key naming the projection.
+
+    Args:
+        fields (Sequence[str] | None): The projected fields.
+
+    Returns:
+        str: The comma-separated fields, "*" for all fields.
+    """
+
+    return "*" if fields is None else ",".join(fields)
+
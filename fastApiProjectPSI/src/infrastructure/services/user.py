@@ -1,23 +1,34 @@
 """A module containing user service."""
 
+from typing import AsyncIterator, List
+
 from pydantic import UUID4
 
 from src.core.domain.user import UserIn
 from src.core.repositories.iuser import IUserRepository
+from src.infrastructure.cache.popularity import PopularityIndex
 from src.infrastructure.dto.userdto import UserDTO
 from src.infrastructure.dto.tokendto import TokenDTO
 from src.infrastructure.services.iuser import IUserService
 from src.infrastructure.utils.password import verify_password
 from src.infrastructure.utils.token import generate_user_token
+from src.tracing import traced_methods
 
 
+@traced_methods
 class UserService(IUserService):
     """An abstract class for user service."""
 
     _repository: IUserRepository
+    _popularity: PopularityIndex
 
-    def __init__(self, repository: IUserRepository) -> None:
+    def __init__(
+        self,
+        repository: IUserRepository,
+        popularity: PopularityIndex,
+    ) -> None:
         self._repository = repository
+        self._popularity = popularity
 
     async def register_user(self, user: UserIn) -> UserDTO | None:
         """A method registering a new user.
@@ -86,7 +97,10 @@ class UserService(IUserService):
         Returns:
             bool: True if added, False if not found or already exists.
         """
-        return await self._repository.add_to_favourites(user_uuid, meal_id)
+        added = await self._repository.add_to_favourites(user_uuid, meal_id)
+        if added:
+            self._popularity.adjust(meal_id, 1)
+        return added
 
     async def remove_from_favourites(self, user_uuid: UUID4, meal_id: int) -> bool:
         """Remove a meal from the user's favourites by its ID.
@@ -98,7 +112,13 @@ class UserService(IUserService):
         Returns:
             bool: True if removed, False if not found in favourites.
         """
-        return await self._repository.remove_from_favourites(user_uuid, meal_id)
+        removed = await self._repository.remove_from_favourites(
+            user_uuid,
+            meal_id,
+        )
+        if removed:
+            self._popularity.adjust(meal_id, -1)
+        return removed
     
     async def get_favourites(self, user_uuid: UUID4) -> list:
         """Get a user's favourite meals.
@@ -111,10 +131,45 @@ class UserService(IUserService):
         """
         return await self._repository.get_favourites(user_uuid)
     
-    async def get_all_users(self) -> list[UserDTO]:
-        """Retrieve all users.
+    async def get_users(
+        self,
+        after: UUID4 | None = None,
+        limit: int = 100,
+    ) -> List[UserDTO]:
+        """Retrieve a page of users ordered by UUID.
+
+        Args:
+            after (UUID4 | None, optional): The UUID of the last user of
+                the previous page. Defaults to None.
+            limit (int, optional): The size of the page. Defaults to 100.
 
         Returns:
-            list[UserDTO]: A list of user DTOs.
+            List[UserDTO]: The page of users.
+        """
+        return await self._repository.get_users(after, limit)
+
+    async def iterate_users(
+        self,
+        after: UUID4 | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[List[UserDTO]]:
+        """Iterate over all users page by page.
+
+        Every page is a separate keyset query, so no connection is held
+        between pages and memory is bounded by the page size.
+
+        Args:
+            after (UUID4 | None, optional): The UUID of the last user
+                already read. Defaults to None.
+            batch_size (int, optional): The size of the page.
+                Defaults to 1000.
+
+        Yields:
+            List[UserDTO]: The pages of users.
         """
-        return await self._repository.get_all_users()
\ No newline at end of file
+        while users := await self._repository.get_users(after, batch_size):
+            yield users
+
+            if len(users) < batch_size:
+                return
+            after = users[-1].id
@@ -0,0 +1,16 @@
+"""A module containing ingredient name helper functions."""
+
+from src.infrastructure.utils.names import normalize_name
+
+
+def normalize_ingredient(name: str) -> str:
+    """A function returning the canonical form of an ingredient name.
+
+    Args:
+        name (str): The ingredient name as entered.
+
+    Returns:
+        str: The case-folded name with collapsed whitespace.
+    """
+
+    return normalize_name(name)
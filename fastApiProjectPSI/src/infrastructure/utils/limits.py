@@ -0,0 +1,101 @@
+"""A module containing admission control and rate limiting primitives."""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+
+class Overloaded(Exception):
+    """An exception raised when a limiter refuses to admit a request."""
+
+    def __init__(self, retry_after: int) -> None:
+        """The initializer of the exception.
+
+        Args:
+            retry_after (int): The number of seconds to wait before retrying.
+        """
+        super().__init__(f"Retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """A class bounding concurrent executions and the wait queue."""
+
+    def __init__(self, limit: int, queue_size: int, timeout: float) -> None:
+        """The initializer of the limiter.
+
+        Args:
+            limit (int): The maximal number of concurrent executions.
+            queue_size (int): The maximal number of waiting requests.
+            timeout (float): The maximal wait time in seconds.
+        """
+        self._semaphore = asyncio.Semaphore(limit)
+        self._queue_size = queue_size
+        self._timeout = timeout
+        self._waiting = 0
+
+    async def acquire(self) -> None:
+        """The method waiting for a free execution slot.
+
+        Raises:
+            Overloaded: If the queue is full or the wait timed out.
+        """
+
+        if self._semaphore.locked() and self._waiting >= self._queue_size:
+            raise Overloaded(math.ceil(self._timeout))
+
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self._timeout)
+        except asyncio.TimeoutError as e:
+            raise Overloaded(math.ceil(self._timeout)) from e
+        finally:
+            self._waiting -= 1
+
+    def release(self) -> None:
+        """The method freeing an execution slot."""
+
+        self._semaphore.release()
+
+
+class RateLimiter:
+    """A class keeping a token bucket for every client key."""
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 10000) -> None:
+        """The initializer of the limiter.
+
+        Args:
+            rate (float): The number of tokens refilled per second.
+            burst (int): The capacity of a bucket.
+            max_keys (int, optional): The maximal number of tracked clients,
+                the least recently seen are forgotten first.
+                Defaults to 10000.
+        """
+        self._rate = rate
+        self._burst = burst
+        self._max_keys = max_keys
+        self._buckets: OrderedDict[str, Tuple[float, float]] = OrderedDict()
+
+    def hit(self, key: str) -> None:
+        """The method taking a token from the bucket of a client.
+
+        Args:
+            key (str): The key of the client.
+
+        Raises:
+            Overloaded: If the bucket is empty.
+        """
+
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (self._burst, now))
+        tokens = min(self._burst, tokens + (now - updated) * self._rate)
+
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            raise Overloaded(math.ceil((1 - tokens) / self._rate))
+
+        self._buckets[key] = (tokens - 1, now)
+        if len(self._buckets) > self._max_keys:
+            self._buckets.popitem(last=False)
@@ -0,0 +1,170 @@
+"""A module containing the parser of free-text ingredient measures."""
+
+import re
+from functools import lru_cache
+from typing import Tuple
+
+# (amount, unit) - the amount is None for measures without a quantity,
+# e.g. "to taste", which are returned as the unit.
+Measure = Tuple[float | None, str]
+
+_FRACTIONS = {
+    "½": " 1/2",
+    "⅓": " 1/3",
+    "⅔": " 2/3",
+    "¼": " 1/4",
+    "¾": " 3/4",
+    "⅛": " 1/8",
+}
+
+_UNITS = {
+    "tsp": "tsp",
+    "tsps": "tsp",
+    "teaspoon": "tsp",
+    "teaspoons": "tsp",
+    "tbsp": "tbsp",
+    "tbsps": "tbsp",
+    "tbs": "tbsp",
+    "tblsp": "tbsp",
+    "tablespoon": "tbsp",
+    "tablespoons": "tbsp",
+    "cup": "cup",
+    "cups": "cup",
+    "g": "g",
+    "gr": "g",
+    "gram": "g",
+    "grams": "g",
+    "kg": "kg",
+    "kilogram": "kg",
+    "kilograms": "kg",
+    "ml": "ml",
+    "millilitre": "ml",
+    "millilitres": "ml",
+    "milliliter": "ml",
+    "milliliters": "ml",
+    "l": "l",
+    "litre": "l",
+    "litres": "l",
+    "liter": "l",
+    "liters": "l",
+    "oz": "oz",
+    "ounce": "oz",
+    "ounces": "oz",
+    "lb": "lb",
+    "lbs": "lb",
+    "pound": "lb",
+    "pounds": "lb",
+    "pinch": "pinch",
+    "pinches": "pinch",
+    "clove": "clove",
+    "cloves": "clove",
+    "can": "can",
+    "cans": "can",
+    "tin": "can",
+    "tins": "can",
+    "slice": "slice",
+    "slices": "slice",
+}
+
+# Metric units are summed in their base unit.
+_CONVERSIONS = {"kg": (1000.0, "g"), "l": (1000.0, "ml")}
+
+# Numbers are capped at 9 digits, longer ones are not quantities and
+# would make int() reject them.
+_QUANTITY = re.compile(
+    r"""^\s*(?:
+        (?P<whole>\d{1,9})\s+(?P<numerator>\d{1,9})
+            \s*/\s*(?P<denominator>\d{1,9})
+        | (?P<fraction_numerator>\d{1,9})\s*/\s*(?P<fraction_denominator>\d{1,9})
+        | (?P<decimal>\d{1,9}(?:[.,]\d{1,9})?)
+    )(?!\d)
+    (?:\s*(?:-|to)\s*[\d.,/]+)?
+    \s*(?P<rest>.*)$""",
+    re.VERBOSE,
+)
+
+# "2 x 400g tins" - the count of packs followed by the size of a pack.
+_MULTIPLIER = re.compile(r"^[x×*]\s*(?P<size>\d.*)$")
+
+# The unit right after the amount, also when written without a space
+# ("175g") or followed by an alternative measure ("175g/6oz").
+_UNIT = re.compile(r"[^\W\d_]+")
+
+
+@lru_cache(maxsize=4096)
+def parse_measure(text: str) -> Measure:
+    """A function splitting a measure into the amount and the unit.
+
+    Ranges ("2-3 cups") count as their lower bound, multiplied packs
+    ("2 x 400g tins") as their total, alternative measures ("175g/6oz")
+    as the first one and measures without a known unit ("2 large") count
+    pieces, returned with an empty unit.
+
+    Args:
+        text (str): The measure as entered, e.g. "1 1/2 tbsp".
+
+    Returns:
+        Measure: The amount and the canonical unit.
+    """
+
+    cleaned = " ".join(text.casefold().split())
+    for symbol, fraction in _FRACTIONS.items():
+        cleaned = cleaned.replace(symbol, fraction)
+
+    if not (match := _QUANTITY.match(cleaned)):
+        return None, cleaned
+
+    amount = _amount(match)
+    rest = match["rest"]
+
+    if multiplier := _MULTIPLIER.match(rest):
+        if size := _QUANTITY.match(multiplier["size"]):
+            amount *= _amount(size)
+            rest = size["rest"]
+
+    word = _UNIT.match(rest)
+    unit = _UNITS.get(word[0], "") if word else ""
+
+    if unit in _CONVERSIONS:
+        factor, unit = _CONVERSIONS[unit]
+        amount *= factor
+
+    return amount, unit
+
+
+def _amount(match: re.Match) -> float:
+    """A function evaluating the quantity matched at the start of a measure.
+
+    Args:
+        match (re.Match): The match of the quantity pattern.
+
+    Returns:
+        float: The amount.
+    """
+
+    if match["whole"]:
+        return int(match["whole"]) + _ratio(
+            match["numerator"],
+            match["denominator"],
+        )
+    if match["fraction_numerator"]:
+        return _ratio(
+            match["fraction_numerator"],
+            match["fraction_denominator"],
+        )
+
+    return float(match["decimal"].replace(",", "."))
+
+
+def _ratio(numerator: str, denominator: str) -> float:
+    """A function evaluating a fraction, treating a zero denominator as 0.
+
+    Args:
+        numerator (str): The digits of the numerator.
+        denominator (str): The digits of the denominator.
+
+    Returns:
+        float: The value of the fraction.
+    """
+
+    return int(numerator) / int(denominator) if int(denominator) else 0.0
@@ -0,0 +1,17 @@
+"""A module containing the normalization shared by all name lookups."""
+
+
+def normalize_name(name: str) -> str:
+    """A function returning the canonical form of a name.
+
+    Categories, areas, ingredients and tags, as well as the cache keys
+    derived from them, are all matched by this form.
+
+    Args:
+        name (str): The name as entered.
+
+    Returns:
+        str: The case-folded name with collapsed whitespace.
+    """
+
+    return " ".join(name.split()).casefold()
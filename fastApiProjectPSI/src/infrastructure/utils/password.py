@@ -1,9 +1,22 @@
 """A module containing password helper methods."""
 
+from functools import lru_cache
+from typing import Any
 
-from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"])
+@lru_cache(maxsize=None)
+def _context() -> Any:
+    """A function creating the password hashing context on first use.
+
+    passlib and bcrypt are imported here, so workers which never hash
+    passwords do not pay for them at startup.
+
+    Returns:
+        Any: The passlib crypt context.
+    """
+    from passlib.context import CryptContext  # pylint: disable=import-outside-toplevel
+
+    return CryptContext(schemes=["bcrypt"])
 
 
 def hash_password(password: str) -> str:
@@ -15,7 +28,7 @@ def hash_password(password: str) -> str:
     Returns:
         str: The hashed password.
     """
-    return pwd_context.hash(password)
+    return _context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -28,4 +41,4 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         bool: True if the password matches the hash, False otherwise.
     """
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    return _context().verify(plain_password, hashed_password)
@@ -0,0 +1,50 @@
+"""A module containing coalescing of identical concurrent calls."""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """A class sharing one in-flight call among identical concurrent calls."""
+
+    def __init__(self) -> None:
+        """The initializer of the single-flight group."""
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """The method running the call unless one with the key is in flight.
+
+        Every waiter gets the result or the exception of the shared call.
+        A cancelled waiter does not cancel the call for the others.
+
+        Args:
+            key (Hashable): The key identifying identical calls.
+            call (Callable[[], Awaitable[T]]): The coroutine function.
+
+        Returns:
+            T: The result of the call.
+        """
+
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        """A private callback removing a finished call.
+
+        Args:
+            key (Hashable): The key of the call.
+            task (asyncio.Task): The finished task.
+        """
+
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()
+
@@ -0,0 +1,46 @@
+"""A module containing meal tag helper functions."""
+
+from typing import Iterable, List
+
+from src.infrastructure.utils.names import normalize_name
+
+
+def normalize_tag(tag: str) -> str:
+    """A function returning the canonical form of a tag.
+
+    Args:
+        tag (str): The tag as entered.
+
+    Returns:
+        str: The case-folded tag with collapsed whitespace.
+    """
+
+    return normalize_name(tag)
+
+
+def normalize_tags(tags: Iterable[str]) -> List[str]:
+    """A function returning distinct canonical tags.
+
+    Args:
+        tags (Iterable[str]): The tags as entered.
+
+    Returns:
+        List[str]: The non-empty tags in order of first appearance.
+    """
+
+    return list(dict.fromkeys(
+        tag for tag in map(normalize_tag, tags) if tag
+    ))
+
+
+def parse_tags(value: str | None) -> List[str]:
+    """A function parsing comma-separated meal tags.
+
+    Args:
+        value (str | None): The tags as stored in `strTags`.
+
+    Returns:
+        List[str]: The distinct canonical tags.
+    """
+
+    return normalize_tags(value.split(",")) if value else []
@@ -0,0 +1,27 @@
+"""A module containing helpers measuring durations of startup phases."""
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+
+@contextmanager
+def timed(phases: Dict[str, float], name: str) -> Iterator[None]:
+    """A function recording the duration of the wrapped block.
+
+    The duration is recorded also when the block raises, so a failed
+    startup still reports how far it got.
+
+    Args:
+        phases (Dict[str, float]): The durations in seconds by phase name.
+        name (str): The name of the phase.
+
+    Yields:
+        Iterator[None]: The wrapped block.
+    """
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases[name] = time.perf_counter() - start
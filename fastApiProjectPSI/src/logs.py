@@ -0,0 +1,203 @@
+"""A module configuring non-blocking structured logging of the app.
+
+Records are put on a bounded queue by the calling thread and written as
+JSON lines by a background listener thread, so the event loop never waits
+for stdout. When the queue is full, records are dropped and counted.
+"""
+
+import json
+import logging
+import queue
+import random
+import sys
+import time
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict
+
+from src.config import config
+
+# The id of the request being handled, set by the request id middleware.
+request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+# Loggers of the server which are routed through the queue as well.
+SERVER_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord(
+    "", 0, "", 0, "", None, None,
+))) | {"message", "request_id"}
+
+
+class JsonFormatter(logging.Formatter):
+    """A class formatting records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """The method serializing a record.
+
+        Attributes passed in `extra` are added as top-level fields.
+
+        Args:
+            record (logging.LogRecord): The record.
+
+        Returns:
+            str: The JSON line.
+        """
+
+        entry: Dict[str, Any] = {
+            "ts": time.strftime(
+                "%Y-%m-%dT%H:%M:%S",
+                time.gmtime(record.created),
+            ) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if request := getattr(record, "request_id", None):
+            entry["request_id"] = request
+
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """A class keeping a share of records of high-volume loggers.
+
+    Warnings and errors are never dropped.
+    """
+
+    def __init__(self, rates: Dict[str, float]) -> None:
+        """The initializer of the filter.
+
+        Args:
+            rates (Dict[str, float]): The kept share of records by logger
+                name, applied to child loggers as well.
+        """
+        super().__init__()
+        self._rates = rates
+        self._cache: Dict[str, float] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """The method deciding whether a record is kept.
+
+        Args:
+            record (logging.LogRecord): The record.
+
+        Returns:
+            bool: True if the record should be emitted.
+        """
+
+        if record.levelno >= logging.WARNING:
+            return True
+
+        return random.random() < self._rate(record.name)
+
+    def _rate(self, name: str) -> float:
+        """A private method finding the rate of the closest configured logger.
+
+        Args:
+            name (str): The name of the logger.
+
+        Returns:
+            float: The kept share of records.
+        """
+
+        if (rate := self._cache.get(name)) is None:
+            logger = name
+            while logger not in self._rates and "." in logger:
+                logger = logger.rpartition(".")[0]
+            rate = self._cache[name] = self._rates.get(logger, 1.0)
+
+        return rate
+
+
+class DroppingQueueHandler(QueueHandler):
+    """A class putting records on a bounded queue without ever blocking."""
+
+    def __init__(self, records: queue.Queue) -> None:
+        """The initializer of the handler.
+
+        Args:
+            records (queue.Queue): The queue read by the listener.
+        """
+        super().__init__(records)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """The method making a record safe to pass to another thread.
+
+        The message and the traceback are rendered in the calling thread,
+        where the request id is known, while serialization is left to the
+        listener.
+
+        Args:
+            record (logging.LogRecord): The record.
+
+        Returns:
+            logging.LogRecord: The prepared copy of the record.
+        """
+
+        prepared = logging.makeLogRecord(vars(record))
+        prepared.msg = record.getMessage()
+        prepared.args = None
+        if record.exc_info:
+            prepared.exc_text = logging.Formatter().formatException(
+                record.exc_info,
+            )
+        prepared.exc_info = None
+        prepared.request_id = request_id.get()
+
+        return prepared
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """The method putting a record on the queue, dropping it if full.
+
+        Args:
+            record (logging.LogRecord): The prepared record.
+        """
+
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging() -> QueueListener:
+    """Function routing all loggers through the background JSON writer.
+
+    Levels and sampling rates are taken from `LOG_LEVEL`, `LOG_LEVELS`
+    and `LOG_SAMPLING` of the app configuration.
+
+    Returns:
+        QueueListener: The started listener, to be stopped on shutdown.
+    """
+
+    records: queue.Queue = queue.Queue(config.LOG_QUEUE_SIZE)
+
+    handler = DroppingQueueHandler(records)
+    handler.addFilter(SamplingFilter(config.LOG_SAMPLING))
+
+    writer = logging.StreamHandler(sys.stdout)
+    writer.setFormatter(JsonFormatter())
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(config.LOG_LEVEL)
+
+    for name in SERVER_LOGGERS:
+        server_logger = logging.getLogger(name)
+        server_logger.handlers = []
+        server_logger.propagate = True
+
+    for name, level in config.LOG_LEVELS.items():
+        logging.getLogger(name).setLevel(level)
+
+    listener = QueueListener(records, writer, respect_handler_level=True)
+    listener.start()
+
+    return listener
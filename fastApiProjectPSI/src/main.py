@@ -1,35 +1,87 @@
 """Main module of the app"""
 
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from typing import AsyncGenerator
 
 from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.exception_handlers import http_exception_handler
 
+from src.api.middleware import RequestIdMiddleware, TracingMiddleware
+from src.api.routers.health import router as health_router
 from src.api.routers.meal import router as meal_router
 from src.api.routers.user import router as user_router
+from src.config import config
 from src.container import Container
-from src.db import database, init_db
+from src.db import database, db_dsn, init_db, replicas
+from src.infrastructure.utils.timing import timed
+from src.logs import setup_logging
+from src.tracing import setup_tracing, tracer
+from src.warmup import warm_up
 
 container = Container()
-container.wire(modules=[
-    "src.api.routers.meal",
-    "src.api.routers.user",
-])
 
 
 @asynccontextmanager
-async def lifespan(_: FastAPI) -> AsyncGenerator:
-    """Lifespan function working on app startup."""
-    await init_db()
-    await database.connect()
+async def lifespan(app: FastAPI) -> AsyncGenerator:
+    """Lifespan function working on app startup.
+
+    The app is reported ready once the warm-up finishes in background.
+    Durations of startup phases are kept in `app.state.startup_phases`.
+    """
+    phases = app.state.startup_phases = {}
+    with timed(phases, "logging"):
+        listener = setup_logging()
+    with timed(phases, "tracing"):
+        setup_tracing()
+    with timed(phases, "init_db"):
+        await init_db()
+    with timed(phases, "connect"):
+        await database.connect()
+        await replicas.connect()
+    with timed(phases, "backfill"):
+        # Reads filter by the derived columns, meals stored by earlier
+        # versions must have them before the first request.
+        repository = container.meal_db_repository()
+        await repository.backfill_ingredient_ids()
+        await repository.backfill_dimension_ids()
+        await repository.backfill_tags()
+    tasks = [
+        asyncio.create_task(container.meal_events().listen(db_dsn)),
+        asyncio.create_task(
+            replicas.monitor(config.DB_REPLICA_CHECK_INTERVAL),
+        ),
+        asyncio.create_task(
+            container.popularity_index().monitor(
+                container.meal_db_repository().get_favourite_counts,
+                container.meal_db_repository().reconcile_favourite_counts,
+                config.POPULARITY_REFRESH_INTERVAL,
+                config.POPULARITY_RECONCILE_INTERVAL,
+            ),
+        ),
+    ]
+    app.state.ready = not config.WARMUP_ENABLED
+    if config.WARMUP_ENABLED:
+        tasks.append(asyncio.create_task(warm_up(app, container)))
     yield
+    app.state.ready = False
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await replicas.disconnect()
     await database.disconnect()
+    tracer.stop()
+    listener.stop()
 
 
 app = FastAPI(lifespan=lifespan)
+app.state.container = container
 app.include_router(meal_router, prefix="/meal")
 app.include_router(user_router, prefix="/user")
+app.include_router(health_router, prefix="/health")
+app.add_middleware(TracingMiddleware)
+app.add_middleware(RequestIdMiddleware)
 
 
 @app.exception_handler(HTTPException)
@@ -0,0 +1,167 @@
+"""A module containing commands profiling the startup of a worker.
+
+Usage:
+    python -m src.profiling imports [--top 25]
+    python -m src.profiling startup [--budget 3.0] [--wait-ready]
+"""
+
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from src.config import config
+
+# Modules which are imported on first use only, their presence in the
+# import profile of `src.main` is a regression.
+LAZY_MODULES = ("numpy", "passlib", "bcrypt")
+
+# (module, self time, cumulative time) - times are in microseconds.
+ImportTiming = Tuple[str, int, int]
+
+
+def profile_imports() -> List[ImportTiming]:
+    """Function measuring imports of the app in a fresh interpreter.
+
+    Returns:
+        List[ImportTiming]: The timings of all imported modules.
+    """
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.main"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        if own.strip().isdigit():
+            timings.append((name.strip(), int(own), int(cumulative)))
+
+    return timings
+
+
+def report_imports(top: int) -> int:
+    """Function printing the slowest imports of the app.
+
+    Args:
+        top (int): The number of listed modules.
+
+    Returns:
+        int: The exit code, 1 if a lazily imported module was imported.
+    """
+
+    timings = profile_imports()
+    packages: Dict[str, int] = defaultdict(int)
+    for name, own, _ in timings:
+        packages[name.split(".")[0]] += own
+
+    total = sum(own for _, own, _ in timings)
+    print(f"Imported {len(timings)} modules in {total / 1e6:.3f}s\n")
+
+    print(f"{'self [ms]':>10} {'cumul [ms]':>11}  module")
+    for name, own, cumulative in sorted(timings, key=lambda t: -t[1])[:top]:
+        print(f"{own / 1e3:>10.1f} {cumulative / 1e3:>11.1f}  {name}")
+
+    print(f"\n{'self [ms]':>10}  package")
+    for name, own in sorted(packages.items(), key=lambda p: -p[1])[:top]:
+        print(f"{own / 1e3:>10.1f}  {name}")
+
+    eager = sorted(set(packages) & set(LAZY_MODULES))
+    if eager:
+        print(f"\nEagerly imported lazy modules: {', '.join(eager)}")
+        return 1
+
+    return 0
+
+
+async def profile_startup(wait_ready: bool) -> Dict[str, float]:
+    """Function measuring phases of the worker startup.
+
+    The app is imported and started in this process, then the first
+    request is sent directly to the ASGI application.
+
+    Args:
+        wait_ready (bool): Whether to wait for the warm-up to finish.
+
+    Returns:
+        Dict[str, float]: The durations of phases in seconds.
+    """
+
+    start = time.perf_counter()
+    # pylint: disable=import-outside-toplevel
+    from src.main import app, lifespan
+    from src.warmup import _get
+
+    imported = time.perf_counter() - start
+
+    async with lifespan(app):
+        phases = {"import": imported, **app.state.startup_phases}
+
+        await _get(app, "/health/live")
+        phases["first_request"] = time.perf_counter() - start
+
+        if wait_ready:
+            while not app.state.ready:
+                await asyncio.sleep(0.05)
+            phases["ready"] = time.perf_counter() - start
+
+        return phases
+
+
+def report_startup(budget: float, wait_ready: bool) -> int:
+    """Function printing the startup phases and checking the budget.
+
+    Args:
+        budget (float): The maximal time to the first request in seconds.
+        wait_ready (bool): Whether to wait for the warm-up to finish.
+
+    Returns:
+        int: The exit code, 1 if the budget was exceeded.
+    """
+
+    phases = asyncio.run(profile_startup(wait_ready))
+
+    print(f"{'time [ms]':>10}  phase")
+    for name, duration in phases.items():
+        print(f"{duration * 1e3:>10.1f}  {name}")
+
+    if phases["first_request"] > budget:
+        print(
+            f"\nTime to first request {phases['first_request']:.3f}s "
+            f"exceeds the budget of {budget:.3f}s",
+        )
+        return 1
+
+    return 0
+
+
+def main() -> None:
+    """Function parsing arguments and running the profiling command."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    imports = commands.add_parser("imports")
+    imports.add_argument("--top", type=int, default=25)
+
+    startup = commands.add_parser("startup")
+    startup.add_argument("--budget", type=float, default=config.STARTUP_BUDGET)
+    startup.add_argument("--wait-ready", action="store_true")
+
+    args = parser.parse_args()
+
+    if args.command == "imports":
+        sys.exit(report_imports(args.top))
+    sys.exit(report_startup(args.budget, args.wait_ready))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,645 @@
+"""A module containing lightweight in-process request tracing.
+
+Spans are propagated through a context variable. Sampling is decided once
+per trace by its root span, so unsampled requests only pay for a context
+variable lookup per instrumented call. Finished spans are exported in
+batches by a background thread to a JSON lines file or to an OTLP/HTTP
+collector.
+"""
+
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Type, TypeVar
+
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+# Classes are instrumented when defined, so with tracing off in the
+# configuration their methods are not wrapped at all.
+TRACING_ENABLED = (
+    config.TRACE_EXPORTER != "none" and config.TRACE_SAMPLE_RATE > 0
+)
+
+T = TypeVar("T")
+Attributes = Dict[str, Any]
+
+
+class Span:
+    """A class representing a timed operation of a trace."""
+
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "start",
+        "end",
+        "attributes",
+        "error",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: str | None,
+        attributes: Attributes,
+    ) -> None:
+        """The initializer of the span.
+
+        Args:
+            name (str): The name of the operation.
+            trace_id (str): The hex id of the trace.
+            parent_id (str | None): The hex id of the parent span.
+            attributes (Attributes): The attributes of the operation.
+        """
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.start = time.time_ns()
+        self.end = 0
+        self.attributes = attributes
+        self.error: str | None = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The method returning the span as a JSON-serializable dict.
+
+        Returns:
+            Dict[str, Any]: The span.
+        """
+
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": (self.end - self.start) / 1e6,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+# Marks code running within a trace which was not sampled.
+UNSAMPLED = Span("unsampled", "", None, {})
+
+_current: ContextVar[Span | None] = ContextVar("span", default=None)
+
+
+class SpanExporter:
+    """A base class of destinations of finished spans."""
+
+    def export(self, spans: List[Span]) -> None:
+        """The method sending a batch of spans.
+
+        Args:
+            spans (List[Span]): The finished spans.
+        """
+
+    def close(self) -> None:
+        """The method releasing resources of the exporter."""
+
+
+class FileSpanExporter(SpanExporter):
+    """A class appending spans to a file as JSON lines."""
+
+    def __init__(self, path: str) -> None:
+        """The initializer of the exporter.
+
+        Args:
+            path (str): The path of the file.
+        """
+        self._file = open(path, "a", encoding="utf-8")  # pylint: disable=consider-using-with
+
+    def export(self, spans: List[Span]) -> None:
+        """The method appending a batch of spans to the file.
+
+        Args:
+            spans (List[Span]): The finished spans.
+        """
+
+        self._file.writelines(
+            json.dumps(span.to_dict(), default=str) + "\n" for span in spans
+        )
+        self._file.flush()
+
+    def close(self) -> None:
+        """The method closing the file."""
+
+        self._file.close()
+
+
+class OtlpSpanExporter(SpanExporter):
+    """A class posting spans to a collector using OTLP/HTTP with JSON."""
+
+    def __init__(self, endpoint: str, timeout: float = 5.0) -> None:
+        """The initializer of the exporter.
+
+        Args:
+            endpoint (str): The URL of the traces endpoint of the collector.
+            timeout (float, optional): The timeout of a request in seconds.
+                Defaults to 5.0.
+        """
+        self._endpoint = endpoint
+        self._timeout = timeout
+
+    def export(self, spans: List[Span]) -> None:
+        """The method posting a batch of spans to the collector.
+
+        Args:
+            spans (List[Span]): The finished spans.
+        """
+
+        body = {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    _otlp_attribute("service.name", config.TRACE_SERVICE_NAME),
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": __name__},
+                    "spans": [_otlp_span(span) for span in spans],
+                }],
+            }],
+        }
+        request = urllib.request.Request(
+            self._endpoint,
+            data=json.dumps(body, default=str).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self._timeout):
+            pass
+
+
+class SpanProcessor:
+    """A class exporting finished spans in batches from a background thread.
+
+    Spans are dropped rather than blocking the caller when the queue
+    is full.
+    """
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        queue_size: int,
+        batch_size: int = 256,
+        interval: float = 1.0,
+    ) -> None:
+        """The initializer of the processor.
+
+        Args:
+            exporter (SpanExporter): The destination of spans.
+            queue_size (int): The maximal number of buffered spans.
+            batch_size (int, optional): The maximal number of spans
+                exported at once. Defaults to 256.
+            interval (float, optional): The maximal delay of an export
+                in seconds. Defaults to 1.0.
+        """
+        self._exporter = exporter
+        self._queue: queue.Queue = queue.Queue(queue_size)
+        self._batch_size = batch_size
+        self._interval = interval
+        self._thread = threading.Thread(
+            target=self._run,
+            name="span-exporter",
+            daemon=True,
+        )
+        self.dropped = 0
+
+    def start(self) -> None:
+        """The method starting the export thread."""
+
+        self._thread.start()
+
+    def submit(self, span: Span) -> None:
+        """The method queueing a finished span.
+
+        Args:
+            span (Span): The finished span.
+        """
+
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def stop(self) -> None:
+        """The method exporting the remaining spans and stopping the thread."""
+
+        self._queue.put(None)
+        self._thread.join()
+        self._exporter.close()
+
+    def _run(self) -> None:
+        """A private method exporting batches until stopped."""
+
+        running = True
+        while running:
+            batch: List[Span] = []
+            deadline = time.monotonic() + self._interval
+            while len(batch) < self._batch_size:
+                try:
+                    span = self._queue.get(
+                        timeout=max(0.0, deadline - time.monotonic()),
+                    )
+                except queue.Empty:
+                    break
+                if span is None:
+                    running = False
+                    break
+                batch.append(span)
+
+            if batch:
+                try:
+                    self._exporter.export(batch)
+                except Exception as e:  # pylint: disable=broad-except
+                    logger.warning(
+                        "Exporting spans failed",
+                        extra={"spans": len(batch), "error": repr(e)},
+                    )
+
+
+class Tracer:
+    """A class creating spans and handing finished ones to the processor."""
+
+    def __init__(self) -> None:
+        """The initializer of the tracer, disabled until started."""
+        self.processor: SpanProcessor | None = None
+        self.sample_rate = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        """The property telling whether spans are recorded at all.
+
+        Returns:
+            bool: True if the tracer was started with a non-zero rate.
+        """
+
+        return self.processor is not None and self.sample_rate > 0
+
+    def start(self, exporter: SpanExporter, sample_rate: float) -> None:
+        """The method starting export of sampled traces.
+
+        Args:
+            exporter (SpanExporter): The destination of spans.
+            sample_rate (float): The share of recorded traces.
+        """
+
+        self.processor = SpanProcessor(exporter, config.TRACE_QUEUE_SIZE)
+        self.processor.start()
+        self.sample_rate = sample_rate
+
+    def stop(self) -> None:
+        """The method flushing spans and disabling the tracer."""
+
+        if self.processor is not None:
+            processor, self.processor = self.processor, None
+            processor.stop()
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        attributes: Attributes | None = None,
+        parent: Span | None = None,
+    ) -> Iterator[Span | None]:
+        """The method timing the wrapped block as a span.
+
+        A span without a parent starts a trace, which is recorded with
+        the configured probability.
+
+        Args:
+            name (str): The name of the operation.
+            attributes (Attributes | None, optional): The attributes of the
+                operation. Defaults to None.
+            parent (Span | None, optional): The remote parent continuing
+                a trace, the current span is used if omitted.
+                Defaults to None.
+
+        Yields:
+            Iterator[Span | None]: The span, None if it is not recorded.
+        """
+
+        if not self.enabled:
+            yield None
+            return
+
+        parent = parent or _current.get()
+        if parent is UNSAMPLED or (
+            parent is None and random.random() >= self.sample_rate
+        ):
+            token = _current.set(UNSAMPLED)
+            try:
+                yield None
+            finally:
+                _current.reset(token)
+            return
+
+        span = Span(
+            name,
+            parent.trace_id if parent else os.urandom(16).hex(),
+            parent.span_id if parent and parent.span_id else None,
+            attributes or {},
+        )
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = repr(e)
+            raise
+        finally:
+            span.end = time.time_ns()
+            _current.reset(token)
+            if self.processor is not None:
+                self.processor.submit(span)
+
+
+tracer = Tracer()
+
+
+def current_span() -> Span | None:
+    """Function returning the recorded span of the running code.
+
+    Returns:
+        Span | None: The span, None outside of sampled traces.
+    """
+
+    span = _current.get()
+
+    return None if span is UNSAMPLED else span
+
+
+def traced(
+    name: str,
+    describe: Callable[..., Attributes] | None = None,
+) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Function creating a decorator wrapping calls of a function in spans.
+
+    Coroutine functions are timed until they return, others until they
+    return or raise in the calling thread.
+
+    Args:
+        name (str): The name of the spans.
+        describe (Callable[..., Attributes] | None, optional): The function
+            computing span attributes from the call arguments, only called
+            for recorded spans. Defaults to None.
+
+    Returns:
+        Callable[[Callable[..., T]], Callable[..., T]]: The decorator.
+    """
+
+    def decorator(function: Callable[..., Any]) -> Callable[..., Any]:
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with tracer.span(name) as span:
+                    if span is not None and describe is not None:
+                        span.attributes.update(describe(*args, **kwargs))
+                    return await function(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with tracer.span(name) as span:
+                if span is not None and describe is not None:
+                    span.attributes.update(describe(*args, **kwargs))
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def traced_methods(cls: Type[T]) -> Type[T]:
+    """Function wrapping public coroutine methods of a class in spans.
+
+    Spans are named `<class>.<method>`. Async generators and inherited
+    methods are left untouched, as is the class if tracing is off.
+
+    Args:
+        cls (Type[T]): The class.
+
+    Returns:
+        Type[T]: The same class with wrapped methods.
+    """
+
+    if not TRACING_ENABLED:
+        return cls
+
+    for attribute, value in list(vars(cls).items()):
+        if not attribute.startswith("_") and inspect.iscoroutinefunction(
+            value,
+        ):
+            setattr(
+                cls,
+                attribute,
+                traced(f"{cls.__name__}.{attribute}")(value),
+            )
+
+    return cls
+
+
+def instrument(owner: Any, attribute: str, name: str, **kwargs: Any) -> None:
+    """Function replacing a function of a module or class with a traced one.
+
+    Instrumenting the same attribute twice has no effect.
+
+    Args:
+        owner (Any): The module or class defining the function.
+        attribute (str): The name of the function.
+        name (str): The name of the spans.
+        **kwargs (Any): The arguments passed to `traced`.
+    """
+
+    function = getattr(owner, attribute)
+    if getattr(function, "__traced__", False):
+        return
+
+    wrapper = traced(name, **kwargs)(function)
+    wrapper.__traced__ = True  # type: ignore
+    setattr(owner, attribute, wrapper)
+
+
+def setup_tracing() -> None:
+    """Function instrumenting libraries and starting export of spans.
+
+    Request handling is split into dependency solving (including JWT
+    decoding and body parsing), the handler and response serialization,
+    and every query sent through `databases` gets a span.
+    """
+
+    if not TRACING_ENABLED or tracer.enabled:
+        return
+
+    # pylint: disable=import-outside-toplevel
+    import databases
+    import fastapi.routing
+    from jose import jwt
+
+    instrument(jwt, "decode", "jwt.decode")
+    instrument(fastapi.routing, "solve_dependencies", "dependencies")
+    instrument(
+        fastapi.routing,
+        "run_endpoint_function",
+        "handler",
+        describe=lambda **kwargs: {
+            "code.function": kwargs["dependant"].call.__name__,
+        },
+    )
+    instrument(fastapi.routing, "serialize_response", "serialize")
+    for method in ("fetch_all", "fetch_one", "fetch_val", "execute"):
+        instrument(
+            databases.Database,
+            method,
+            f"db.{method}",
+            describe=_describe_query,
+        )
+
+    exporter = create_exporter()
+    if exporter is not None:
+        tracer.start(exporter, config.TRACE_SAMPLE_RATE)
+
+
+# Versions after 00 may append fields after the flags.
+_TRACEPARENT = re.compile(
+    r"^(?P<version>[0-9a-f]{2})-(?P<trace_id>[0-9a-f]{32})"
+    r"-(?P<span_id>[0-9a-f]{16})-(?P<flags>[0-9a-f]{2})(?P<rest>-.*)?$",
+)
+
+
+def parse_traceparent(header: str | None) -> Span | None:
+    """Function reading the parent of a trace from a W3C `traceparent`.
+
+    Args:
+        header (str | None): The value of the header.
+
+    Returns:
+        Span | None: The remote parent, UNSAMPLED if the caller did not
+            sample the trace, None if the header is missing or malformed.
+    """
+
+    match = _TRACEPARENT.match((header or "").strip())
+    if (
+        not match
+        or match["version"] == "ff"
+        or (match["version"] == "00" and match["rest"])
+        or not int(match["trace_id"], 16)
+        or not int(match["span_id"], 16)
+    ):
+        return None
+
+    if not int(match["flags"], 16) & 1:
+        return UNSAMPLED
+
+    parent = Span("remote", match["trace_id"], None, {})
+    parent.span_id = match["span_id"]
+
+    return parent
+
+
+def create_exporter() -> SpanExporter | None:
+    """Function creating the exporter selected by `TRACE_EXPORTER`.
+
+    Returns:
+        SpanExporter | None: The exporter, None if tracing is off.
+    """
+
+    if config.TRACE_EXPORTER == "file":
+        return FileSpanExporter(config.TRACE_FILE)
+    if config.TRACE_EXPORTER == "otlp":
+        return OtlpSpanExporter(config.TRACE_OTLP_ENDPOINT)
+
+    return None
+
+
+def _describe_query(database: Any, query: Any, *_: Any, **__: Any) -> Attributes:
+    """Function describing a query sent to the database.
+
+    Args:
+        database (Any): The database receiving the query.
+        query (Any): The SQL text or the SQLAlchemy statement.
+
+    Returns:
+        Attributes: The statement and the host of the database.
+    """
+
+    if not isinstance(query, str):
+        # pylint: disable=import-outside-toplevel
+        from sqlalchemy.dialects import postgresql
+
+        try:
+            query = str(query.compile(dialect=postgresql.dialect()))
+        except Exception:  # pylint: disable=broad-except
+            query = type(query).__name__
+
+    return {
+        "db.statement": " ".join(query.split())[:500],
+        "db.host": database.url.hostname,
+    }
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    """Function encoding an attribute in the OTLP JSON format.
+
+    Args:
+        key (str): The name of the attribute.
+        value (Any): The value of the attribute.
+
+    Returns:
+        Dict[str, Any]: The encoded attribute.
+    """
+
+    if isinstance(value, bool):
+        encoded = {"boolValue": value}
+    elif isinstance(value, int):
+        encoded = {"intValue": str(value)}
+    elif isinstance(value, float):
+        encoded = {"doubleValue": value}
+    else:
+        encoded = {"stringValue": str(value)}
+
+    return {"key": key, "value": encoded}
+
+
+def _otlp_span(span: Span) -> Dict[str, Any]:
+    """Function encoding a span in the OTLP JSON format.
+
+    Args:
+        span (Span): The finished span.
+
+    Returns:
+        Dict[str, Any]: The encoded span.
+    """
+
+    encoded: Dict[str, Any] = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 2 if "http.method" in span.attributes else 1,
+        "startTimeUnixNano": str(span.start),
+        "endTimeUnixNano": str(span.end),
+        "attributes": [
+            _otlp_attribute(key, value)
+            for key, value in span.attributes.items()
+        ],
+        "status": {"code": 2, "message": span.error} if span.error
+        else {"code": 1},
+    }
+    if span.parent_id:
+        encoded["parentSpanId"] = span.parent_id
+
+    return encoded
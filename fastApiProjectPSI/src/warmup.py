@@ -0,0 +1,159 @@
+"""A module warming up a fresh worker before it receives traffic."""
+
+import asyncio
+import logging
+from typing import Any, Dict, List
+
+from fastapi import FastAPI
+
+from src.config import config
+from src.container import Container
+from src.core.domain.meal import SUMMARY_FIELDS
+from src.db import database
+from src.infrastructure.cache.invalidation import CATALOG_KINDS
+from src.infrastructure.utils.timing import timed
+
+# Requests exercising routing, validation and serialization of hot routes.
+SYNTHETIC_REQUESTS = (
+    "/meal/all",
+    "/meal/categories",
+    "/meal/suggest?q=a",
+    "/meal/search?limit=1",
+    "/health/live",
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_up(app: FastAPI, container: Container) -> None:
+    """Function warming up the worker and marking it ready.
+
+    Pool connections are opened, caches and in-process indexes are built
+    and a few synthetic requests run through the app. A failed step is
+    reported and skipped, as everything it warms is also built lazily.
+    Durations of the steps are added to `app.state.startup_phases`.
+
+    Args:
+        app (FastAPI): The application.
+        container (Container): The dependency container.
+    """
+
+    steps = (
+        ("pool", _open_connections),
+        ("caches", lambda: _prime_caches(container)),
+        ("requests", lambda: _send_requests(app)),
+    )
+
+    phases = getattr(app.state, "startup_phases", {})
+    for name, step in steps:
+        try:
+            with timed(phases, f"warmup.{name}"):
+                await asyncio.wait_for(step(), config.WARMUP_TIMEOUT)
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning(
+                "Warm-up step failed",
+                extra={"step": name},
+                exc_info=e,
+            )
+
+    app.state.ready = True
+
+
+async def _open_connections() -> None:
+    """Function opening pool connections with concurrent queries."""
+
+    async def ping() -> None:
+        await database.fetch_val("SELECT 1")
+
+    await asyncio.gather(*(ping() for _ in range(config.WARMUP_CONNECTIONS)))
+
+
+async def _prime_caches(container: Container) -> None:
+    """Function building snapshots and in-process indexes.
+
+    Running the hot queries also fills the prepared statement cache of
+    the connections.
+
+    Args:
+        container (Container): The dependency container.
+    """
+
+    service = container.meal_service()
+    repository = container.meal_repository()
+
+    if load := getattr(repository, "load", None):
+        await load()
+
+    await service.get_all_meals_snapshot(SUMMARY_FIELDS)
+    for kind in CATALOG_KINDS:
+        await service.get_catalog_snapshot(kind)
+
+    await container.suggest_index().load(repository.get_names)
+    await container.pantry_index().load(repository.get_names)
+
+
+async def _send_requests(app: FastAPI) -> None:
+    """Function running synthetic requests through the application.
+
+    Args:
+        app (FastAPI): The application.
+    """
+
+    for target in SYNTHETIC_REQUESTS:
+        try:
+            status = await _get(app, target)
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning(
+                "Warm-up request failed",
+                extra={"target": target},
+                exc_info=e,
+            )
+            continue
+
+        if status >= 500:
+            logger.warning(
+                "Warm-up request returned an error",
+                extra={"target": target, "status": status},
+            )
+
+
+async def _get(app: FastAPI, target: str) -> int:
+    """Function sending a GET request directly to the ASGI application.
+
+    Args:
+        app (FastAPI): The application.
+        target (str): The path with the query string.
+
+    Returns:
+        int: The status code of the response.
+    """
+
+    path, _, query = target.partition("?")
+    scope: Dict[str, Any] = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"warmup"), (b"accept-encoding", b"gzip")],
+        "client": None,
+        "server": None,
+    }
+    messages: List[Dict[str, Any]] = []
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        messages.append(message)
+
+    await app(scope, receive, send)
+
+    return next(
+        message["status"] for message in messages
+        if message["type"] == "http.response.start"
+    )
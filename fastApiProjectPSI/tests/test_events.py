@@ -0,0 +1,95 @@
+"""Tests of meal change events shared across workers."""
+
+import asyncio
+import uuid
+
+from src.infrastructure.cache import events
+from src.infrastructure.cache.events import DELETED, UPDATED, MealEvent, MealEventBus
+from src.infrastructure.dto.mealdto import MealDTO
+from src.infrastructure.repositories.mealsnapshot import ColumnarMealRepository
+
+
+def meal(meal_id, name):
+    return MealDTO(
+        id=meal_id,
+        strMeal=name,
+        strInstructions="Mix.",
+        ingredients=["Flour"],
+        measures=["1 cup"],
+        user_id=uuid.uuid4(),
+    )
+
+
+class SlowDelegate:
+    """A delegate whose reads resolve a few loop iterations after they start."""
+
+    def __init__(self, meals):
+        self.meals = {item.id: item for item in meals}
+
+    async def get_all_meals(self, fields=None):
+        return list(self.meals.values())
+
+    async def get_by_id(self, meal_id):
+        found = self.meals.get(meal_id)
+        for _ in range(5):
+            await asyncio.sleep(0)
+        return found
+
+
+def notify(bus, event):
+    event.origin = "other worker"
+    bus._on_notification(None, 0, "meal_changes", event.model_dump_json())
+
+
+def test_received_events_are_applied_in_order():
+    delegate = SlowDelegate([meal(1, "Sernik")])
+    repo = ColumnarMealRepository(delegate)
+    bus = MealEventBus([repo])
+
+    async def run():
+        await repo.load()
+        consumer = asyncio.create_task(bus._consume())
+
+        delegate.meals[1] = meal(1, "Sernik z rodzynkami")
+        notify(bus, MealEvent(id=1, kind=UPDATED))
+        await asyncio.sleep(0)
+        del delegate.meals[1]
+        notify(bus, MealEvent(id=1, kind=DELETED))
+
+        await bus._received.join()
+        consumer.cancel()
+
+        return await repo.get_by_id(1)
+
+    assert asyncio.run(run()) is None
+
+
+def test_own_events_are_ignored():
+    bus = MealEventBus()
+    event = MealEvent(id=1, kind=DELETED, origin=bus.origin)
+
+    bus._on_notification(None, 0, "meal_changes", event.model_dump_json())
+
+    assert bus._received.empty()
+
+
+def test_failed_notification_is_not_raised(monkeypatch):
+    class Recorder:
+        def __init__(self):
+            self.events = []
+
+        async def handle(self, event, meal):
+            self.events.append(event.kind)
+
+    async def failing(query):
+        raise ConnectionError
+
+    recorder = Recorder()
+    bus = MealEventBus([recorder])
+    monkeypatch.setattr(events.database, "execute", failing)
+    monkeypatch.setattr(events.database, "fetch_all", failing)
+
+    asyncio.run(bus.publish(MealEvent(id=1, kind=DELETED)))
+    asyncio.run(bus.publish_many([(MealEvent(id=2, kind=DELETED), None)]))
+
+    assert recorder.events == [DELETED, DELETED]
@@ -0,0 +1,153 @@
+"""Tests of admission control, rate limiting and client identification."""
+
+import asyncio
+
+import pytest
+from jose import jwt
+from starlette.requests import Request
+
+from src.api.dependencies import client_key, token_claims
+from src.config import config
+from src.infrastructure.utils import consts, limits
+from src.infrastructure.utils.limits import (
+    ConcurrencyLimiter,
+    Overloaded,
+    RateLimiter,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(limits.time, "monotonic", clock)
+    return clock
+
+
+def request(headers=(), host="10.0.0.1"):
+    return Request({
+        "type": "http",
+        "headers": [(k.encode(), v.encode()) for k, v in headers],
+        "client": (host, 5000),
+    })
+
+
+def bearer(sub):
+    token = jwt.encode(
+        {"sub": sub},
+        key=consts.SECRET_KEY,
+        algorithm=consts.ALGORITHM,
+    )
+    return ("authorization", f"Bearer {token}")
+
+
+def test_bucket_allows_burst_then_refills(clock):
+    limiter = RateLimiter(rate=2.0, burst=3)
+
+    for _ in range(3):
+        limiter.hit("a")
+    with pytest.raises(Overloaded) as error:
+        limiter.hit("a")
+    assert error.value.retry_after == 1
+
+    limiter.hit("b")
+
+    clock.now += 0.5
+    limiter.hit("a")
+    with pytest.raises(Overloaded):
+        limiter.hit("a")
+
+
+def test_bucket_refill_is_capped_by_burst(clock):
+    limiter = RateLimiter(rate=10.0, burst=2)
+
+    limiter.hit("a")
+    clock.now += 60
+    limiter.hit("a")
+    limiter.hit("a")
+    with pytest.raises(Overloaded):
+        limiter.hit("a")
+
+
+def test_bucket_forgets_least_recently_seen_keys(clock):
+    limiter = RateLimiter(rate=1.0, burst=1, max_keys=2)
+
+    limiter.hit("a")
+    limiter.hit("b")
+    limiter.hit("c")
+
+    limiter.hit("a")
+    with pytest.raises(Overloaded):
+        limiter.hit("c")
+
+
+def test_concurrency_limiter_rejects_when_queue_is_full():
+    async def scenario():
+        limiter = ConcurrencyLimiter(limit=1, queue_size=1, timeout=5.0)
+        await limiter.acquire()
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        with pytest.raises(Overloaded):
+            await limiter.acquire()
+
+        limiter.release()
+        await waiting
+        limiter.release()
+
+    asyncio.run(scenario())
+
+
+def test_concurrency_limiter_times_out():
+    async def scenario():
+        limiter = ConcurrencyLimiter(limit=1, queue_size=4, timeout=0.01)
+        await limiter.acquire()
+
+        with pytest.raises(Overloaded) as error:
+            await limiter.acquire()
+        assert error.value.retry_after == 1
+
+    asyncio.run(scenario())
+
+
+def test_authenticated_clients_are_keyed_by_subject():
+    assert client_key(request([bearer("u-1")])) == "user:u-1"
+    assert client_key(request([bearer("u-1")], host="10.0.0.2")) == "user:u-1"
+
+
+def test_token_is_decoded_once_per_request(monkeypatch):
+    incoming = request([bearer("u-1")])
+    assert token_claims(incoming) == {"sub": "u-1"}
+
+    monkeypatch.setattr(jwt, "decode", pytest.fail)
+    assert client_key(incoming) == "user:u-1"
+
+
+def test_anonymous_clients_are_not_limited_by_default():
+    assert client_key(request()) is None
+    assert client_key(request([("authorization", "Bearer bad")])) is None
+
+
+def test_anonymous_clients_are_keyed_by_address(monkeypatch):
+    monkeypatch.setattr(config, "RATE_LIMIT_ANONYMOUS", True)
+
+    assert client_key(request()) == "address:10.0.0.1"
+    assert client_key(request([("x-forwarded-for", "1.1.1.1")])) \
+        == "address:10.0.0.1"
+
+
+def test_anonymous_clients_behind_proxies(monkeypatch):
+    monkeypatch.setattr(config, "RATE_LIMIT_ANONYMOUS", True)
+    monkeypatch.setattr(config, "FORWARDED_PROXIES", 2)
+
+    forged = ("x-forwarded-for", "6.6.6.6, 1.1.1.1, 192.168.0.1")
+    assert client_key(request([forged])) == "address:1.1.1.1"
+    assert client_key(request([("x-forwarded-for", "1.1.1.1")])) \
+        == "address:10.0.0.1"
@@ -0,0 +1,119 @@
+"""Tests of the in-memory columnar meal repository."""
+
+import asyncio
+import uuid
+
+from src.infrastructure.cache.events import CREATED, DELETED, RESET, UPDATED, MealEvent
+from src.infrastructure.dto.mealdto import MealDTO
+from src.infrastructure.repositories.mealsnapshot import ColumnarMealRepository
+
+USER = uuid.uuid4()
+
+
+def meal(meal_id, name, ingredients, category="Dessert", area="Polish"):
+    return MealDTO(
+        id=meal_id,
+        strMeal=name,
+        strInstructions="Mix.",
+        ingredients=ingredients,
+        measures=["1"] * len(ingredients),
+        strCategory=category,
+        strArea=area,
+        user_id=USER,
+    )
+
+
+class FakeDelegate:
+    def __init__(self, meals):
+        self.meals = {item.id: item for item in meals}
+        self.loads = 0
+
+    async def get_all_meals(self, fields=None):
+        self.loads += 1
+        return list(self.meals.values())
+
+    async def get_by_id(self, meal_id):
+        return self.meals.get(meal_id)
+
+
+def repository(*meals):
+    delegate = FakeDelegate(meals)
+    return ColumnarMealRepository(delegate), delegate
+
+
+def names(meals):
+    return [item.strMeal for item in meals]
+
+
+def test_get_by_id_round_trips_meal():
+    original = meal(1, "Pierogi", ["Flour", "Potatoes"])
+    repo, _ = repository(original)
+
+    assert asyncio.run(repo.get_by_id(1)) == original
+    assert asyncio.run(repo.get_by_id(2)) is None
+
+
+def test_filters_by_category_area_and_ingredient():
+    repo, delegate = repository(
+        meal(1, "Sernik", ["Cheese", "Eggs"]),
+        meal(2, "Bigos", ["Cabbage"], category="Pork"),
+        meal(3, "Apple Pie", ["Apples", "eggs"], area="British"),
+    )
+
+    async def run():
+        return (
+            await repo.get_by_category("dessert"),
+            await repo.get_by_area("Polish"),
+            await repo.get_by_ingredients("Eggs"),
+        )
+
+    by_category, by_area, by_ingredient = asyncio.run(run())
+
+    assert sorted(names(by_category)) == ["Apple Pie", "Sernik"]
+    assert sorted(names(by_area)) == ["Bigos", "Sernik"]
+    assert sorted(names(by_ingredient)) == ["Apple Pie", "Sernik"]
+    assert delegate.loads == 1
+
+
+def test_events_update_loaded_snapshot():
+    repo, delegate = repository(meal(1, "Sernik", ["Cheese"]))
+    asyncio.run(repo.load())
+
+    delegate.meals[2] = meal(2, "Makowiec", ["Poppy seeds"])
+    asyncio.run(repo.handle(MealEvent(id=2, kind=CREATED), None))
+    changed = meal(1, "Sernik", ["Quark"])
+    asyncio.run(repo.handle(MealEvent(id=1, kind=UPDATED), changed))
+
+    assert names(asyncio.run(repo.get_by_ingredients("poppy seeds"))) == ["Makowiec"]
+    assert names(asyncio.run(repo.get_by_ingredients("quark"))) == ["Sernik"]
+    assert asyncio.run(repo.get_by_ingredients("cheese")) == []
+
+    asyncio.run(repo.handle(MealEvent(id=2, kind=DELETED), None))
+
+    assert asyncio.run(repo.get_by_id(2)) is None
+    assert names(asyncio.run(repo.get_by_category("Dessert"))) == ["Sernik"]
+
+
+def test_events_during_load_are_applied_after_it():
+    repo, delegate = repository(meal(1, "Sernik", ["Cheese"]))
+    get_all_meals = delegate.get_all_meals
+
+    async def racing_load(fields=None):
+        meals = await get_all_meals(fields)
+        await repo.handle(MealEvent(id=1, kind=DELETED), None)
+        return meals
+
+    delegate.get_all_meals = racing_load
+
+    assert asyncio.run(repo.get_by_id(1)) is None
+
+
+def test_reset_rebuilds_snapshot():
+    repo, delegate = repository(meal(1, "Sernik", ["Cheese"]))
+    asyncio.run(repo.load())
+
+    delegate.meals[1] = meal(1, "Sernik", ["Quark"])
+    asyncio.run(repo.handle(MealEvent(id=0, kind=RESET), None))
+
+    assert names(asyncio.run(repo.get_by_ingredients("quark"))) == ["Sernik"]
+    assert delegate.loads == 2
@@ -0,0 +1,46 @@
+"""Tests of the parser of free-text ingredient measures."""
+
+import pytest
+
+from src.infrastructure.utils.measures import parse_measure
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("1 cup", (1.0, "cup")),
+        ("2 Tablespoons", (2.0, "tbsp")),
+        ("3 tbs.", (3.0, "tbsp")),
+        ("1 1/2 tsp", (1.5, "tsp")),
+        ("1/2", (0.5, "")),
+        ("½ cup", (0.5, "cup")),
+        ("1½ cups", (1.5, "cup")),
+        ("0,5 l", (500.0, "ml")),
+        ("1.5l", (1500.0, "ml")),
+        ("1kg", (1000.0, "g")),
+        ("250 ml", (250.0, "ml")),
+        ("175g/6oz", (175.0, "g")),
+        ("4 tbsp/60ml", (4.0, "tbsp")),
+        ("2 x 400g tins", (800.0, "g")),
+        ("2x400g", (800.0, "g")),
+        ("3 × 2 cans", (6.0, "can")),
+        ("2 x large", (2.0, "")),
+        ("2-3 cups", (2.0, "cup")),
+        ("2 to 3 cloves", (2.0, "clove")),
+        ("2 large", (2.0, "")),
+        ("0/0 cup", (0.0, "cup")),
+        ("to taste", (None, "to taste")),
+        ("  Pinch  ", (None, "pinch")),
+        ("", (None, "")),
+        ("1234567890 g", (None, "1234567890 g")),
+    ],
+)
+def test_parse_measure(text, expected):
+    assert parse_measure(text) == expected
+
+
+def test_very_long_numbers_are_not_quantities():
+    text = "1" * 5000 + " g"
+
+    assert parse_measure(text) == (None, text)
+    assert parse_measure("1/" + "2" * 5000) == (1.0, "")
@@ -0,0 +1,100 @@
+"""Tests of the meal-ingredient bitset matrix."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.infrastructure.cache.pantry import PantryIndex
+
+# The index imports numpy lazily on first load.
+pytest.importorskip("numpy")
+
+
+def meal(meal_id, name, ingredients):
+    return SimpleNamespace(id=meal_id, strMeal=name, ingredients=ingredients)
+
+
+def loaded(*meals):
+    index = PantryIndex()
+
+    async def loader():
+        return meals
+
+    asyncio.run(index.load(loader))
+    return index
+
+
+def test_ranks_by_coverage_then_missing_then_id():
+    index = loaded(
+        meal(1, "Omelette", ["Egg", "Milk", "Butter"]),
+        meal(2, "Boiled Egg", ["Egg"]),
+        meal(3, "Pancakes", ["Egg", "Milk", "Flour", "Sugar"]),
+        meal(4, "Toast", ["Bread", "Butter"]),
+        meal(5, "Scrambled Eggs", ["egg", " MILK", "Salt"]),
+    )
+
+    assert index.match(["egg", "Milk "]) == [
+        (2, "Boiled Egg", 1, 1, []),
+        (1, "Omelette", 2, 3, ["Butter"]),
+        (5, "Scrambled Eggs", 2, 3, ["Salt"]),
+        (3, "Pancakes", 2, 4, ["Flour", "Sugar"]),
+    ]
+
+
+def test_filters_by_coverage_and_limits():
+    index = loaded(
+        meal(1, "Omelette", ["Egg", "Milk", "Butter"]),
+        meal(2, "Pancakes", ["Egg", "Milk", "Flour", "Sugar"]),
+    )
+
+    assert [m[0] for m in index.match(["egg", "milk"], min_coverage=0.6)] \
+        == [1]
+    assert [m[0] for m in index.match(["egg"], limit=1)] == [1]
+    assert index.match(["caviar"]) == []
+
+
+def test_duplicate_ingredients_count_once():
+    index = loaded(meal(1, "Salty", ["Salt", "salt", " ", "Pepper"]))
+
+    assert index.match(["salt"]) == [(1, "Salty", 1, 2, ["Pepper"])]
+
+
+def test_more_ingredients_than_bits_in_a_word():
+    names = [f"Spice {i}" for i in range(150)]
+    index = loaded(
+        meal(1, "Curry", names),
+        meal(2, "Last", [names[-1], "Rice"]),
+    )
+
+    assert index.match(names[100:])[:2] == [
+        (2, "Last", 1, 2, ["Rice"]),
+        (1, "Curry", 50, 150, names[:100]),
+    ]
+
+
+def test_upsert_and_remove_reuse_rows():
+    index = loaded(meal(1, "Toast", ["Bread"]), meal(2, "Soup", ["Water"]))
+
+    index.remove(1)
+    assert index.match(["bread"]) == []
+
+    index.upsert(meal(3, "Sandwich", ["Bread", "Ham"]))
+    index.upsert(meal(2, "Soup", ["Water", "Salt"]))
+    assert index.match(["bread", "water"]) == [
+        (2, "Soup", 1, 2, ["Salt"]),
+        (3, "Sandwich", 1, 2, ["Ham"]),
+    ]
+
+
+def test_writes_during_load_are_replayed():
+    index = PantryIndex()
+
+    async def loader():
+        index.upsert(meal(2, "Porridge", ["Oats"]))
+        index.remove(1)
+        return [meal(1, "Muesli", ["Oats"])]
+
+    asyncio.run(index.load(loader))
+
+    assert index.match(["oats"]) == [(2, "Porridge", 1, 1, [])]
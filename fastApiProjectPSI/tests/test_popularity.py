@@ -0,0 +1,76 @@
+"""Tests of the in-process ranking of meals by favourites."""
+
+import asyncio
+
+from src.infrastructure.cache.popularity import PopularityIndex
+
+
+def refreshed(index, counts):
+    async def loader():
+        return counts
+
+    asyncio.run(index.refresh(loader))
+    return index
+
+
+def test_top_orders_by_count_then_id():
+    index = refreshed(PopularityIndex(capacity=3), [(1, 2), (2, 5), (3, 2), (4, 1)])
+
+    assert index.top(10) == [(2, 5), (1, 2), (3, 2)]
+    assert index.top(1) == [(2, 5)]
+
+
+def test_adjust_updates_ranking_and_drops_zero_counts():
+    index = refreshed(PopularityIndex(), [(1, 1), (2, 2)])
+
+    index.adjust(1, 2)
+    index.adjust(2, -5)
+
+    assert index.top(10) == [(1, 3)]
+    assert index.count(2) == 0
+
+
+def test_changes_during_refresh_are_not_counted_twice():
+    index = refreshed(PopularityIndex(), [(1, 1)])
+
+    async def loader():
+        # Changes are adjusted after they are stored, so the fetched
+        # counts already include them.
+        index.adjust(1, 1)
+        index.adjust(2, 1)
+        return [(1, 2), (2, 1), (3, 4)]
+
+    asyncio.run(index.refresh(loader))
+
+    assert index.top(10) == [(3, 4), (1, 2), (2, 1)]
+
+    index.adjust(2, 1)
+    assert index.count(2) == 2
+
+
+def test_failed_refresh_keeps_counts():
+    index = refreshed(PopularityIndex(), [(1, 1)])
+
+    async def loader():
+        index.adjust(1, 1)
+        raise ConnectionError
+
+    try:
+        asyncio.run(index.refresh(loader))
+    except ConnectionError:
+        pass
+
+    assert index.count(1) == 2
+    index.adjust(1, 1)
+    assert index.count(1) == 3
+
+
+def test_version_changes_only_with_counts():
+    index = refreshed(PopularityIndex(), [(1, 1)])
+    version = index.version
+
+    refreshed(index, [(1, 1)])
+    assert index.version == version
+
+    index.adjust(1, 1)
+    assert index.version > version
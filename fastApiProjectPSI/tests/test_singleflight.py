@@ -0,0 +1,89 @@
+"""Tests of coalescing identical concurrent calls."""
+
+import asyncio
+
+import pytest
+
+from src.infrastructure.utils.singleflight import SingleFlight
+
+
+def test_identical_concurrent_calls_share_one_execution():
+    calls = []
+
+    async def scenario():
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def call(value):
+            calls.append(value)
+            await release.wait()
+            return value
+
+        waiters = [
+            asyncio.create_task(flights.do("a", lambda: call("a")))
+            for _ in range(3)
+        ]
+        other = asyncio.create_task(flights.do("b", lambda: call("b")))
+        await asyncio.sleep(0)
+        release.set()
+
+        return await asyncio.gather(*waiters, other)
+
+    assert asyncio.run(scenario()) == ["a", "a", "a", "b"]
+    assert calls == ["a", "b"]
+
+
+def test_finished_call_is_not_reused():
+    calls = []
+
+    async def scenario():
+        flights = SingleFlight()
+
+        async def call():
+            calls.append(1)
+            return len(calls)
+
+        return [await flights.do("a", call), await flights.do("a", call)]
+
+    assert asyncio.run(scenario()) == [1, 2]
+
+
+def test_every_waiter_gets_the_exception():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def call():
+            await asyncio.sleep(0)
+            raise ValueError("boom")
+
+        return await asyncio.gather(
+            flights.do("a", call),
+            flights.do("a", call),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(scenario())
+    assert [type(result) for result in results] == [ValueError, ValueError]
+
+
+def test_cancelled_waiter_does_not_cancel_the_call():
+    async def scenario():
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def call():
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(flights.do("a", call))
+        second = asyncio.create_task(flights.do("a", call))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
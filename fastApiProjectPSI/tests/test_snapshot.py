@@ -0,0 +1,113 @@
+"""Tests of pre-rendered, pre-compressed response snapshots."""
+
+import asyncio
+import gzip
+
+from src.infrastructure.cache.snapshot import EMPTY, Snapshot, SnapshotStore
+
+
+def builder(body, calls=None):
+    async def build():
+        if calls is not None:
+            calls.append(body)
+        return body
+
+    return build
+
+
+def test_negotiates_best_encoding():
+    snapshot = Snapshot(b'[{"id":1}]' * 100)
+
+    body, encoding = snapshot.negotiate("gzip;q=0.5, identity")
+    assert encoding == "gzip"
+    assert gzip.decompress(body) == snapshot.identity
+
+    assert snapshot.negotiate("gzip;q=0") == (snapshot.identity, None)
+    assert snapshot.negotiate("") == (snapshot.identity, None)
+
+
+def test_snapshot_is_built_once():
+    calls = []
+
+    async def scenario():
+        store = SnapshotStore()
+        first, second = await asyncio.gather(
+            store.get("all", builder(b"[1]", calls)),
+            store.get("all", builder(b"[1]", calls)),
+        )
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first is second
+    assert calls == [b"[1]"]
+
+
+def test_evicts_least_recently_used_except_pinned():
+    async def scenario():
+        store = SnapshotStore(max_entries=2, pinned=["all"])
+        await store.get("all", builder(b"[0]"))
+        await store.get("category:a", builder(b"[1]"))
+        await store.get("category:b", builder(b"[2]"))
+        await store.get("category:c", builder(b"[3]"))
+        return store
+
+    store = asyncio.run(scenario())
+
+    assert list(store._snapshots) == ["all", "category:c"]
+    assert set(store._builders) == {"all", "category:c"}
+    assert set(store._locks) <= {"all", "category:c"}
+
+
+def test_empty_collections_are_not_stored():
+    async def scenario():
+        store = SnapshotStore()
+        return store, await store.get("category:unknown", builder(None))
+
+    store, snapshot = asyncio.run(scenario())
+
+    assert snapshot is EMPTY
+    assert not store._snapshots and not store._builders and not store._locks
+
+
+def test_invalidation_regenerates_collection_and_variants():
+    calls = []
+
+    async def scenario():
+        store = SnapshotStore()
+        await store.get("all", builder(b"[1]", calls))
+        await store.get("all?fields=id", builder(b"[2]", calls))
+        await store.get("area:x", builder(b"[3]", calls))
+
+        store.invalidate(["all"])
+        await asyncio.gather(*store._tasks)
+        return store
+
+    store = asyncio.run(scenario())
+
+    assert calls == [b"[1]", b"[2]", b"[3]", b"[1]", b"[2]"]
+    assert set(store._snapshots) == {"all", "all?fields=id", "area:x"}
+
+
+def test_snapshot_built_during_invalidation_is_not_stored():
+    async def scenario():
+        store = SnapshotStore()
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await release.wait()
+            return b"[stale]"
+
+        pending = asyncio.create_task(store.get("all", slow))
+        await started.wait()
+        store.invalidate()
+        release.set()
+
+        return store, await pending
+
+    store, snapshot = asyncio.run(scenario())
+
+    assert snapshot.identity == b"[stale]"
+    assert "all" not in store._snapshots
@@ -0,0 +1,114 @@
+"""Tests of the in-process prefix index for typeahead."""
+
+import asyncio
+from types import SimpleNamespace
+
+from src.infrastructure.cache.suggest import INGREDIENT, MEAL, SuggestIndex
+
+
+def meal(meal_id, name, ingredients=()):
+    return SimpleNamespace(id=meal_id, strMeal=name, ingredients=list(ingredients))
+
+
+def loaded(*meals):
+    index = SuggestIndex()
+
+    async def loader():
+        return meals
+
+    asyncio.run(index.load(loader))
+    return index
+
+
+def test_load_builds_sorted_entries():
+    index = loaded(
+        meal(2, "Teriyaki Chicken", ["Chicken", "Soy Sauce"]),
+        meal(1, "Chicken Curry", ["chicken ", "Curry Powder"]),
+    )
+
+    assert index._entries == sorted(index._entries)
+    assert index.suggest("curry") == [
+        (INGREDIENT, None, "Curry Powder"),
+        (MEAL, 1, "Chicken Curry"),
+    ]
+
+
+def test_name_start_ranks_before_word_start():
+    index = loaded(
+        meal(1, "Spicy Chicken Soup"),
+        meal(2, "Chicken Soup with Dumplings and Vegetables"),
+    )
+
+    assert index.suggest("chick", 2) == [
+        (MEAL, 2, "Chicken Soup with Dumplings and Vegetables"),
+        (MEAL, 1, "Spicy Chicken Soup"),
+    ]
+
+
+def test_ranks_whole_prefix_range():
+    # Many word-start matches sort before the name-start match by key,
+    # the best one must still be found.
+    meals = [meal(i, f"Apple Pie {i:03}") for i in range(1, 200)]
+    index = loaded(*meals, meal(500, "Pie Zurek"))
+
+    assert index.suggest("pie", 1) == [(MEAL, 500, "Pie Zurek")]
+    assert index.suggest("pi", 1) == [(MEAL, 500, "Pie Zurek")]
+    assert index.suggest("p", 2) == [
+        (MEAL, 500, "Pie Zurek"),
+        (MEAL, 1, "Apple Pie 001"),
+    ]
+
+
+def test_folds_case_and_diacritics():
+    index = loaded(meal(1, "Crème Brûlée"))
+
+    assert index.suggest("CREME BRU") == [(MEAL, 1, "Crème Brûlée")]
+    assert index.suggest("brulee") == [(MEAL, 1, "Crème Brûlée")]
+    assert index.suggest("   ") == []
+
+
+def test_upsert_and_remove_keep_ingredient_counts():
+    index = loaded(meal(1, "Pancakes", ["Egg"]), meal(2, "Omelette", ["egg"]))
+
+    index.upsert(meal(1, "Waffles", ["Flour"]))
+    assert index.suggest("pan") == []
+    assert index.suggest("egg") == [(INGREDIENT, None, "Egg")]
+
+    index.remove(2)
+    assert index.suggest("egg") == []
+    assert index.suggest("w") == [(MEAL, 1, "Waffles")]
+
+
+def test_writes_during_load_are_replayed():
+    index = SuggestIndex()
+
+    async def loader():
+        index.upsert(meal(2, "Borscht"))
+        index.remove(1)
+        return [meal(1, "Bigos")]
+
+    asyncio.run(index.load(loader))
+
+    assert index.is_loaded and not index.is_loading
+    assert index.suggest("b") == [(MEAL, 2, "Borscht")]
+
+
+def test_short_prefixes_stay_ranked_after_writes():
+    meals = {i: meal(i, f"Pie {i % 7} Apple", [f"Apple {i % 3}"]) for i in range(1, 40)}
+    index = loaded(*meals.values())
+
+    meals[3] = meal(3, "Apricot Pie", ["Apricot"])
+    index.upsert(meals[3])
+    del meals[5]
+    index.remove(5)
+    meals[41] = meal(41, "A", ["Pie crust"])
+    index.upsert(meals[41])
+
+    rebuilt = loaded(*meals.values())
+    assert index._short == rebuilt._short
+    assert index.suggest("a", 3) == [
+        (MEAL, 41, "A"),
+        (INGREDIENT, None, "Apple 0"),
+        (INGREDIENT, None, "Apple 1"),
+    ]
+    assert index.suggest("pi") == rebuilt.suggest("pi")
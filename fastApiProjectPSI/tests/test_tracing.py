@@ -0,0 +1,46 @@
+"""Tests of reading the W3C trace context."""
+
+import pytest
+
+from src.tracing import UNSAMPLED, parse_traceparent
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+SPAN_ID = "00f067aa0ba902b7"
+
+
+def test_sampled_parent():
+    parent = parse_traceparent(f"00-{TRACE_ID}-{SPAN_ID}-01")
+
+    assert parent.trace_id == TRACE_ID
+    assert parent.span_id == SPAN_ID
+
+
+def test_unsampled_parent():
+    assert parse_traceparent(f"00-{TRACE_ID}-{SPAN_ID}-00") is UNSAMPLED
+
+
+def test_future_version_may_append_fields():
+    parent = parse_traceparent(f"01-{TRACE_ID}-{SPAN_ID}-03-extra")
+
+    assert parent.trace_id == TRACE_ID
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        None,
+        "",
+        "garbage",
+        f"00-{TRACE_ID}-{SPAN_ID}",
+        f"00-{TRACE_ID}-{SPAN_ID}-01-extra",
+        f"ff-{TRACE_ID}-{SPAN_ID}-01",
+        f"00-{'0' * 32}-{SPAN_ID}-01",
+        f"00-{TRACE_ID}-{'0' * 16}-01",
+        f"00-{TRACE_ID.upper()}-{SPAN_ID}-01",
+        f"00-0x{TRACE_ID[2:]}-{SPAN_ID}-01",
+        f"00-{TRACE_ID[:-1]}_-{SPAN_ID}-01",
+        f"00-{TRACE_ID}-{SPAN_ID}-0g",
+    ],
+)
+def test_malformed_headers_are_ignored(header):
+    assert parse_traceparent(header) is None